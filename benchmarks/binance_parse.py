@@ -0,0 +1,123 @@
+#  benchmarks/binance_parse.py
+#  python -m benchmarks.binance_parse --messages 200000
+
+from benchmarks.report import save
+from exchanges.binance import BinanceFetcher
+from exchanges.binance_native import BinanceBookTickerFetcher
+from typing import List
+import argparse
+import logging
+import random
+import json
+import time
+
+PAIRS = [
+    "BTC/USDC", "ETH/USDC", "SOL/USDC", "DOGE/USDC", "ADA/USDC", "AVAX/USDC", "XRP/USDC",
+    "LTC/USDC", "DOT/USDC", "LINK/USDC", "BCH/USDC", "ALGO/USDC", "ATOM/USDC",
+]
+
+
+class _StubClient:
+    """Just enough of a ccxt.pro Client for `handle_message`: records what would resolve watch_tickers."""
+    url = "wss://stream.binance.com:9443/stream"
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.batch = None
+
+    def resolve(self, result, message_hash):
+        if message_hash.startswith("tickers"):
+            self.batch = result
+
+
+def ticker_messages(pairs: List[str], n: int, rng: random.Random) -> List[str]:
+    """Raw 24hrTicker events, the stream ccxt's watch_tickers consumes on Binance spot."""
+    out = []
+    now_ms = int(time.time() * 1000)
+    for i in range(n):
+        pair = rng.choice(pairs)
+        mid = 100 * (1 + rng.random())
+        out.append(json.dumps({
+            "e": "24hrTicker", "E": now_ms + i, "s": pair.replace("/", ""),
+            "p": "-0.4", "P": "-0.209", "w": f"{mid:.4f}", "x": f"{mid:.4f}", "c": f"{mid:.4f}", "Q": "0.104",
+            "b": f"{mid - 0.01:.4f}", "B": "4.104", "a": f"{mid + 0.01:.4f}", "A": "0.001",
+            "o": f"{mid:.4f}", "h": f"{mid * 1.02:.4f}", "l": f"{mid * 0.98:.4f}", "v": "173518.119", "q": "3332407.03",
+            "O": now_ms - 86_400_000, "C": now_ms + i, "F": 158251292, "L": 158414513, "n": 163222,
+        }))
+    return out
+
+
+def book_ticker_messages(pairs: List[str], n: int, rng: random.Random) -> List[str]:
+    """Raw combined-stream bookTicker messages, as the native fetcher receives them."""
+    out = []
+    for i in range(n):
+        pair = rng.choice(pairs)
+        mid = 100 * (1 + rng.random())
+        out.append(json.dumps({
+            "stream": f"{pair.replace('/', '').lower()}@bookTicker",
+            "data": {"u": 400900217 + i, "s": pair.replace("/", ""),
+                     "b": f"{mid - 0.01:.4f}", "B": "31.21", "a": f"{mid + 0.01:.4f}", "A": "40.66"},
+        }))
+    return out
+
+
+def ccxt_fetcher(pairs: List[str]) -> BinanceFetcher:
+    fetcher = BinanceFetcher(pairs)
+    fetcher.exchange.set_markets([
+        {"id": pair.replace("/", ""), "symbol": pair, "base": pair.split("/")[0], "quote": pair.split("/")[1],
+         "baseId": pair.split("/")[0], "quoteId": pair.split("/")[1], "type": "spot", "spot": True, "active": True}
+        for pair in pairs
+    ])
+    return fetcher
+
+
+def time_ccxt(fetcher: BinanceFetcher, messages: List[str]) -> int:
+    """CPU ns for: decode → ccxt handle_message (normalize ticker, resolve) → our per-ticker publish."""
+    exchange = fetcher.exchange
+    client = _StubClient()
+    start = time.process_time_ns()
+    for raw in messages:
+        exchange.handle_message(client, json.loads(raw))
+        fetcher._on_tickers(client.batch)
+    return time.process_time_ns() - start
+
+
+def time_native(fetcher: BinanceBookTickerFetcher, messages: List[str]) -> int:
+    start = time.process_time_ns()
+    for raw in messages:
+        fetcher._on_message(raw)
+    return time.process_time_ns() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-message CPU: ccxt watch_tickers path vs native bookTicker parsing.")
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs per path")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.getLogger("cex_dex_arbitrage").setLevel(logging.WARNING)
+
+    rng = random.Random(args.seed)
+    tickers = ticker_messages(PAIRS, args.messages, rng)
+    books = book_ticker_messages(PAIRS, args.messages, rng)
+    ccxt_side = ccxt_fetcher(PAIRS)
+    native_side = BinanceBookTickerFetcher(PAIRS)
+
+    ccxt_ns = min(time_ccxt(ccxt_side, tickers) for _ in range(args.repeat)) / args.messages
+    native_ns = min(time_native(native_side, books) for _ in range(args.repeat)) / args.messages
+    assert native_side.latest_prices.keys() == ccxt_side.latest_prices.keys()
+
+    metrics = {
+        "ccxt_cpu_ns_per_msg": ccxt_ns,
+        "native_cpu_ns_per_msg": native_ns,
+        "speedup_x": ccxt_ns / native_ns,
+        "ccxt_max_msgs_per_sec": 1e9 / ccxt_ns,
+        "native_max_msgs_per_sec": 1e9 / native_ns,
+    }
+    config = {"messages": args.messages, "repeat": args.repeat, "seed": args.seed, "pairs": len(PAIRS)}
+    path = save("binance_parse", config, metrics)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#  benchmarks/detection.py
+#  python -m benchmarks.detection --pairs 100 --venues 6 --rate 5000 --duration 10
+
+from benchmarks.stubs import SyntheticFetcher
+from benchmarks.report import save
+from core.market_matrix import MarketMatrix
+from core.detector import ArbitrageDetector
+from db.logger import DatabaseLogger
+from typing import Dict, List
+import numpy as np
+import contextlib
+import tracemalloc
+import argparse
+import asyncio
+import logging
+import time
+import sys
+import os
+
+
+class InstrumentedDetector(ArbitrageDetector):
+    """The real detector, timing each pair from its oldest unevaluated tick to the end of its decision."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending: Dict[str, int] = {}   # pair -> perf_counter_ns of its oldest unevaluated tick
+        self.latencies_ns: List[int] = []
+        self.evaluations = 0
+
+    def on_tick(self, pair: str):
+        self.pending.setdefault(pair, time.perf_counter_ns())
+
+    async def evaluate_pairs(self, pairs):
+        pairs = list(pairs)
+        await super().evaluate_pairs(pairs)
+        done = time.perf_counter_ns()
+        for pair in pairs:
+            started = self.pending.pop(pair, None)
+            if started is not None:
+                self.latencies_ns.append(done - started)
+        self.evaluations += len(pairs)
+
+
+def unflushed_logger() -> DatabaseLogger:
+    """A logger with no database that buffers without limit and never flushes (nor spills)."""
+    return DatabaseLogger(None, flush_interval=1e9, flush_rows=sys.maxsize, max_rows=sys.maxsize)
+
+
+def build(n_pairs: int, n_venues: int, rate: float, db_logger, seed: int):
+    pairs = [f"P{i:03d}/USDC" for i in range(n_pairs)]
+    mids = {pair: 100.0 for pair in pairs}
+    matrix = MarketMatrix()
+    detector = InstrumentedDetector(matrix, db_logger)
+    fetchers = [
+        SyntheticFetcher(f"Venue{v}", pairs, rate / n_venues, mids, seed=seed + v, on_tick=detector.on_tick)
+        for v in range(n_venues)
+    ]
+    for fetcher in fetchers:
+        for pair in pairs:
+            matrix.add_fetcher(pair, fetcher)
+    return matrix, detector, fetchers
+
+
+async def measure_allocations(args, db_logger) -> dict:
+    """Synchronous publish → evaluate loop under tracemalloc: transient peak bytes and net blocks per tick."""
+    matrix, detector, fetchers = build(args.pairs, args.venues, args.rate, db_logger, args.seed)
+    for fetcher in fetchers:            # warm up every cell
+        for pair in fetcher.pairs:
+            fetcher.tick(pair)
+    await detector.evaluate_pairs(matrix.pairs)
+
+    peaks = []
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for i in range(args.alloc_ticks):
+        fetcher = fetchers[i % len(fetchers)]
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fetcher.tick()
+        await detector.evaluate_pairs(matrix._dirty)
+        matrix._dirty.clear()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+    return {
+        "alloc_peak_bytes_per_tick_p50": float(np.percentile(peaks, 50)),
+        "alloc_peak_bytes_per_tick_p99": float(np.percentile(peaks, 99)),
+        "net_blocks_per_tick": (blocks_after - blocks_before) / args.alloc_ticks,
+    }
+
+
+async def run(args) -> dict:
+    pool = None
+    if args.dsn:
+        import asyncpg
+        from db.logger import ensure_tables
+        pool = await asyncpg.create_pool(dsn=args.dsn)
+        await ensure_tables(pool)
+    # Without a DSN the logger still buffers every row (the hot-path cost); it just never flushes
+    db_logger = DatabaseLogger(pool) if pool else unflushed_logger()
+
+    matrix, detector, fetchers = build(args.pairs, args.venues, args.rate, db_logger, args.seed)
+    detector_task = asyncio.create_task(detector.run())
+    for fetcher in fetchers:
+        await fetcher.connect()
+
+    start = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    elapsed = time.perf_counter() - start
+    ticks = sum(f.ticks for f in fetchers)
+
+    for fetcher in fetchers:
+        await fetcher.close()
+    detector_task.cancel()
+    try:
+        await detector_task
+    except asyncio.CancelledError:
+        pass
+    buffered = len(db_logger.arb_buffer) + len(db_logger.trade_buffer)
+    if pool:
+        await db_logger.close()
+        await pool.close()
+    else:
+        db_logger._flush_task.cancel()
+
+    lat_us = np.array(detector.latencies_ns) / 1000
+    result = {
+        "ticks_per_sec": ticks / elapsed,
+        "target_ticks_per_sec": args.rate,
+        "evaluations_per_sec": detector.evaluations / elapsed,
+        "latency_us_p50": float(np.percentile(lat_us, 50)) if len(lat_us) else None,
+        "latency_us_p99": float(np.percentile(lat_us, 99)) if len(lat_us) else None,
+        "entries": len(detector.open_positions) + len(detector.paper_trades),
+        "rows_logged": buffered,
+    }
+    result.update(await measure_allocations(args, unflushed_logger()))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic-feed benchmark for the detection hot path.")
+    parser.add_argument("--pairs", type=int, default=13)
+    parser.add_argument("--venues", type=int, default=6)
+    parser.add_argument("--rate", type=float, default=2000, help="total ticks/s across all venues")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument("--alloc-ticks", type=int, default=2000, help="ticks in the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--dsn", help="Postgres DSN; when set, rows are really flushed")
+    args = parser.parse_args()
+
+    logging.getLogger("cex_dex_arbitrage").setLevel(logging.WARNING)
+    config = {k: getattr(args, k) for k in ("pairs", "venues", "rate", "duration", "alloc_ticks", "seed")}
+    config["db"] = bool(args.dsn)
+    # simulate_exit_trade prints a debug block per exit; keep its cost but not its output
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        metrics = asyncio.run(run(args))
+    path = save("detection", config, metrics)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
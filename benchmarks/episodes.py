@@ -0,0 +1,160 @@
+#  benchmarks/episodes.py
+#  python -m benchmarks.episodes --pairs 13 --venues 6 --ticks 200000
+
+from benchmarks.stubs import SyntheticFetcher
+from benchmarks.detection import unflushed_logger
+from benchmarks.report import save
+from core.market_matrix import MarketMatrix
+from core.detector import ArbitrageDetector
+from core.episodes import EpisodeTracker
+from typing import Dict, List
+import contextlib
+import argparse
+import asyncio
+import logging
+import random
+import time
+import os
+
+
+class PersistentFetcher(SyntheticFetcher):
+    """
+    A venue whose price carries a slowly mean-reverting (AR(1)) offset from the shared mid per pair,
+    so a cross-venue spread that crosses the threshold stays there for many ticks, as real
+    dislocations do, instead of flickering tick by tick like independent noise.
+    """
+
+    def __init__(self, *args, phi: float = 0.995, offset_pct: float = 0.3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.phi = phi
+        # Innovation scale giving a stationary offset standard deviation of `offset_pct`
+        self.sigma = offset_pct / 100 * (1 - phi * phi) ** 0.5
+        self.offsets: Dict[str, float] = {pair: 0.0 for pair in self.pairs}
+
+    def tick(self, pair=None):
+        pair = pair or self.rng.choice(self.pairs)
+        offset = self.offsets[pair] = self.phi * self.offsets[pair] + self.rng.gauss(0, self.sigma)
+        mid = self.mids[pair] = self.mids[pair] * (1 + self.rng.gauss(0, 0.0002))
+        price = mid * (1 + offset + self.rng.gauss(0, self.noise_pct / 100))
+        half = price * self.half_spread_pct / 100
+        self._publish(pair, price, time.time_ns(), price - half, price + half)
+        self.ticks += 1
+
+
+class TimedTracker(EpisodeTracker):
+    """The real tracker, timing each `observe` call (its whole cost on the detection path)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.samples_ns: List[int] = []
+
+    async def observe(self, pairs, routes, buy_cols, sell_cols):
+        began = time.perf_counter_ns()
+        await super().observe(pairs, routes, buy_cols, sell_cols)
+        self.samples_ns.append(time.perf_counter_ns() - began)
+
+
+def rows_written(db_logger) -> int:
+    """Every row the logger would insert: opportunities with their price rows, prices, trades and episodes."""
+    return (
+        sum(1 + len(arb["prices"]) for arb in db_logger.arb_buffer)
+        + len(db_logger.price_buffer) + len(db_logger.trade_buffer) + len(db_logger.episode_buffer)
+    )
+
+
+def build(args, episodes: bool):
+    pairs = [f"P{i:03d}/USDC" for i in range(args.pairs)]
+    mids = {pair: 100.0 for pair in pairs}
+    matrix = MarketMatrix()
+    db_logger = unflushed_logger()
+    tracker = TimedTracker(matrix, db_logger, sample_interval=args.sample_interval) if episodes else None
+    detector = ArbitrageDetector(matrix, db_logger, episodes=tracker)
+    fetchers = [
+        PersistentFetcher(f"Venue{v}", pairs, 0, mids, noise_pct=args.noise_pct, seed=args.seed + v, phi=args.phi, offset_pct=args.offset_pct)
+        for v in range(args.venues)
+    ]
+    for fetcher in fetchers:
+        for pair in pairs:
+            matrix.add_fetcher(pair, fetcher)
+    return matrix, detector, tracker, fetchers, db_logger
+
+
+async def replay(args, episodes: bool) -> dict:
+    """Publish → evaluate synchronously for `args.ticks` ticks; the same seed gives the same quotes in both modes."""
+    matrix, detector, tracker, fetchers, db_logger = build(args, episodes)
+    rng = random.Random(args.seed)
+    for fetcher in fetchers:            # warm up every cell
+        for pair in fetcher.pairs:
+            fetcher.tick(pair)
+    await detector.evaluate_pairs(matrix.pairs)
+    matrix._dirty.clear()
+
+    samples: List[int] = []
+    for _ in range(args.ticks):
+        rng.choice(fetchers).tick()
+        began = time.perf_counter_ns()
+        await detector.evaluate_pairs(matrix._dirty)
+        samples.append(time.perf_counter_ns() - began)
+        matrix._dirty.clear()
+    if tracker is not None:
+        await tracker.close_all()
+    db_logger._flush_task.cancel()
+    samples.sort()
+    return {
+        "tracker": tracker,
+        "db_logger": db_logger,
+        "rows": rows_written(db_logger),
+        "eval_us_p50": samples[len(samples) // 2] / 1000,
+        "eval_us_mean": sum(samples) / len(samples) / 1000,
+    }
+
+
+async def run(args) -> dict:
+    # The same ticks through the detector as shipped without a tracker (an opportunity row per entry)
+    # and with one (an episode row per episode, plus any sampled snapshots)
+    baseline = await replay(args, episodes=False)
+    tracked = await replay(args, episodes=True)
+    tracker, db_logger = tracked["tracker"], tracked["db_logger"]
+    observe_ns = sorted(tracker.samples_ns)
+    return {
+        "entries": len(baseline["db_logger"].arb_buffer),
+        "trades": len(baseline["db_logger"].trade_buffer),
+        "observations": tracker.observations,
+        "episodes": tracker.closed,
+        "observations_per_episode": tracker.observations / max(tracker.closed, 1),
+        "snapshots": len(db_logger.arb_buffer),
+        "baseline_rows": baseline["rows"],
+        "episode_rows": tracked["rows"],
+        "row_reduction_x": baseline["rows"] / max(tracked["rows"], 1),
+        "eval_us_p50_baseline": baseline["eval_us_p50"],
+        "eval_us_p50_episodes": tracked["eval_us_p50"],
+        "eval_us_mean_baseline": baseline["eval_us_mean"],
+        "eval_us_mean_episodes": tracked["eval_us_mean"],
+        "observe_us_p50": observe_ns[len(observe_ns) // 2] / 1000,
+        "observe_us_p99": observe_ns[int(len(observe_ns) * 0.99)] / 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EpisodeTracker: rows written vs per-entry opportunity logging, and its cost per evaluation.")
+    parser.add_argument("--pairs", type=int, default=13)
+    parser.add_argument("--venues", type=int, default=6)
+    parser.add_argument("--ticks", type=int, default=200_000)
+    parser.add_argument("--phi", type=float, default=0.995, help="AR(1) persistence of each venue's offset")
+    parser.add_argument("--offset-pct", type=float, default=0.3, help="stationary std of each venue's offset (%%)")
+    parser.add_argument("--noise-pct", type=float, default=0.02, help="per-tick price noise (%%)")
+    parser.add_argument("--sample-interval", type=float, default=None, help="episode snapshot interval (s); default none")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.getLogger("cex_dex_arbitrage").setLevel(logging.WARNING)
+
+    config = {k: getattr(args, k) for k in ("pairs", "venues", "ticks", "phi", "offset_pct", "noise_pct", "sample_interval", "seed")}
+    # simulate_exit_trade prints a debug block per exit; keep its cost but not its output
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        metrics = asyncio.run(run(args))
+    path = save("episodes", config, metrics)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#  benchmarks/journal.py
+#  python -m benchmarks.journal --events 100000
+
+from benchmarks.report import save
+from db.journal import Journal
+from db.logger import DatabaseLogger
+import tempfile
+import argparse
+import asyncio
+import logging
+import time
+import sys
+
+PRICES = [("Binance", 100.0, 0), ("Coinbase", 100.4, 0), ("Kraken", 100.2, 0), ("Kucoin", 100.1, 0), ("GateIo", 100.3, 0)]
+
+
+async def log_cost_ns(db_logger: DatabaseLogger, n: int) -> float:
+    """Wall ns per `log_opportunity` call (the detector's hot-path cost of logging)."""
+    now = time.time_ns()
+    prices = [(name, price, now) for name, price, _ in PRICES]
+    start = time.perf_counter_ns()
+    for i in range(n):
+        await db_logger.log_opportunity("SOL/USDC", "Binance", 100.0, "Coinbase", 100.4, 0.4, 0.4, prices)
+    return (time.perf_counter_ns() - start) / n
+
+
+def unflushed_logger(journal=None) -> DatabaseLogger:
+    return DatabaseLogger(None, flush_interval=1e9, flush_rows=sys.maxsize, max_rows=sys.maxsize, journal=journal)
+
+
+async def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        plain = unflushed_logger()
+        plain_ns = await log_cost_ns(plain, args.events)
+
+        journal = Journal(directory, sync_interval=args.sync_interval)
+        journal.open()
+        await journal.start()
+        journaled = unflushed_logger(journal)
+        journaled_ns = await log_cost_ns(journaled, args.events)
+        await journal.close()
+
+        # What a restart after a crash has to read back
+        reopened = Journal(directory)
+        reopened.open()
+        start = time.perf_counter()
+        recovered = sum(1 for _ in reopened.replay())
+        replay_sec = time.perf_counter() - start
+        await reopened.close()
+        for db_logger in (plain, journaled):
+            db_logger._flush_task.cancel()
+
+    return {
+        "log_ns_per_event": plain_ns,
+        "log_journaled_ns_per_event": journaled_ns,
+        "journal_overhead_ns_per_event": journaled_ns - plain_ns,
+        "replay_events_per_sec": recovered / replay_sec,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path cost of journaling DB events, and journal replay speed.")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--sync-interval", type=float, default=0.05, help="seconds between batched fsyncs")
+    args = parser.parse_args()
+    logging.getLogger("cex_dex_arbitrage").setLevel(logging.WARNING)
+
+    metrics = asyncio.run(run(args))
+    path = save("journal", {"events": args.events, "sync_interval": args.sync_interval}, metrics)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
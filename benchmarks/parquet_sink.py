@@ -0,0 +1,104 @@
+#  benchmarks/parquet_sink.py
+#  python -m benchmarks.parquet_sink --days 14 --ticks-per-day 1000000
+
+from benchmarks.report import save
+from db.parquet_sink import ParquetSink, read_dataset
+from datetime import datetime, timedelta, timezone
+import pyarrow.dataset as ds
+import tempfile
+import argparse
+import asyncio
+import logging
+import random
+import time
+import os
+
+
+def tick_batches(args, start_ns: int):
+    """TickArchive-shaped batches ((venue, pair, ts_ns, price, bid, ask)) covering `args.days` in time order."""
+    rng = random.Random(args.seed)
+    pairs = [f"P{i:03d}/USDC" for i in range(args.pairs)]
+    venues = [f"Venue{v}" for v in range(args.venues)]
+    total = args.days * args.ticks_per_day
+    step = 86_400 * 10**9 // args.ticks_per_day
+    for first in range(0, total, args.batch_size):
+        batch = []
+        for i in range(first, min(first + args.batch_size, total)):
+            mid = 100 + rng.random()
+            batch.append((venues[i % args.venues], pairs[i // args.venues % args.pairs], start_ns + i * step, mid, mid - 0.01, mid + 0.01))
+        yield batch
+
+
+def directory_bytes(root: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+async def run(args, root: str) -> dict:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    start_ns = int(start.timestamp()) * 10**9
+    sink = ParquetSink(root, row_group_rows=args.row_group_rows, roll_seconds=args.roll_seconds)
+    write_sec = 0.0
+    total = 0
+    for batch in tick_batches(args, start_ns):
+        began = time.perf_counter()
+        await sink.write_ticks(batch)
+        write_sec += time.perf_counter() - began
+        total += len(batch)
+    began = time.perf_counter()
+    await sink.close()
+    write_sec += time.perf_counter() - began
+
+    # Research-style scans over the whole range
+    dataset = read_dataset("price_ticks", root)
+    began = time.perf_counter()
+    table = dataset.to_table(columns=["pair", "exchange_name", "price"]).unify_dictionaries()
+    spread = table.group_by(["pair", "exchange_name"]).aggregate([("price", "mean"), ("price", "count")])
+    full_scan = time.perf_counter() - began
+    assert sum(spread["price_count"].to_pylist()) == total
+
+    # One pair over one day: partition pruning skips every other file
+    day = (start + timedelta(days=args.days // 2)).date().isoformat()
+    began = time.perf_counter()
+    one = dataset.to_table(
+        filter=(ds.field("pair") == "P000/USDC") & (ds.field("date") == day), columns=["timestamp", "price", "bid", "ask"]
+    )
+    pruned_scan = time.perf_counter() - began
+    assert one.num_rows > 0
+
+    size = directory_bytes(os.path.join(root, "price_ticks"))
+    return {
+        "write_ticks_per_sec": total / write_sec,
+        "bytes_per_tick": size / total,
+        "size_mb": size / 2**20,
+        "full_scan_sec": full_scan,
+        "full_scan_ticks_per_sec": total / full_scan,
+        "pair_day_scan_ms": pruned_scan * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ParquetSink: tick write throughput, on-disk size and research scans over weeks of ticks.")
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--ticks-per-day", type=int, default=1_000_000)
+    parser.add_argument("--pairs", type=int, default=13)
+    parser.add_argument("--venues", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=20_000, help="ticks per write_ticks call (TickArchive batch)")
+    parser.add_argument("--row-group-rows", type=int, default=100_000)
+    parser.add_argument("--roll-seconds", type=float, default=300)
+    parser.add_argument("--dir", default=None, help="output directory (default: a temporary one, removed afterwards)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.getLogger("cex_dex_arbitrage").setLevel(logging.WARNING)
+
+    if args.dir:
+        metrics = asyncio.run(run(args, args.dir))
+    else:
+        with tempfile.TemporaryDirectory() as root:
+            metrics = asyncio.run(run(args, root))
+    config = {k: getattr(args, k) for k in ("days", "ticks_per_day", "pairs", "venues", "batch_size", "row_group_rows", "seed")}
+    path = save("parquet_sink", config, metrics)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
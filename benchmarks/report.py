@@ -0,0 +1,80 @@
+#  benchmarks/report.py
+
+from datetime import datetime, timezone
+from typing import Optional
+import subprocess
+import argparse
+import shutil
+import json
+import os
+
+# Every run lands in results/ (untracked); baselines/<name>.json is the committed reference run per benchmark
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+BASELINES_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def baseline(name: str) -> Optional[dict]:
+    """The committed baseline run of benchmark `name`, if any."""
+    try:
+        with open(os.path.join(BASELINES_DIR, f"{name}.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save(name: str, config: dict, metrics: dict) -> str:
+    """
+    Write this run to results/<name>-<stamp>.json and print the change against the committed baseline
+    when it used the same config, else against the last local run with the same config.
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    previous = baseline(name)
+    label = "baseline"
+    if previous is None or previous.get("config") != config:
+        previous, label = None, "previous"
+        for filename in sorted(os.listdir(RESULTS_DIR)):
+            if not filename.startswith(f"{name}-"):
+                continue
+            with open(os.path.join(RESULTS_DIR, filename)) as f:
+                data = json.load(f)
+            if data.get("config") == config:
+                previous = data
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(RESULTS_DIR, f"{name}-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump({"timestamp": stamp, "revision": git_revision(), "config": config, "metrics": metrics}, f, indent=2)
+
+    print(f"{'metric':<34}{'value':>14}{label:>14}{'change':>10}")
+    for key, value in metrics.items():
+        old = previous["metrics"].get(key) if previous else None
+        change = f"{(value - old) / old * 100:+.1f}%" if isinstance(old, (int, float)) and old and value is not None else ""
+        fmt = lambda v: "" if v is None else f"{v:,.1f}"
+        print(f"{key:<34}{fmt(value):>14}{fmt(old):>14}{change:>10}")
+    if previous:
+        print(f"({label}: {previous['timestamp']} @ {previous.get('revision')})")
+    return path
+
+
+def promote(path: str) -> str:
+    """Make the run saved at `path` the committed baseline of its benchmark."""
+    name = os.path.basename(path).rsplit("-", 1)[0]
+    os.makedirs(BASELINES_DIR, exist_ok=True)
+    target = os.path.join(BASELINES_DIR, f"{name}.json")
+    shutil.copyfile(path, target)
+    return target
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.report --promote benchmarks/results/detection-<stamp>.json
+    parser = argparse.ArgumentParser(description="Benchmark results: promote a run to its benchmark's committed baseline.")
+    parser.add_argument("--promote", nargs="+", required=True, metavar="RESULT", help="result files to promote")
+    for result in parser.parse_args().promote:
+        print(f"{result} -> {promote(result)}")
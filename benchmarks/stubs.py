@@ -0,0 +1,82 @@
+#  benchmarks/stubs.py
+
+from exchanges.base import ExchangeFetcher
+from utils.timestamps import to_datetime
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import random
+import time
+
+
+# --- Synthetic fetcher ---
+class SyntheticFetcher(ExchangeFetcher):
+    """
+    Stand-in for a WebSocket fetcher: publishes random-walk quotes for `pairs` at `rate` ticks/s
+    through the normal `_publish` path, so everything downstream (MarketMatrix, detector,
+    DB logger) runs exactly as in production.
+
+    Every venue's price tracks a shared per-pair mid (`mids`) plus its own noise, so cross-venue
+    spreads occasionally cross the entry threshold and exercise the logging path too.
+    """
+
+    taker_fee_percent = 0.1
+
+    def __init__(
+        self,
+        name: str,
+        pairs: List[str],
+        rate: float,
+        mids: Dict[str, float],
+        noise_pct: float = 0.3,
+        half_spread_pct: float = 0.01,
+        seed: Optional[int] = None,
+        on_tick: Optional[Callable[[str], None]] = None
+    ):
+        super().__init__(name, "MULTI")
+        self.pairs = pairs
+        self.rate = rate
+        self.mids = mids
+        self.noise_pct = noise_pct
+        self.half_spread_pct = half_spread_pct
+        self.rng = random.Random(seed)
+        self.on_tick = on_tick
+        self.ticks = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def tick(self, pair: Optional[str] = None):
+        """Publish one quote (random pair unless given)."""
+        pair = pair or self.rng.choice(self.pairs)
+        mid = self.mids[pair] = self.mids[pair] * (1 + self.rng.gauss(0, 0.0002))
+        price = mid * (1 + self.rng.gauss(0, self.noise_pct / 100))
+        if self.on_tick is not None:
+            self.on_tick(pair)
+        half = price * self.half_spread_pct / 100
+        self._publish(pair, price, time.time_ns(), price - half, price + half)
+        self.ticks += 1
+
+    async def connect(self):
+        """Background generator: keeps the cumulative tick count on schedule, yielding between bursts."""
+        async def generator():
+            start = time.perf_counter()
+            while True:
+                due = int((time.perf_counter() - start) * self.rate) - self.ticks
+                for _ in range(due):
+                    self.tick()
+                await asyncio.sleep(0.001)
+
+        self._task = asyncio.create_task(generator())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def get_price(self, symbol: str) -> Optional[Tuple[float, datetime]]:
+        quote = self.latest_prices.get(symbol)
+        if quote is not None:
+            return quote.price, to_datetime(quote.ts_ns)
+        return None, None
@@ -15,10 +15,47 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "PJALHDTSkaKuJwWWfcqIzCmFUGlHFaJk")
 DB_NAME = os.getenv("DB_NAME", "railway")
 DB_HOST = os.getenv("DB_HOST", "postgres.railway.internal")
 DB_PORT = int(os.getenv("DB_PORT", 5432))
+# Skip the Rich live dashboard (e.g. under the Procfile worker, where nobody watches the terminal)
+HEADLESS = os.getenv("HEADLESS", "false").lower() in ("1", "true", "yes")
+# Also search for triangular / multi-hop loops over the rate graph
+MULTI_HOP = os.getenv("MULTI_HOP", "false").lower() in ("1", "true", "yes")
+# Split the pairs across this many worker processes (0/1 = everything on one event loop)
+SHARDS = int(os.getenv("SHARDS", 0))
+# Name of a shared-memory quote board to publish every quote into (readable from other processes)
+QUOTE_BOARD = os.getenv("QUOTE_BOARD")
+# Take over an existing board of that name (e.g. left behind by a crashed run) instead of refusing to start
+QUOTE_BOARD_REPLACE = os.getenv("QUOTE_BOARD_REPLACE", "false").lower() in ("1", "true", "yes")
+# Keep top-N order books on the CEX fetchers and price entries at trade size (0 = last trade price only)
+BOOK_DEPTH = int(os.getenv("BOOK_DEPTH", 0))
+# Stream Binance from the native bookTicker socket instead of ccxt (no order-book depth on Binance then)
+BINANCE_NATIVE = os.getenv("BINANCE_NATIVE", "false").lower() in ("1", "true", "yes")
+# Stream Hyperliquid mids from the native allMids channel (one socket) instead of ccxt tickers
+HYPERLIQUID_ALL_MIDS = os.getenv("HYPERLIQUID_ALL_MIDS", "false").lower() in ("1", "true", "yes")
+# Also poll Jupiter quotes (rate-limited by JUPITER_RATE_LIMIT requests/s; single-process mode only)
+JUPITER = os.getenv("JUPITER", "false").lower() in ("1", "true", "yes")
+# Archive every quote from every venue into the daily-partitioned price_ticks table
+TICK_ARCHIVE = os.getenv("TICK_ARCHIVE", "false").lower() in ("1", "true", "yes")
+# DB write buffers: hard cap in rows, and what log calls do when it is reached ("block" or "drop")
+DB_MAX_BUFFERED_ROWS = int(os.getenv("DB_MAX_BUFFERED_ROWS", 100_000))
+DB_OVERFLOW_POLICY = os.getenv("DB_OVERFLOW_POLICY", "block").lower()
+# Journal every opportunity / trade to local disk before buffering it (crash recovery; "false" to disable)
+DB_JOURNAL = os.getenv("DB_JOURNAL", "true").lower() in ("1", "true", "yes")
+# Where opportunities, trades and archived ticks go: "postgres" or "parquet" (files under PARQUET_DIR, no database)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "postgres").lower()
+# Drop daily partitions older than this many days (0 keeps everything); ticks have their own, shorter horizon
+DB_RETENTION_DAYS = int(os.getenv("DB_RETENTION_DAYS", 0))
+TICK_RETENTION_DAYS = int(os.getenv("TICK_RETENTION_DAYS", 7))
+# Log opportunities as one row per above-threshold episode of a pair's best route instead of one row per entry,
+# plus an opportunity snapshot with every venue's quote every EPISODE_SAMPLE_INTERVAL seconds of an episode (0 = none)
+EPISODES = os.getenv("EPISODES", "false").lower() in ("1", "true", "yes")
+EPISODE_SAMPLE_INTERVAL = float(os.getenv("EPISODE_SAMPLE_INTERVAL", 0))
+# Resubscribe a venue feed after this many seconds without a message
+FEED_STALL_TIMEOUT = float(os.getenv("FEED_STALL_TIMEOUT", 30))
 
 # Exchange Fetchers
 # Cex
 from exchanges.binance import BinanceFetcher
+from exchanges.binance_native import BinanceBookTickerFetcher
 from exchanges.coinbase import CoinbaseFetcher
 from exchanges.kraken import KrakenFetcher
 from exchanges.kucoin import KucoinFetcher
@@ -30,21 +67,93 @@ from exchanges.hyperliquid import HyperliquidFetcher
 # Core Modules
 from core.market_matrix import MarketMatrix, shutdown
 from core.arbitrage_runner import run_arbitrage_for_all_pairs
+from core.sharding import ShardedFeed
+from core.quote_board import QuoteBoard
+from exchanges.supervisor import FeedSupervisor
+
+# Venues streamed by shard workers when SHARDS > 1 (same set as the single-process setup below)
+SHARDED_VENUES = {
+    "Binance": BinanceBookTickerFetcher if BINANCE_NATIVE else BinanceFetcher,
+    "Coinbase": CoinbaseFetcher,
+    "Kraken": KrakenFetcher,
+    "Kucoin": KucoinFetcher,
+    "GateIo": GateIo,
+    # "Bybit": BybitFetcher,
+    "Hyperliquid": HyperliquidFetcher,
+}
 
 # Database Logger
-from db.logger import DatabaseLogger, ensure_database, ensure_tables 
+from db.logger import TABLES, DatabaseLogger, ensure_database, ensure_tables 
+from db.tick_archive import TickArchive
+from db.journal import Journal
+from db.partitions import DailyPartitions, PartitionRoller
+from db.parquet_sink import ParquetSink
+
+# One view of which daily partitions exist, shared by every writer and the retention job
+partitions = DailyPartitions()
 
 async def setup_database():
         ensure_database(DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT)
         pool = await asyncpg.create_pool(user=DB_USER, password=DB_PASSWORD, database=DB_NAME, host=DB_HOST, port=DB_PORT)
-        await ensure_tables(pool)
+        await ensure_tables(pool, partitions)
         return pool
+def check_sharded_settings():
+    """Refuse settings the shard workers can't honour instead of silently running without them."""
+    if SHARDS <= 1:
+        return
+    single_process_only = [
+        name for name, enabled in (
+            ("BOOK_DEPTH", BOOK_DEPTH > 0),
+            ("HYPERLIQUID_ALL_MIDS", HYPERLIQUID_ALL_MIDS),
+            ("JUPITER", JUPITER),
+        ) if enabled
+    ]
+    if single_process_only:
+        raise SystemExit(f"SHARDS={SHARDS} can't be combined with {', '.join(single_process_only)}: single-process mode only.")
+    if not HEADLESS:
+        logging.warning("SHARDS>1: feed health is supervised (and logged) inside the shard workers, so the dashboard has no Feeds section.")
+
 # --- Main entry ---
 async def main():
+    check_sharded_settings()
 
-    db_pool = await setup_database()
-        
-    db_logger = DatabaseLogger(db_pool)
+    db_pool = None
+    sink = None
+    if STORAGE_BACKEND not in ("postgres", "parquet"):
+        raise SystemExit(f"STORAGE_BACKEND must be 'postgres' or 'parquet', not {STORAGE_BACKEND!r}")
+    if STORAGE_BACKEND == "parquet":
+        try:
+            sink = ParquetSink()   # PARQUET_DIR, default data/parquet
+        except ImportError as e:
+            raise SystemExit(f"STORAGE_BACKEND=parquet: {e}")
+    else:
+        db_pool = await setup_database()
+
+    journal = None
+    if DB_JOURNAL:
+        journal = Journal()   # DB_JOURNAL_DIR, default .db_journal
+        journal.open()
+        await journal.start()
+    db_logger = DatabaseLogger(
+        db_pool, max_rows=DB_MAX_BUFFERED_ROWS, overflow=DB_OVERFLOW_POLICY, journal=journal,
+        partitions=partitions, backend=sink
+    )
+    # Write whatever the previous run journaled but never got stored
+    await db_logger.recover()
+    sharded_feed = None
+    quote_board = None
+    supervisor = FeedSupervisor(stall_timeout=FEED_STALL_TIMEOUT)
+    tick_archive = None
+    retention = {table: DB_RETENTION_DAYS or None for table in TABLES}
+    if TICK_ARCHIVE:
+        tick_archive = TickArchive(db_pool, partitions=partitions, sink=sink)
+        await tick_archive.start()
+        retention["price_ticks"] = TICK_RETENTION_DAYS or None
+    # Pre-creates the next days' partitions and drops the ones past retention, hourly
+    partition_roller = None
+    if db_pool is not None:
+        partition_roller = PartitionRoller(db_pool, retention, partitions=partitions)
+        await partition_roller.start()
 
     try:
         async with aiohttp.ClientSession() as session:
@@ -67,42 +176,48 @@ async def main():
                 'ATOM/USDC',
             ]
             
-            # Instantiate batch fetchers
-            binance_fetcher = BinanceFetcher(pairs)
-            await binance_fetcher.connect()
-            for pair in pairs:
-                matrix.add_fetcher(pair, binance_fetcher)
-
-            coinbase_fetcher = CoinbaseFetcher(pairs)
-            await coinbase_fetcher.connect()
-            for pair in pairs:
-                matrix.add_fetcher(pair, coinbase_fetcher)
-
-            kraken_fetcher = KrakenFetcher(pairs)
-            await kraken_fetcher.connect()
-            for pair in pairs:
-                matrix.add_fetcher(pair, kraken_fetcher)
-
-            kucoin_fetcher = KucoinFetcher(pairs)
-            await kucoin_fetcher.connect()
-            for pair in pairs:
-                matrix.add_fetcher(pair, kucoin_fetcher)
-            
-            gateio_fetcher = GateIo(pairs)
-            await gateio_fetcher.connect()
-            for pair in pairs:
-                matrix.add_fetcher(pair, gateio_fetcher)
+            if SHARDS > 1:
+                # Each worker process owns the fetchers for its slice of pairs; this process
+                # only merges their quotes, makes the decisions and logs to the DB.
+                if QUOTE_BOARD:
+                    quote_board = QuoteBoard.create(QUOTE_BOARD, pairs, list(SHARDED_VENUES), replace=QUOTE_BOARD_REPLACE)
+                sharded_feed = ShardedFeed(
+                    SHARDED_VENUES, pairs, SHARDS, board_name=QUOTE_BOARD, stall_timeout=FEED_STALL_TIMEOUT, supervisor=supervisor
+                )
+                sharded_feed.start()
+                for proxy in sharded_feed.proxies.values():
+                    for pair in pairs:
+                        matrix.add_fetcher(pair, proxy)
+                    if tick_archive is not None:
+                        proxy.subscribe(tick_archive.on_quote)
+                await run_arbitrage_for_all_pairs(
+                    matrix, db_logger, headless=HEADLESS, multi_hop=MULTI_HOP, supervisor=supervisor,
+                    episodes=EPISODES, episode_sample_interval=EPISODE_SAMPLE_INTERVAL or None
+                )
+                return
 
-            # bybit_fetcher = BybitFetcher(pairs)
-            # await bybit_fetcher.connect()
-            # for pair in pairs:
-            #     matrix.add_fetcher(pair, bybit_fetcher)
-
-            #  DEX fetcher
-            hyperliquid_ws = HyperliquidFetcher(pairs)
-            await hyperliquid_ws.connect()
-            for pair in pairs:
-                matrix.add_fetcher(pair, hyperliquid_ws)
+            # Instantiate batch fetchers
+            fetchers = [
+                BinanceBookTickerFetcher(pairs) if BINANCE_NATIVE else BinanceFetcher(pairs, depth=BOOK_DEPTH),
+                CoinbaseFetcher(pairs, depth=BOOK_DEPTH),
+                KrakenFetcher(pairs, depth=BOOK_DEPTH),
+                KucoinFetcher(pairs, depth=BOOK_DEPTH),
+                GateIo(pairs, depth=BOOK_DEPTH),
+                # BybitFetcher(pairs, depth=BOOK_DEPTH),
+                #  DEX fetcher
+                HyperliquidFetcher(pairs, all_mids=HYPERLIQUID_ALL_MIDS),
+            ]
+            if JUPITER:
+                fetchers.append(JupiterFetcher(pairs, session))
+            # Subscribe before connecting so no early quote is missed, then bring every venue up
+            # at once (markets come from the on-disk cache when it is fresh, see utils/market_cache.py)
+            for fetcher in fetchers:
+                fetcher.supervisor = supervisor
+                for pair in pairs:
+                    matrix.add_fetcher(pair, fetcher)
+                if tick_archive is not None:
+                    fetcher.subscribe(tick_archive.on_quote)
+            await asyncio.gather(*(fetcher.connect() for fetcher in fetchers))
             
             # Uncomment the following lines if you want to initialize individual fetchers for each pair
             # for pair in pairs:
@@ -145,9 +260,32 @@ async def main():
             #     await hyperliquid_ws.connect()
             #     matrix.add_fetcher(pair, hyperliquid_ws)
 
-            await run_arbitrage_for_all_pairs(matrix, db_logger)
+            if QUOTE_BOARD:
+                quote_board = QuoteBoard.create(QUOTE_BOARD, matrix.pairs, matrix.exchanges, replace=QUOTE_BOARD_REPLACE)
+                for fetchers in matrix.fetchers.values():
+                    for fetcher in fetchers:
+                        fetcher.subscribe(quote_board.on_quote)
+
+            await run_arbitrage_for_all_pairs(
+                matrix, db_logger, headless=HEADLESS, multi_hop=MULTI_HOP, supervisor=supervisor,
+                episodes=EPISODES, episode_sample_interval=EPISODE_SAMPLE_INTERVAL or None
+            )
     finally:
+        await supervisor.stop()
+        if partition_roller is not None:
+            await partition_roller.close()
+        if sharded_feed is not None:
+            sharded_feed.stop()
+        if quote_board is not None:
+            quote_board.close()
         await shutdown(matrix)
         await db_logger.close()
-        await db_pool.close()
+        if journal is not None:
+            await journal.close()
+        if tick_archive is not None:
+            await tick_archive.close()
+        if sink is not None:
+            await sink.close()
+        if db_pool is not None:
+            await db_pool.close()
         logging.info("Shutting down all exchanges and WebSockets.")
@@ -1,175 +1,51 @@
 #  core/arbitrage_runner.py
 
-from core.trade_simulator import simulate_entry_trade, simulate_exit_trade
-from datetime import datetime, timezone, timedelta
-from typing import Dict, List
+from core.detector import ArbitrageDetector
+from core.episodes import EpisodeTracker
+from core.rate_graph import RateGraph
+from typing import Optional
 import asyncio
-from rich.console import Console
-from rich.table import Table
-from rich.live import Live
 import logging
 logger = logging.getLogger("cex_dex_arbitrage.core.arbitrage_runner")
-IST = timezone(timedelta(hours=5, minutes=30))  # Indian Standard Time
-async def run_arbitrage_for_all_pairs(matrix, db_logger):
-    console = Console()
-    SPREAD_THRESHOLD = 0.05
-    PERCENT_THRESHOLD = 0.50
-    CONVERGENCE_THRESHOLD = 0.10
 
-    open_positions: Dict[str, dict] = {}
-    paper_trades: List[dict] = []
 
-    async def build_table():
-        table = Table(title="📈 Live Price Monitor")
-        table.add_column("Exchange", justify="left", style="cyan", no_wrap=True)
-        table.add_column("Price", justify="right", style="green")
-        table.add_column("Timestamp", justify="right", style="white")
-
-        best_buy = None
-        best_sell = None
-        best_spread = 0
-
-        for pair, fetchers in matrix.fetchers.items():
-            prices = []
-            for fetcher in fetchers:
-                try:
-                    result = await fetcher.get_price(pair)
-                    if result:
-                        price, ts = result
-                        ist_ts = ts.astimezone(IST)
-                        prices.append((fetcher.name, price, ist_ts.strftime("%H:%M:%S.%f")[:-3]))
-                except Exception:
-                    continue
-
-            if len(prices) < 2:
-                continue
-
-            prices.sort(key=lambda x: x[1])
-            # await db_logger.log_prices(pair, prices) # Uncomment if you want to log prices
-            low_name, low_price, _ = prices[0]
-            high_name, high_price, _ = prices[-1]
-            spread = high_price - low_price
-            spread_pct = (spread / low_price) * 100
-
-            table.add_section()
-            table.add_row(f"[bold white]{pair} Prices[/bold white]", "", "")
-            for name, price, ts_str in prices:
-                table.add_row(name, f"{price:.4f}", ts_str)
-            table.add_section()
-            table.add_row(
-                f"[bold white]{pair} Min/Max[/bold white]",
-                f"{low_name} @ {low_price:.2f}, {high_name} @ {high_price:.2f}",
-                "",
-            )
-            table.add_row(
-                f"[bold white]{pair} Spread[/bold white]",
-                f"{spread:.4f} ({spread_pct:.2f}%)",
-                ""
-            )
-
-            # ENTRY
-            if spread_pct >= PERCENT_THRESHOLD and pair not in open_positions:
-                position = simulate_entry_trade(
-                    buy_price=low_price,
-                    sell_price=high_price,
-                    trade_amount_usdc=1000.0,
-                    fee_percent=0.1,
-                    slippage_percent=0.05
-                )
-                position.update({
-                    "entry_time": datetime.now(timezone.utc),
-                    "pair": pair,
-                    "buy_exchange": low_name,
-                    "sell_exchange": high_name,
-                    "entry_spread": spread_pct,
-                    "buy_price": low_price,
-                    "sell_price": high_price
-                })
-                open_positions[pair] = position
-
-                console.log(f"[bold green]ENTRY:[/bold green] {pair} | BUY on {low_name} @ {low_price:.2f}, SHORT on {high_name} @ {high_price:.2f} | Spread: {spread_pct:.2f}%")
-                logger.debug(f"ENTRY: {pair} | BUY on {low_name} @ {low_price:.2f}, SHORT on {high_name} @ {high_price:.2f} | Spread: {spread_pct:.2f}%")
-                # net_profit, gross_profit = simulate_exit_trade(position, low_price, high_price)
-                await db_logger.log_opportunity(
-                    pair, low_name, low_price, high_name, high_price,
-                    spread, spread_pct, prices
-                )
-
-            # EXIT
-            elif pair in open_positions and spread_pct <= CONVERGENCE_THRESHOLD:
-                position = open_positions[pair]
-
-                def get_price(name):
-                    for ex, pr, _ in prices:
-                        if ex == name:
-                            return pr
-                    return None
-
-                exit_buy = get_price(position["buy_exchange"])
-                exit_sell = get_price(position["sell_exchange"])
-
-                if exit_buy and exit_sell:
-                    net_profit, gross_profit = simulate_exit_trade(position, exit_buy, exit_sell)
-                    duration = (datetime.now(timezone.utc) - position["entry_time"]).total_seconds()
-                    paper_trades.append({
-                        "pair": pair,
-                        "entry_spread": position["entry_spread"],
-                        "net_profit": net_profit,
-                        "duration_sec": duration,
-                        "buy_exchange": position["buy_exchange"],
-                        "sell_exchange": position["sell_exchange"]
-                    })
-                    console.log(f"[bold red]EXIT:[/bold red] {pair} | NP: ${net_profit:.2f} | Duration: {duration:.1f}s | Converged.")
-                    logger.debug(f"EXIT: {pair} | NP: ${net_profit:.2f} | Duration: {duration:.1f}s | Converged.")
-                    await db_logger.log_trade(
-                        timestamp=position["entry_time"],
-                        pair=pair,
-                        buy_exchange=position["buy_exchange"],
-                        buy_price=position["buy_price"],
-                        sell_exchange=position["sell_exchange"],
-                        sell_price=position["sell_price"],
-                        spread=position["sell_price"] - position["buy_price"],
-                        spread_pct=position["entry_spread"],
-                        net_profit=net_profit,
-                        gross_profit=gross_profit,
-                        event_type="EXIT",
-                        close_timestamp=datetime.now(timezone.utc),
-                        exit_buy_price=exit_buy,
-                        exit_sell_price=exit_sell,
-                        duration_seconds=int(duration),
-                        decision_reason="spread_converged",
-                        metadata=None
-                    )
-
-                    del open_positions[pair]
-
-        # Display open positions
-        if open_positions:
-            table.add_section()
-            table.add_row("[bold magenta]Open Positions[/bold magenta]", "", "")
-            for pair, pos in open_positions.items():
-                duration = (datetime.now(timezone.utc) - pos["entry_time"]).total_seconds()
-                table.add_row(
-                    f"{pair} (open)",
-                    f"{pos['entry_spread']:.2f}%",
-                    f"{duration:.1f}s"
-                )
-                table.add_row(
-                    f"↳ Buy on {pos['buy_exchange']}",
-                    f"{pos['buy_price']:.2f}",
-                    ""
-                )
-                table.add_row(
-                    f"↳ Short on {pos['sell_exchange']}",
-                    f"{pos['sell_price']:.2f}",
-                    ""
-                )
-
-        return table
-
-
-    with Live(await build_table(), refresh_per_second=4, console=console) as live:
-        while True:
-            table = await build_table()
-            live.update(table)
-            await asyncio.sleep(0.2)
+async def run_arbitrage_for_all_pairs(
+    matrix,
+    db_logger,
+    headless: bool = False,
+    multi_hop: bool = False,
+    supervisor=None,
+    episodes: bool = False,
+    episode_sample_interval: Optional[float] = None
+):
+    """
+    Run the detection engine, plus the Rich dashboard as an independent subscriber unless `headless`.
+    Rendering runs in its own task at its own rate, so display cost never delays an entry or exit.
+    `multi_hop` also searches a rate graph for triangular / multi-venue loops on every update.
+    `supervisor` (a FeedSupervisor) adds per-venue feed health to the dashboard.
+    `episodes` logs opportunities as one row per above-threshold episode (arbitrage_episodes) instead of
+    one per entry, plus an opportunity snapshot every `episode_sample_interval` seconds while one is open.
+    """
+    rate_graph = RateGraph(matrix) if multi_hop else None
+    tracker = EpisodeTracker(matrix, db_logger, sample_interval=episode_sample_interval) if episodes else None
+    detector = ArbitrageDetector(matrix, db_logger, rate_graph=rate_graph, episodes=tracker)
+
+    dashboard_task = None
+    if headless:
+        logger.info("Running headless: live dashboard disabled.")
+    else:
+        # Imported lazily so headless workers never load Rich
+        from core.dashboard import run_dashboard
+        dashboard_task = asyncio.create_task(run_dashboard(detector, supervisor=supervisor))
+    try:
+        await detector.run()
+    finally:
+        if dashboard_task is not None:
+            dashboard_task.cancel()
+            try:
+                await dashboard_task
+            except asyncio.CancelledError:
+                pass
+        if tracker is not None:
+            # Episodes still open are logged before the DB logger's final flush
+            await tracker.close_all()
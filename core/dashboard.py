@@ -0,0 +1,110 @@
+#  core/dashboard.py
+
+from datetime import datetime, timezone, timedelta
+from rich.console import Console
+from rich.table import Table
+from rich.live import Live
+import asyncio
+import logging
+logger = logging.getLogger("cex_dex_arbitrage.core.dashboard")
+IST = timezone(timedelta(hours=5, minutes=30))  # Indian Standard Time
+
+
+def build_table(detector, supervisor=None) -> Table:
+    """Render the detector's current snapshots and open positions (and feed health, given a FeedSupervisor)."""
+    table = Table(title="📈 Live Price Monitor")
+    table.add_column("Exchange", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Price", justify="right", style="green")
+    table.add_column("Timestamp", justify="right", style="white")
+
+    # Keep the matrix order so sections don't jump around as pairs update
+    for pair in detector.matrix.fetchers:
+        snap = detector.snapshots.get(pair)
+        if snap is None:
+            continue
+
+        table.add_section()
+        table.add_row(f"[bold white]{pair} Prices[/bold white]", "", "")
+        for name, price, ts in detector.matrix.quotes(pair):
+            table.add_row(name, f"{price:.4f}", ts.astimezone(IST).strftime("%H:%M:%S.%f")[:-3])
+        table.add_section()
+        table.add_row(
+            f"[bold white]{pair} Best Route[/bold white]",
+            f"{snap['low_name']} @ {snap['low_price']:.2f} → {snap['high_name']} @ {snap['high_price']:.2f}",
+            "",
+        )
+        table.add_row(
+            f"[bold white]{pair} Spread[/bold white]",
+            f"{snap['spread']:.4f} ({snap['spread_pct']:.2f}%)",
+            f"net {snap['net_pct']:.2f}%"
+        )
+
+    # Ranked routes across all pairs, net of venue costs
+    top = detector.top_routes(5)
+    if top:
+        table.add_section()
+        table.add_row("[bold yellow]Top Routes (net)[/bold yellow]", "", "")
+        for route in top:
+            table.add_row(
+                f"{route['pair']} {route['buy_exchange']} → {route['sell_exchange']}",
+                f"{route['buy_price']:.2f} → {route['sell_price']:.2f}",
+                f"{route['net_pct']:.2f}%"
+            )
+
+    # Multi-hop loops from the rate graph, if enabled
+    if detector.cycles:
+        table.add_section()
+        table.add_row("[bold yellow]Multi-hop Cycles[/bold yellow]", "", "")
+        for cycle in detector.cycles[:3]:
+            table.add_row(
+                " → ".join(asset for asset, _ in cycle["path"]),
+                ", ".join(cycle["venues"]),
+                f"{cycle['profit_pct']:.3f}%"
+            )
+
+    # Display open positions
+    if detector.open_positions:
+        table.add_section()
+        table.add_row("[bold magenta]Open Positions[/bold magenta]", "", "")
+        for pair, pos in detector.open_positions.items():
+            duration = (datetime.now(timezone.utc) - pos["entry_time"]).total_seconds()
+            table.add_row(
+                f"{pair} (open)",
+                f"{pos['entry_spread']:.2f}%",
+                f"{duration:.1f}s"
+            )
+            table.add_row(
+                f"↳ Buy on {pos['buy_exchange']}",
+                f"{pos['buy_price']:.2f}",
+                ""
+            )
+            table.add_row(
+                f"↳ Short on {pos['sell_exchange']}",
+                f"{pos['sell_price']:.2f}",
+                ""
+            )
+
+    # Per-venue feed health from the connection supervisor
+    if supervisor is not None:
+        table.add_section()
+        table.add_row("[bold blue]Feeds[/bold blue]", "", "")
+        for venue, health in supervisor.stats().items():
+            age = health["last_message_age"]
+            status = "[green]up[/green]" if health["connected"] else "[red]down[/red]"
+            table.add_row(
+                f"{venue} {status}",
+                f"{health['reconnects']} reconnects, {health['downtime_sec']:.0f}s down",
+                "-" if age is None else f"{age:.1f}s ago"
+            )
+
+    return table
+
+
+async def run_dashboard(detector, refresh_per_second: float = 4, supervisor=None):
+    """Optional Rich view: samples the detector at its own rate, never on the detection path."""
+    console = Console()
+    interval = 1 / refresh_per_second
+    with Live(build_table(detector, supervisor), refresh_per_second=refresh_per_second, console=console) as live:
+        while True:
+            await asyncio.sleep(interval)
+            live.update(build_table(detector, supervisor))
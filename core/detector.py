@@ -0,0 +1,214 @@
+#  core/detector.py
+
+from core.trade_simulator import simulate_entry_trade, simulate_exit_trade
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+import numpy as np
+import logging
+logger = logging.getLogger("cex_dex_arbitrage.core.detector")
+
+SPREAD_THRESHOLD = 0.05
+PERCENT_THRESHOLD = 0.50
+CONVERGENCE_THRESHOLD = 0.10
+TRADE_AMOUNT_USDC = 1000.0
+FEE_PERCENT = 0.1
+SLIPPAGE_PERCENT = 0.05
+MAX_QUOTE_AGE = 60.0  # seconds; older quotes can't take part in a route
+
+
+# --- Detection engine (no UI) ---
+class ArbitrageDetector:
+    """
+    Evaluates pairs as their quotes change, opens/closes paper positions and logs to the DB.
+
+    Knows nothing about rendering: views read `snapshots` and `open_positions` at their own pace.
+    """
+
+    def __init__(
+        self,
+        matrix,
+        db_logger,
+        percent_threshold: float = PERCENT_THRESHOLD,
+        convergence_threshold: float = CONVERGENCE_THRESHOLD,
+        trade_amount_usdc: float = TRADE_AMOUNT_USDC,
+        fee_percent: float = FEE_PERCENT,
+        slippage_percent: float = SLIPPAGE_PERCENT,
+        max_quote_age: float = MAX_QUOTE_AGE,
+        rate_graph=None,
+        episodes=None
+    ):
+        self.matrix = matrix
+        self.db_logger = db_logger
+        self.percent_threshold = percent_threshold
+        self.convergence_threshold = convergence_threshold
+        self.trade_amount_usdc = trade_amount_usdc
+        self.fee_percent = fee_percent
+        self.slippage_percent = slippage_percent
+        self.max_quote_age = max_quote_age
+        # Optional RateGraph for triangular / multi-hop loops
+        self.rate_graph = rate_graph
+        # Optional EpisodeTracker: logs opportunities as one row per episode (plus sampled snapshots)
+        # instead of one opportunity row per entry
+        self.episodes = episodes
+
+        self.open_positions: Dict[str, dict] = {}
+        self.paper_trades: List[dict] = []
+        # Best route (buy at low = ask, sell at high = bid) and its raw/net spread per pair; per-venue quotes live in the matrix
+        self.snapshots: Dict[str, dict] = {}
+        # Profitable multi-hop loops found on the latest update (best first)
+        self.cycles: List[dict] = []
+
+    async def run(self):
+        """Sleep until a fetcher reports a new quote, then re-evaluate only the pairs that changed."""
+        while True:
+            dirty = await self.matrix.wait_dirty()
+            await self.evaluate_pairs(dirty)
+            if self.rate_graph is not None:
+                self.scan_cycles(dirty)
+
+    async def evaluate_pairs(self, pairs: Iterable[str]):
+        """
+        Build the buy×sell route matrix for `pairs` in one vectorized pass, then take entry/exit
+        decisions on each pair's best route net of venue costs (not just its min/max venues).
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+        routes = self.matrix.routes(pairs, max_age=self.max_quote_age)
+        buy_cols, sell_cols, net_pcts = self.matrix.best_routes(routes)
+        if self.episodes is not None:
+            await self.episodes.observe(pairs, routes, buy_cols, sell_cols)
+        exchanges = self.matrix.exchanges
+        asks = self.matrix.asks
+        bids = self.matrix.bids
+        for i, pair in enumerate(pairs):
+            if not np.isfinite(net_pcts[i]):
+                continue
+            row, buy_col, sell_col = routes.rows[i], buy_cols[i], sell_cols[i]
+            buy_price = float(asks[row, buy_col])
+            sell_price = float(bids[row, sell_col])
+            await self._decide(
+                pair,
+                exchanges[buy_col], buy_price,
+                exchanges[sell_col], sell_price,
+                sell_price - buy_price,
+                float(routes.raw_pct[i, buy_col, sell_col]),
+                float(net_pcts[i])
+            )
+
+    def scan_cycles(self, pairs: Iterable[str]):
+        """Update only the graph edges of `pairs` and search for loops through the edges that moved."""
+        self.rate_graph.refresh(pairs)
+        self.cycles = self.rate_graph.find_cycles()
+        for cycle in self.cycles:
+            path = " → ".join(f"{asset}@{venue}" for asset, venue in cycle["path"])
+            logger.debug(f"CYCLE: {path} | Profit: {cycle['profit_pct']:.3f}%")
+
+    async def evaluate(self, pair: str):
+        await self.evaluate_pairs([pair])
+
+    def top_routes(self, k: int = 5) -> List[dict]:
+        """Ranked top-K routes across all pairs, net of venue costs."""
+        return self.matrix.top_routes(k, max_age=self.max_quote_age)
+
+    async def _decide(
+        self,
+        pair: str,
+        low_name: str,
+        low_price: float,
+        high_name: str,
+        high_price: float,
+        spread: float,
+        spread_pct: float,
+        net_pct: float
+    ):
+        self.snapshots[pair] = {
+            "low_name": low_name,
+            "low_price": low_price,
+            "high_name": high_name,
+            "high_price": high_price,
+            "spread": spread,
+            "spread_pct": spread_pct,
+            "net_pct": net_pct,
+        }
+
+        # ENTRY: re-price both legs at trade size (order-book VWAP on depth-mode venues) before committing
+        if spread_pct >= self.percent_threshold and pair not in self.open_positions:
+            low_price = self.matrix.fill_price(pair, low_name, "buy", self.trade_amount_usdc)
+            high_price = self.matrix.fill_price(pair, high_name, "sell", self.trade_amount_usdc)
+            if low_price is None or high_price is None:
+                logger.debug(f"SKIP: {pair} | Not enough depth for ${self.trade_amount_usdc:.0f} on {low_name}/{high_name}")
+                return
+            spread = high_price - low_price
+            spread_pct = spread / low_price * 100
+            if spread_pct < self.percent_threshold:
+                return
+            position = simulate_entry_trade(
+                buy_price=low_price,
+                sell_price=high_price,
+                trade_amount_usdc=self.trade_amount_usdc,
+                fee_percent=self.fee_percent,
+                slippage_percent=self.slippage_percent
+            )
+            position.update({
+                "entry_time": datetime.now(timezone.utc),
+                "pair": pair,
+                "buy_exchange": low_name,
+                "sell_exchange": high_name,
+                "entry_spread": spread_pct,
+                "buy_price": low_price,
+                "sell_price": high_price
+            })
+            self.open_positions[pair] = position
+
+            logger.info(f"ENTRY: {pair} | BUY on {low_name} @ {low_price:.2f}, SHORT on {high_name} @ {high_price:.2f} | Spread: {spread_pct:.2f}%")
+            if self.episodes is None:
+                # With an EpisodeTracker the opportunity is logged as (part of) its episode instead
+                await self.db_logger.log_opportunity(
+                    pair, low_name, low_price, high_name, high_price,
+                    spread, spread_pct, self.matrix.quotes(pair, as_datetime=False)
+                )
+
+        # EXIT: watch the position's own route converge, whatever the best route is now.
+        # Unwinding sells the long at the buy venue's bid and covers the short at the sell venue's ask.
+        elif pair in self.open_positions:
+            position = self.open_positions[pair]
+
+            exit_buy = self.matrix.bid(pair, position["buy_exchange"])
+            exit_sell = self.matrix.ask(pair, position["sell_exchange"])
+
+            if exit_buy and exit_sell and (exit_sell - exit_buy) / exit_buy * 100 <= self.convergence_threshold:
+                net_profit, gross_profit = simulate_exit_trade(
+                    position, close_buy_price=exit_sell, close_sell_price=exit_buy
+                )
+                duration = (datetime.now(timezone.utc) - position["entry_time"]).total_seconds()
+                self.paper_trades.append({
+                    "pair": pair,
+                    "entry_spread": position["entry_spread"],
+                    "net_profit": net_profit,
+                    "duration_sec": duration,
+                    "buy_exchange": position["buy_exchange"],
+                    "sell_exchange": position["sell_exchange"]
+                })
+                logger.info(f"EXIT: {pair} | NP: ${net_profit:.2f} | Duration: {duration:.1f}s | Converged.")
+                await self.db_logger.log_trade(
+                    timestamp=position["entry_time"],
+                    pair=pair,
+                    buy_exchange=position["buy_exchange"],
+                    buy_price=position["buy_price"],
+                    sell_exchange=position["sell_exchange"],
+                    sell_price=position["sell_price"],
+                    spread=position["sell_price"] - position["buy_price"],
+                    spread_pct=position["entry_spread"],
+                    net_profit=net_profit,
+                    gross_profit=gross_profit,
+                    event_type="EXIT",
+                    close_timestamp=datetime.now(timezone.utc),
+                    exit_buy_price=exit_buy,
+                    exit_sell_price=exit_sell,
+                    duration_seconds=int(duration),
+                    decision_reason="spread_converged",
+                    metadata=None
+                )
+
+                del self.open_positions[pair]
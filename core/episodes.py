@@ -0,0 +1,153 @@
+#  core/episodes.py
+
+from core.detector import PERCENT_THRESHOLD, MAX_QUOTE_AGE
+from typing import Dict, List, Optional, Sequence
+import logging
+import time
+logger = logging.getLogger("cex_dex_arbitrage.core.episodes")
+
+CLOSE_RATIO = 0.8         # an episode closes once its spread falls below CLOSE_RATIO × the open threshold
+SWEEP_INTERVAL = 1.0      # seconds between checks for episodes whose pair stopped updating
+
+
+class Episode:
+    """
+    One pair's best route staying above the threshold, summarized in memory. `buy_col` / `sell_col`
+    follow the route at the peak; `open_buy_col` / `open_sell_col` are the route it opened on.
+    """
+
+    __slots__ = (
+        "pair", "buy_col", "sell_col", "open_buy_col", "open_sell_col", "opened_ns", "last_ns", "ticks",
+        "open_spread_pct", "open_buy_price", "open_sell_price",
+        "peak_spread_pct", "peak_ns", "peak_buy_price", "peak_sell_price", "peak_net_pct",
+        "last_spread_pct", "spread_sum", "next_sample_ns"
+    )
+
+    def __init__(self, pair: str, buy_col: int, sell_col: int, ts_ns: int, spread_pct: float, net_pct: float, buy_price: float, sell_price: float):
+        self.pair, self.buy_col, self.sell_col = pair, buy_col, sell_col
+        self.open_buy_col, self.open_sell_col = buy_col, sell_col
+        self.opened_ns = self.last_ns = self.peak_ns = ts_ns
+        self.ticks = 1
+        self.open_spread_pct = self.peak_spread_pct = self.last_spread_pct = self.spread_sum = spread_pct
+        self.open_buy_price = self.peak_buy_price = buy_price
+        self.open_sell_price = self.peak_sell_price = sell_price
+        self.peak_net_pct = net_pct
+        self.next_sample_ns = ts_ns
+
+    def update(self, ts_ns: int, buy_col: int, sell_col: int, spread_pct: float, net_pct: float, buy_price: float, sell_price: float):
+        self.last_ns = ts_ns
+        self.ticks += 1
+        self.last_spread_pct = spread_pct
+        self.spread_sum += spread_pct
+        if spread_pct > self.peak_spread_pct:
+            # The logged route is the one at the peak
+            self.peak_spread_pct, self.peak_ns = spread_pct, ts_ns
+            self.buy_col, self.sell_col = buy_col, sell_col
+            self.peak_buy_price, self.peak_sell_price = buy_price, sell_price
+        if net_pct > self.peak_net_pct:
+            self.peak_net_pct = net_pct
+
+
+class EpisodeTracker:
+    """
+    The detector's opportunity log: coalesces a pair's repeated above-threshold evaluations into one
+    episode row instead of a row per entry. An episode opens when the pair's best route (the one the
+    detector would trade) reaches `open_threshold` in raw spread, is updated in memory (peak, last
+    spread, tick count) on every evaluation, and closes once the best route's spread falls below
+    `close_threshold` (hysteresis, so a spread hovering at the threshold is one episode), its quotes go
+    stale, or the pair stops updating for `max_idle` seconds. Only then is one row logged
+    (`db_logger.log_episode`), with the venues of the route it opened on and of the route at the peak;
+    the best route switching venues mid-episode does not split it.
+
+    With `sample_interval` (seconds), an open episode also logs an opportunity snapshot with every
+    venue's quote through `log_opportunity`, at its open and at most once per interval after that.
+    """
+
+    def __init__(
+        self,
+        matrix,
+        db_logger,
+        open_threshold: float = PERCENT_THRESHOLD,
+        close_threshold: Optional[float] = None,
+        sample_interval: Optional[float] = None,
+        max_idle: float = MAX_QUOTE_AGE
+    ):
+        self.matrix = matrix
+        self.db_logger = db_logger
+        self.open_threshold = open_threshold
+        self.close_threshold = open_threshold * CLOSE_RATIO if close_threshold is None else close_threshold
+        self.sample_ns = None if sample_interval is None else int(sample_interval * 1_000_000_000)
+        self.max_idle_ns = int(max_idle * 1_000_000_000)
+        self.open: Dict[str, Episode] = {}
+        self._next_sweep_ns = 0
+        self.opened = 0
+        self.closed = 0
+        self.observations = 0   # above-threshold best-route evaluations
+
+    async def observe(self, pairs: Sequence[str], routes, buy_cols, sell_cols):
+        """
+        Update the episodes of `pairs` from the detector's RouteMatrix of the same evaluation and each
+        pair's best route in it (`MarketMatrix.best_routes`).
+        """
+        now = time.time_ns()
+        raw_pct, net_pct = routes.raw_pct, routes.net_pct
+        asks, bids = self.matrix.asks, self.matrix.bids
+
+        for i, pair in enumerate(pairs):
+            buy_col, sell_col = int(buy_cols[i]), int(sell_cols[i])
+            spread_pct = float(raw_pct[i, buy_col, sell_col]) if buy_col != sell_col else float("nan")
+            episode = self.open.get(pair)
+            # Comparisons with NaN (a stale leg) are False
+            if episode is None and not spread_pct >= self.open_threshold:
+                continue
+            if episode is not None and not spread_pct >= self.close_threshold:
+                await self._close(episode, now, "converged" if spread_pct == spread_pct else "stale")
+                continue
+            if spread_pct >= self.open_threshold:
+                self.observations += 1
+            row = routes.rows[i]
+            net = float(net_pct[i, buy_col, sell_col])
+            buy_price, sell_price = float(asks[row, buy_col]), float(bids[row, sell_col])
+            if episode is None:
+                episode = self.open[pair] = Episode(pair, buy_col, sell_col, now, spread_pct, net, buy_price, sell_price)
+                self.opened += 1
+            else:
+                # At/above the threshold, or inside the hysteresis band
+                episode.update(now, buy_col, sell_col, spread_pct, net, buy_price, sell_price)
+            if self.sample_ns is not None and now >= episode.next_sample_ns:
+                episode.next_sample_ns = now + self.sample_ns
+                await self._snapshot(pair, buy_col, sell_col, buy_price, sell_price, spread_pct)
+
+        if now >= self._next_sweep_ns:
+            self._next_sweep_ns = now + int(SWEEP_INTERVAL * 1_000_000_000)
+            for episode in [e for e in self.open.values() if now - e.last_ns > self.max_idle_ns]:
+                await self._close(episode, episode.last_ns, "idle")
+
+    async def _snapshot(self, pair: str, buy_col: int, sell_col: int, buy_price: float, sell_price: float, spread_pct: float):
+        exchanges = self.matrix.exchanges
+        await self.db_logger.log_opportunity(
+            pair, exchanges[buy_col], buy_price, exchanges[sell_col], sell_price,
+            sell_price - buy_price, spread_pct, self.matrix.quotes(pair, as_datetime=False)
+        )
+
+    async def _close(self, episode: Episode, closed_ns: int, reason: str):
+        del self.open[episode.pair]
+        self.closed += 1
+        exchanges = self.matrix.exchanges
+        await self.db_logger.log_episode(
+            episode.opened_ns, closed_ns, episode.pair, exchanges[episode.buy_col], exchanges[episode.sell_col],
+            episode.ticks, episode.open_spread_pct, episode.peak_spread_pct, episode.peak_ns, episode.last_spread_pct,
+            episode.spread_sum / episode.ticks, episode.peak_net_pct,
+            exchanges[episode.open_buy_col], exchanges[episode.open_sell_col],
+            episode.open_buy_price, episode.open_sell_price, episode.peak_buy_price, episode.peak_sell_price, reason
+        )
+
+    async def close_all(self, reason: str = "shutdown"):
+        """Close (and log) every open episode, e.g. on shutdown."""
+        now = time.time_ns()
+        for episode in list(self.open.values()):
+            await self._close(episode, now, reason)
+
+    def active(self) -> List[Episode]:
+        """Open episodes, longest-running first (for views)."""
+        return sorted(self.open.values(), key=lambda e: e.opened_ns)
@@ -1,21 +1,209 @@
 #  core/market_matrix.py
 
 from exchanges.base import ExchangeFetcher
-from typing import Dict, List
+from utils.timestamps import to_datetime
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import numpy as np
+import asyncio
+import time
+
+
+class RouteMatrix(NamedTuple):
+    """Every buy-venue × sell-venue route for each row: `[row, buy_col, sell_col]`."""
+    rows: np.ndarray
+    raw_pct: np.ndarray     # (sell venue bid - buy venue ask) / buy venue ask, in %
+    net_pct: np.ndarray     # same after both legs' taker costs; -inf where the route is unusable
+
 
 # --- Matrix to organize fetchers ---
 class MarketMatrix:
+    """
+    Dense pairs × exchanges board of the latest quotes.
+
+    Fetchers push quotes into `prices` / `bids` / `asks` / `timestamps` (epoch ns, 0 = no quote)
+    through `on_quote`; every buy×sell venue route net of costs (`routes`, buying at the ask and
+    selling at the bid) for any set of pairs then comes from one vectorized pass, and each pair's
+    best route from `best_routes`.
+    """
+
     def __init__(self):
         self.fetchers: Dict[str, List[ExchangeFetcher]] = {}
+        # Exchange name -> fetcher (one per venue), for venue-level lookups such as order-book VWAP
+        self.venues: Dict[str, ExchangeFetcher] = {}
+        self.pairs: List[str] = []
+        self.exchanges: List[str] = []
+        self.pair_index: Dict[str, int] = {}
+        self.exchange_index: Dict[str, int] = {}
+        self.prices = np.full((0, 0), np.nan)
+        # Executable sides; venues without a bid/ask (e.g. DEX quotes) fill both with their price
+        self.bids = np.full((0, 0), np.nan)
+        self.asks = np.full((0, 0), np.nan)
+        self.timestamps = np.zeros((0, 0), dtype=np.int64)
+        # Per-exchange trading cost (%) applied to each leg of a route
+        self.costs = np.zeros(0)
+        # Pairs whose quotes changed since the detector last looked at them
+        self._dirty: Set[str] = set()
+        self._changed = asyncio.Event()
 
     def add_fetcher(self, pair: str, fetcher: ExchangeFetcher):
         if pair not in self.fetchers:
             self.fetchers[pair] = []
         self.fetchers[pair].append(fetcher)
-    
+        if pair not in self.pair_index:
+            self.pair_index[pair] = len(self.pairs)
+            self.pairs.append(pair)
+        if fetcher.name not in self.exchange_index:
+            self.exchange_index[fetcher.name] = len(self.exchanges)
+            self.exchanges.append(fetcher.name)
+            self.venues[fetcher.name] = fetcher
+            self.costs = np.append(self.costs, getattr(fetcher, "taker_fee_percent", 0.0))
+        self._resize()
+        fetcher.subscribe(self.on_quote)
+
+    def _resize(self):
+        """Grow the arrays to the current pair/exchange count (setup time only), keeping existing quotes."""
+        shape = (len(self.pairs), len(self.exchanges))
+        if self.prices.shape == shape:
+            return
+        old_p, old_e = self.prices.shape
+        for attr in ("prices", "bids", "asks"):
+            grown = np.full(shape, np.nan)
+            grown[:old_p, :old_e] = getattr(self, attr)
+            setattr(self, attr, grown)
+        timestamps = np.zeros(shape, dtype=np.int64)
+        timestamps[:old_p, :old_e] = self.timestamps
+        self.timestamps = timestamps
+
+    def on_quote(self, fetcher: ExchangeFetcher, pair: str, price: float, ts_ns: int):
+        """Fetcher callback: write the quote into its cell and flag `pair` for re-evaluation."""
+        row = self.pair_index.get(pair)
+        if row is None:
+            return
+        col = self.exchange_index[fetcher.name]
+        quote = fetcher.latest_prices.get(pair)
+        bid = quote.bid if quote is not None and quote.bid is not None else price
+        ask = quote.ask if quote is not None and quote.ask is not None else price
+        self.prices[row, col] = price
+        self.bids[row, col] = bid
+        self.asks[row, col] = ask
+        self.timestamps[row, col] = ts_ns
+        self._dirty.add(pair)
+        self._changed.set()
+
+    async def wait_dirty(self) -> Set[str]:
+        """Block until at least one pair has a new quote, then return (and reset) the dirty set."""
+        await self._changed.wait()
+        self._changed.clear()
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def _rows(self, pairs: Optional[Iterable[str]]) -> np.ndarray:
+        if pairs is None:
+            return np.arange(len(self.pairs))
+        return np.fromiter((self.pair_index[p] for p in pairs), dtype=np.intp)
+
+    def routes(self, pairs: Optional[Iterable[str]] = None, max_age: Optional[float] = None) -> RouteMatrix:
+        """
+        Vectorized N×N route spreads for `pairs` (all pairs if None), buying at each venue's ask
+        and selling at each venue's bid, so only spreads that could actually be filled show up.
+        Quotes older than `max_age` seconds are ignored, so a frozen venue can't win a route.
+        """
+        rows = self._rows(pairs)
+        asks = self.asks[rows]
+        bids = self.bids[rows]
+        if max_age is not None:
+            cutoff = time.time_ns() - int(max_age * 1_000_000_000)
+            fresh = self.timestamps[rows] >= cutoff
+            asks = np.where(fresh, asks, np.nan)
+            bids = np.where(fresh, bids, np.nan)
+        buy = asks[:, :, None]
+        sell = bids[:, None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw_pct = (sell / buy - 1) * 100
+            eff_buy = buy * (1 + self.costs / 100)[None, :, None]
+            eff_sell = sell * (1 - self.costs / 100)[None, None, :]
+            net_pct = (eff_sell / eff_buy - 1) * 100
+        same_venue = np.eye(len(self.exchanges), dtype=bool)
+        net_pct = np.where(np.isnan(net_pct) | same_venue, -np.inf, net_pct)
+        return RouteMatrix(rows, raw_pct, net_pct)
+
+    def best_routes(self, routes: RouteMatrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(buy_col, sell_col, net_pct) of the best net route per row; net_pct is -inf if a row has none."""
+        n = len(self.exchanges)
+        flat = routes.net_pct.reshape(len(routes.rows), n * n)
+        best = flat.argmax(axis=1)
+        return best // n, best % n, flat[np.arange(len(best)), best]
+
+    def top_routes(self, k: int = 5, max_age: Optional[float] = None) -> List[dict]:
+        """Top-K routes by net spread across all pairs and venue combinations."""
+        routes = self.routes(max_age=max_age)
+        flat = routes.net_pct.ravel()
+        k = min(k, int(np.isfinite(flat).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(flat, -k)[-k:]
+        top = top[np.argsort(flat[top])[::-1]]
+        r, b, s = np.unravel_index(top, routes.net_pct.shape)
+        out = []
+        for i, buy_col, sell_col in zip(r, b, s):
+            row = routes.rows[i]
+            out.append({
+                "pair": self.pairs[row],
+                "buy_exchange": self.exchanges[buy_col],
+                "buy_price": float(self.asks[row, buy_col]),
+                "sell_exchange": self.exchanges[sell_col],
+                "sell_price": float(self.bids[row, sell_col]),
+                "spread_pct": float(routes.raw_pct[i, buy_col, sell_col]),
+                "net_pct": float(routes.net_pct[i, buy_col, sell_col]),
+            })
+        return out
+
+    def price(self, pair: str, exchange: str) -> Optional[float]:
+        """Latest price for one cell, or None if that venue has not quoted the pair yet."""
+        value = self.prices[self.pair_index[pair], self.exchange_index[exchange]]
+        return None if np.isnan(value) else float(value)
+
+    def bid(self, pair: str, exchange: str) -> Optional[float]:
+        """Best bid for one cell (what selling there gets), or None if the venue has not quoted the pair yet."""
+        value = self.bids[self.pair_index[pair], self.exchange_index[exchange]]
+        return None if np.isnan(value) else float(value)
+
+    def ask(self, pair: str, exchange: str) -> Optional[float]:
+        """Best ask for one cell (what buying there costs), or None if the venue has not quoted the pair yet."""
+        value = self.asks[self.pair_index[pair], self.exchange_index[exchange]]
+        return None if np.isnan(value) else float(value)
+
+    def fill_price(self, pair: str, exchange: str, side: str, notional: float) -> Optional[float]:
+        """
+        Price to fill `notional` on one side of a venue: its order-book VWAP when the venue keeps
+        books (depth mode), else its best ask (buy) / bid (sell). None if the book is too thin for the size.
+        """
+        fetcher = self.venues.get(exchange)
+        if getattr(fetcher, "depth", None):
+            return fetcher.get_vwap(pair, side, notional)
+        return self.ask(pair, exchange) if side == "buy" else self.bid(pair, exchange)
+
+    def quotes(self, pair: str, as_datetime: bool = True) -> List[Tuple[str, float, datetime]]:
+        """
+        (exchange, price, timestamp) for every venue quoting `pair`, cheapest first. For display/DB edges;
+        `as_datetime=False` keeps the timestamps as epoch ns (for the DB logger, which converts when writing).
+        """
+        row = self.pair_index[pair]
+        out = []
+        for col in np.argsort(self.prices[row]):
+            price = self.prices[row, col]
+            if np.isnan(price):
+                break  # NaNs sort last
+            ts_ns = int(self.timestamps[row, col])
+            out.append((self.exchanges[col], float(price), to_datetime(ts_ns) if as_datetime else ts_ns))
+        return out
+
 # --- Shutdown ---
 async def shutdown(matrix: MarketMatrix):
     for fetchers in matrix.fetchers.values():
         for fetcher in fetchers:
             if hasattr(fetcher, 'exchange'):
-                await fetcher.exchange.close()
\ No newline at end of file
+                await fetcher.exchange.close()
+            elif hasattr(fetcher, 'close'):
+                await fetcher.close()
\ No newline at end of file
@@ -0,0 +1,224 @@
+#  core/quote_board.py
+
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+import numpy as np
+import struct
+import json
+import time
+import sys
+import logging
+logger = logging.getLogger("cex_dex_arbitrage.core.quote_board")
+
+MAGIC = b"QBRD"
+VERSION = 2   # v2: executable bid/ask per slot
+_HEADER = struct.Struct("<4sIIII")   # magic, version, n_pairs, n_venues, names_len
+_ALIGN = 64
+# How long a reader retries a slot caught mid-write before reporting it missing: a live writer
+# finishes in well under this even when preempted, so a slot still odd after it has lost its writer
+SPIN_LIMIT_NS = 100_000_000
+
+# One 64-byte (cache-line) slot per (pair, venue). `seq` is the seqlock: odd while a write is in progress.
+# bid/ask are the executable sides; venues without them (e.g. DEX quotes) carry their price in both.
+SLOT_DTYPE = np.dtype([
+    ("seq", "<u8"),
+    ("price", "<f8"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("ts_ns", "<i8"),
+    ("_pad", "<u8", (3,)),
+])
+
+
+# --- Shared-memory quote board ---
+class QuoteBoard:
+    """
+    Fixed-layout pairs × venues quote board in `multiprocessing.shared_memory`.
+
+    Layout: a header (magic, version, dimensions, JSON pair/venue names) followed by a dense
+    array of `SLOT_DTYPE` slots. Writers (fetcher processes) bump a per-slot sequence number
+    around every write; readers in any process copy a slot and retry if the sequence was odd
+    or changed underneath them. Readers get plain NumPy views over the segment: no
+    serialization, no broker.
+
+    Each slot must have a single writer (one fetcher per venue per pair), which is how fetchers
+    and shard workers are laid out anyway. If a writer dies mid-publish its slot's sequence stays
+    odd: readers retry for at most SPIN_LIMIT_NS, then report the slot as missing (and stop waiting
+    on it until its sequence moves again).
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, pairs: List[str], venues: List[str], offset: int, owner: bool):
+        self.shm = shm
+        self.pairs = pairs
+        self.venues = venues
+        self.pair_index = {p: i for i, p in enumerate(pairs)}
+        self.venue_index = {v: i for i, v in enumerate(venues)}
+        self.owner = owner
+        self.slots = np.ndarray((len(pairs), len(venues)), dtype=SLOT_DTYPE, buffer=shm.buf, offset=offset)
+        # Per-field views (zero-copy)
+        self.seq = self.slots["seq"]
+        self.prices = self.slots["price"]
+        self.bids = self.slots["bid"]
+        self.asks = self.slots["ask"]
+        self.timestamps = self.slots["ts_ns"]
+        # Per slot, the odd sequence number this reader gave up on (0 = none)
+        self._stuck = np.zeros((len(pairs), len(venues)), dtype=np.uint64)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def create(cls, name: Optional[str], pairs: List[str], venues: List[str], replace: bool = False) -> "QuoteBoard":
+        """
+        Create the board `name` (a random name if None). An existing segment of that name may belong
+        to a live bot, so it is only unlinked and recreated with `replace=True` (e.g. after a crash).
+        """
+        names = json.dumps({"pairs": pairs, "venues": venues}).encode()
+        offset = -(-(_HEADER.size + len(names)) // _ALIGN) * _ALIGN
+        size = offset + len(pairs) * len(venues) * SLOT_DTYPE.itemsize
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            if not replace:
+                raise FileExistsError(
+                    f"[QuoteBoard] A shared-memory segment named '{name}' already exists and may be in use by "
+                    f"another process; pick another name, or replace it if it was left over from a crash"
+                ) from None
+            logger.warning(f"[QuoteBoard] Replacing existing board '{name}'")
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, len(pairs), len(venues), len(names))
+        shm.buf[_HEADER.size:_HEADER.size + len(names)] = names
+        board = cls(shm, pairs, venues, offset, owner=True)
+        board.slots["seq"] = 0
+        board.slots["price"] = np.nan
+        board.slots["bid"] = np.nan
+        board.slots["ask"] = np.nan
+        board.slots["ts_ns"] = 0
+        logger.info(f"[QuoteBoard] Created '{shm.name}' ({len(pairs)} pairs × {len(venues)} venues, {size} bytes)")
+        return board
+
+    @classmethod
+    def attach(cls, name: str) -> "QuoteBoard":
+        # Attaching processes must never unlink the segment when they exit: the creator owns it
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            from multiprocessing import resource_tracker
+            # Children spawned by the creator share its tracker (registering twice is harmless);
+            # an unrelated reader gets its own tracker, which would unlink the board on exit.
+            own_tracker = getattr(resource_tracker._resource_tracker, "_fd", None) is None
+            shm = shared_memory.SharedMemory(name=name)
+            if own_tracker:
+                resource_tracker.unregister(shm._name, "shared_memory")
+        magic, version, n_pairs, n_venues, names_len = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            shm.close()
+            raise ValueError(f"[QuoteBoard] '{name}' is not a v{VERSION} quote board")
+        names = json.loads(bytes(shm.buf[_HEADER.size:_HEADER.size + names_len]))
+        offset = -(-(_HEADER.size + names_len) // _ALIGN) * _ALIGN
+        return cls(shm, names["pairs"], names["venues"], offset, owner=False)
+
+    # --- Writer side ---
+    def publish(self, row: int, col: int, price: float, ts_ns: int, bid: Optional[float] = None, ask: Optional[float] = None):
+        slot = self.slots[row, col]
+        seq = int(slot["seq"])
+        seq += seq & 1               # a previous writer died mid-write: start from the next even number
+        slot["seq"] = seq + 1        # odd: write in progress
+        slot["price"] = price
+        slot["bid"] = price if bid is None else bid
+        slot["ask"] = price if ask is None else ask
+        slot["ts_ns"] = ts_ns
+        slot["seq"] = seq + 2        # even: consistent
+
+    def on_quote(self, fetcher, pair: str, price: float, ts_ns: int):
+        """Fetcher subscriber (same signature as `MarketMatrix.on_quote`); the sides come from `fetcher.latest_prices`."""
+        row = self.pair_index.get(pair)
+        col = self.venue_index.get(fetcher.name)
+        if row is None or col is None:
+            return
+        quote = fetcher.latest_prices.get(pair)
+        if quote is None:
+            self.publish(row, col, price, ts_ns)
+        else:
+            self.publish(row, col, price, ts_ns, quote.bid, quote.ask)
+
+    # --- Reader side ---
+    def read(self, pair: str, venue: str) -> Optional[Tuple[float, float, float, int]]:
+        """Consistent (price, bid, ask, ts_ns) for one slot, or None if it was never written."""
+        row, col = self.pair_index[pair], self.venue_index[venue]
+        slot = self.slots[row, col]
+        deadline = None
+        while True:
+            before = int(slot["seq"])
+            if not before & 1:
+                price = float(slot["price"])
+                bid = float(slot["bid"])
+                ask = float(slot["ask"])
+                ts_ns = int(slot["ts_ns"])
+                if int(slot["seq"]) == before:
+                    return None if before == 0 else (price, bid, ask, ts_ns)
+            elif before == self._stuck[row, col]:
+                return None
+            if deadline is None:
+                deadline = time.monotonic_ns() + SPIN_LIMIT_NS
+            elif time.monotonic_ns() > deadline:
+                if before & 1:
+                    self._give_up(row, col, before)
+                return None
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Consistent copies of the whole price, bid, ask and timestamp blocks (retried if any slot was
+        caught mid-write). Slots still torn after SPIN_LIMIT_NS come back as missing (NaN, ts 0).
+        """
+        deadline = None
+        while True:
+            before = self.seq.copy()
+            prices = self.prices.copy()
+            bids = self.bids.copy()
+            asks = self.asks.copy()
+            timestamps = self.timestamps.copy()
+            after = self.seq.copy()
+            odd = (before & 1).astype(bool)
+            torn = (before != after) | odd
+            if deadline is None:
+                deadline = time.monotonic_ns() + SPIN_LIMIT_NS
+            expired = time.monotonic_ns() > deadline
+            if expired or not (torn & ~(odd & (before == self._stuck))).any():
+                if torn.any():
+                    for row, col in zip(*np.nonzero(torn & odd & (before != self._stuck) & expired)):
+                        self._give_up(row, col, int(before[row, col]))
+                    prices[torn] = bids[torn] = asks[torn] = np.nan
+                    timestamps[torn] = 0
+                return prices, bids, asks, timestamps
+
+    def _give_up(self, row: int, col: int, seq: int):
+        self._stuck[row, col] = seq
+        logger.warning(
+            f"[QuoteBoard] {self.pairs[row]} on {self.venues[col]} stuck mid-write (seq {seq}); "
+            f"reporting it missing until its writer publishes again"
+        )
+
+    def close(self):
+        # Drop our views before closing the mapping
+        self.slots = self.seq = self.prices = self.bids = self.asks = self.timestamps = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+if __name__ == "__main__":
+    # python -m core.quote_board <name>: dump a live board from another process
+    board = QuoteBoard.attach(sys.argv[1])
+    prices, bids, asks, timestamps = board.snapshot()
+    for r, pair in enumerate(board.pairs):
+        row = ", ".join(
+            f"{v}={prices[r, c]:.4f} ({bids[r, c]:.4f}/{asks[r, c]:.4f})"
+            for c, v in enumerate(board.venues) if timestamps[r, c]
+        )
+        print(f"{pair}: {row}")
+    board.close()
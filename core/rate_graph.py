@@ -0,0 +1,164 @@
+#  core/rate_graph.py
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import logging
+import math
+import time
+logger = logging.getLogger("cex_dex_arbitrage.core.rate_graph")
+
+INF = float("inf")
+
+
+# --- Rate graph / multi-hop cycle detection ---
+class RateGraph:
+    """
+    Asset@venue nodes with -log(rate) edge weights built from `MarketMatrix` quotes.
+
+    Each quote BASE/QUOTE @ venue gives two edges (sell base at the bid, buy base at the ask),
+    both net of the venue's taker cost. The same asset on two venues is joined by transfer edges, so cross-venue and
+    in-venue (triangular) loops live in one graph. A profitable loop is a negative cycle.
+
+    Detection is incremental: `refresh(pairs)` only rewrites the edges of the given pairs and
+    `find_cycles()` only searches for cycles through edges whose weight changed since the last
+    call (a new negative cycle must contain a changed edge), with a hop-limited Bellman-Ford.
+    """
+
+    def __init__(
+        self,
+        matrix,
+        max_hops: int = 5,
+        min_profit_pct: float = 0.0,
+        transfer_cost_pct: float = 0.0,
+        max_quote_age: Optional[float] = None
+    ):
+        self.matrix = matrix
+        self.max_hops = max_hops
+        self.min_profit_pct = min_profit_pct
+        self.transfer_cost_pct = transfer_cost_pct
+        self.max_quote_age = max_quote_age
+
+        self.nodes: List[Tuple[str, str]] = []          # index -> (asset, venue)
+        self.node_index: Dict[Tuple[str, str], int] = {}
+        self.out_edges: List[Dict[int, float]] = []     # node -> {neighbour: weight}
+        self._touched: Set[Tuple[int, int]] = set()
+
+    def _node(self, asset: str, venue: str) -> int:
+        key = (asset, venue)
+        idx = self.node_index.get(key)
+        if idx is not None:
+            return idx
+        idx = len(self.nodes)
+        self.nodes.append(key)
+        self.node_index[key] = idx
+        self.out_edges.append({})
+        # Join the new node to the same asset on every other venue
+        transfer = -math.log1p(-self.transfer_cost_pct / 100)
+        for other, (other_asset, other_venue) in enumerate(self.nodes[:-1]):
+            if other_asset == asset:
+                self._set_edge(idx, other, transfer)
+                self._set_edge(other, idx, transfer)
+        return idx
+
+    def _set_edge(self, u: int, v: int, weight: Optional[float]):
+        edges = self.out_edges[u]
+        if weight is None:
+            if edges.pop(v, None) is not None:
+                self._touched.add((u, v))
+        elif edges.get(v) != weight:
+            edges[v] = weight
+            self._touched.add((u, v))
+
+    def refresh(self, pairs: Optional[Iterable[str]] = None):
+        """Rewrite the edges of `pairs` (all pairs if None) from the matrix's current quotes."""
+        matrix = self.matrix
+        pairs = matrix.pairs if pairs is None else pairs
+        cutoff = None
+        if self.max_quote_age is not None:
+            cutoff = time.time_ns() - int(self.max_quote_age * 1_000_000_000)
+        for pair in pairs:
+            row = matrix.pair_index[pair]
+            base, quote = pair.split("/")
+            for col, venue in enumerate(matrix.exchanges):
+                bid = matrix.bids[row, col]
+                ask = matrix.asks[row, col]
+                # Missing (NaN), unusable (0, negative, inf: no log rate) or old quotes carry no edges
+                usable = np.isfinite(bid) and np.isfinite(ask) and bid > 0 and ask > 0
+                stale = not usable or (cutoff is not None and matrix.timestamps[row, col] < cutoff)
+                if stale and (base, venue) not in self.node_index:
+                    continue
+                b = self._node(base, venue)
+                q = self._node(quote, venue)
+                if stale:
+                    self._set_edge(b, q, None)
+                    self._set_edge(q, b, None)
+                    continue
+                keep = 1 - matrix.costs[col] / 100
+                self._set_edge(b, q, -math.log(bid * keep))     # sell 1 base at the bid
+                self._set_edge(q, b, -math.log(keep / ask))     # buy base at the ask with 1 quote
+
+    def _search_from(self, src: int) -> Dict[Tuple[int, int], Tuple[float, int]]:
+        """
+        Hop-limited, frontier-only Bellman-Ford from `src`.
+        Returns {(node, hop): (dist, pred)} for every improvement, so each path can be rebuilt
+        consistently even after later rounds overwrite a node's best distance.
+        """
+        dist = {src: 0.0}
+        hist: Dict[Tuple[int, int], Tuple[float, int]] = {(src, 0): (0.0, -1)}
+        frontier = [src]
+        for hop in range(1, self.max_hops):
+            improved: Dict[int, Tuple[float, int]] = {}
+            for u in frontier:
+                du = hist[(u, hop - 1)][0]
+                for v, w in self.out_edges[u].items():
+                    d = du + w
+                    if d < dist.get(v, INF) and d < improved.get(v, (INF, 0))[0]:
+                        improved[v] = (d, u)
+            if not improved:
+                break
+            for v, (d, u) in improved.items():
+                dist[v] = d
+                hist[(v, hop)] = (d, u)
+            frontier = list(improved)
+        return hist
+
+    def find_cycles(self) -> List[dict]:
+        """Profitable loops through any edge changed since the last call, best first."""
+        touched, self._touched = self._touched, set()
+        threshold = -math.log1p(self.min_profit_pct / 100)
+        found: Dict[Tuple[int, ...], float] = {}
+
+        for u, v in touched:
+            w = self.out_edges[u].get(v)
+            if w is None:
+                continue
+            hist = self._search_from(v)
+            # Try every hop count at which the search got back to u; keep simple loops only
+            for hop in range(1, self.max_hops):
+                entry = hist.get((u, hop))
+                if entry is None or w + entry[0] >= threshold:
+                    continue
+                path = [u]
+                node, h = u, hop
+                while h > 0:
+                    node = hist[(node, h)][1]
+                    h -= 1
+                    path.append(node)
+                if len(set(path)) != len(path):
+                    continue
+                cycle = path[::-1]   # v ... u, closed by the touched edge u -> v
+                start = cycle.index(min(cycle))
+                key = tuple(cycle[start:] + cycle[:start])
+                weight = w + entry[0]
+                if weight < found.get(key, INF):
+                    found[key] = weight
+
+        cycles = []
+        for key, weight in sorted(found.items(), key=lambda kv: kv[1]):
+            hops = [self.nodes[n] for n in key]
+            cycles.append({
+                "path": hops + [hops[0]],
+                "profit_pct": math.expm1(-weight) * 100,
+                "venues": sorted({venue for _, venue in hops}),
+            })
+        return cycles
@@ -0,0 +1,229 @@
+#  core/sharding.py
+
+from exchanges.base import ExchangeFetcher
+from core.quote_board import QuoteBoard
+from exchanges.supervisor import FeedSupervisor, STALL_TIMEOUT, default_supervisor
+from utils.timestamps import to_datetime
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type
+import multiprocessing as mp
+import traceback
+import asyncio
+import logging
+logger = logging.getLogger("cex_dex_arbitrage.core.sharding")
+
+
+# --- Coordinator side ---
+class ShardProxy(ExchangeFetcher):
+    """Stands in for a venue whose real fetchers run in shard workers; re-publishes their quotes locally."""
+
+    def __init__(self, name: str, taker_fee_percent: float):
+        super().__init__(name, "MULTI")
+        self.taker_fee_percent = taker_fee_percent
+
+    async def get_price(self, symbol: str) -> Optional[Tuple[float, datetime]]:
+        quote = self.latest_prices.get(symbol)
+        if quote is not None:
+            return quote.price, to_datetime(quote.ts_ns)
+        return None, None
+
+
+class ShardWorker(ExchangeFetcher):
+    """
+    Handle for one shard's worker process in the coordinator's FeedSupervisor: the worker runs as a
+    supervised session of this handle, so a dead or silent worker is respawned with backoff and its
+    downtime shows up under `shard-<n>` in the feed stats. `heartbeat` stands in for quotes.
+    """
+
+    def __init__(self, shard_id: int):
+        super().__init__(f"shard-{shard_id}", "MULTI")
+
+    def heartbeat(self, symbol: str, price: float, ts_ns: int):
+        for callback in self._subscribers:
+            callback(self, symbol, price, ts_ns)
+
+
+class ShardedFeed:
+    """
+    Splits the pair universe across worker processes. Each worker owns its own fetcher
+    subscriptions (ccxt clients, JSON parsing) for its slice of pairs and streams coalesced
+    quote batches back over a pipe. The coordinator re-publishes them through one `ShardProxy`
+    per venue, so `MarketMatrix`, the detector and the DB logger run unchanged in this process.
+
+    Each worker is a session of the coordinator's `supervisor`: when it dies (its pipe closes) or
+    sends nothing for the supervisor's stall timeout, it is terminated and respawned with jittered
+    backoff, the same way a fetcher's subscription is. Its pairs' quotes age out of the detector's
+    routes (`max_quote_age`) meanwhile.
+    """
+
+    def __init__(
+        self,
+        venues: Dict[str, Type[ExchangeFetcher]],
+        pairs: List[str],
+        shards: int,
+        board_name: Optional[str] = None,
+        stall_timeout: float = STALL_TIMEOUT,
+        supervisor: Optional[FeedSupervisor] = None
+    ):
+        self.venues = venues
+        # Each worker supervises its own listeners (reconnect stats stay in the worker's logs)
+        self.stall_timeout = stall_timeout
+        # Restarts the workers themselves; the process default if unset
+        self.supervisor = supervisor
+        # Optional shared-memory QuoteBoard the workers also publish into, for out-of-process readers
+        self.board_name = board_name
+        self.pairs = pairs
+        self.shards = max(1, min(shards, len(pairs)))
+        self.proxies: Dict[str, ShardProxy] = {
+            name: ShardProxy(name, getattr(cls, "taker_fee_percent", 0.0)) for name, cls in venues.items()
+        }
+        self.workers: List[ShardWorker] = [ShardWorker(shard_id) for shard_id in range(self.shards)]
+        # shard id -> (process, pipe) of its live worker
+        self._live: Dict[int, tuple] = {}
+
+    def shard_pairs(self) -> List[List[str]]:
+        """Round-robin pairs over shards so busy and quiet pairs spread evenly."""
+        return [self.pairs[i::self.shards] for i in range(self.shards)]
+
+    def start(self):
+        """Spawn every worker under the supervisor (must be called from the event loop)."""
+        if self.supervisor is None:
+            self.supervisor = default_supervisor()
+        for shard_id, pairs in enumerate(self.shard_pairs()):
+            worker = self.workers[shard_id]
+            worker.supervisor = self.supervisor
+            worker._spawn("worker", lambda shard_id=shard_id, pairs=pairs: self._run_worker(shard_id, pairs), pairs)
+
+    async def _run_worker(self, shard_id: int, pairs: List[str]):
+        """One worker's lifetime as a supervised session: returns (raises) once its pipe closes."""
+        loop = asyncio.get_running_loop()
+        ctx = mp.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        proc = ctx.Process(
+            target=_run_shard,
+            args=(shard_id, self.venues, pairs, child_conn, self.board_name, self.stall_timeout),
+            name=f"shard-{shard_id}",
+            daemon=True
+        )
+        proc.start()
+        child_conn.close()
+        self._live[shard_id] = (proc, parent_conn)
+        closed = loop.create_future()
+        loop.add_reader(parent_conn.fileno(), self._on_readable, parent_conn, self.workers[shard_id], closed)
+        logger.info(f"[Shard {shard_id}] pid={proc.pid} pairs={pairs}")
+        try:
+            await closed
+            await asyncio.to_thread(proc.join, 5)
+            raise ConnectionError(f"worker pid={proc.pid} exited (code {proc.exitcode})")
+        finally:
+            self._live.pop(shard_id, None)
+            self._unwatch(parent_conn)
+            await asyncio.to_thread(self._terminate, proc, parent_conn)
+
+    def _on_readable(self, conn, worker: ShardWorker, closed: asyncio.Future):
+        try:
+            while conn.poll():
+                batch = conn.recv()
+                for venue, pair, price, ts_ns, bid, ask in batch:
+                    self.proxies[venue]._publish(pair, price, ts_ns, bid, ask)
+                if batch:
+                    worker.heartbeat(pair, price, ts_ns)
+        except (EOFError, OSError):
+            self._unwatch(conn)
+            if not closed.done():
+                closed.set_result(None)
+
+    @staticmethod
+    def _unwatch(conn):
+        try:
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+        except (ValueError, OSError):
+            pass   # already closed
+
+    @staticmethod
+    def _terminate(proc, conn):
+        conn.close()
+        if proc.is_alive():
+            proc.terminate()
+        proc.join(timeout=5)
+
+    def stop(self):
+        """Terminate the live workers (the supervisor's `stop()` also does, via their sessions)."""
+        for proc, conn in list(self._live.values()):
+            self._unwatch(conn)
+            self._terminate(proc, conn)
+        self._live.clear()
+
+
+# --- Worker side ---
+def _run_shard(
+    shard_id: int,
+    venues: Dict[str, Type[ExchangeFetcher]],
+    pairs: List[str],
+    conn,
+    board_name: Optional[str],
+    stall_timeout: float
+):
+    from utils.logging_setup import setup_logger
+    setup_logger()
+    try:
+        asyncio.run(_shard_main(shard_id, venues, pairs, conn, board_name, stall_timeout))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.error(f"[Shard {shard_id}] crashed: {e}")
+        logger.debug(traceback.format_exc())
+
+
+async def _shard_main(
+    shard_id: int,
+    venues: Dict[str, Type[ExchangeFetcher]],
+    pairs: List[str],
+    conn,
+    board_name: Optional[str],
+    stall_timeout: float
+):
+    loop = asyncio.get_running_loop()
+    supervisor = FeedSupervisor(stall_timeout=stall_timeout)
+    board = QuoteBoard.attach(board_name) if board_name else None
+    # Latest quote per (venue, pair) since the last send: bursts are coalesced into one message per loop hop
+    pending: Dict[Tuple[str, str], tuple] = {}
+    scheduled = False
+
+    def send():
+        nonlocal scheduled
+        scheduled = False
+        batch = list(pending.values())
+        pending.clear()
+        conn.send(batch)
+
+    def forwarder(venue: str):
+        def on_quote(fetcher, symbol, price, ts_ns):
+            nonlocal scheduled
+            quote = fetcher.latest_prices[symbol]
+            pending[(venue, symbol)] = (venue, symbol, price, ts_ns, quote.bid, quote.ask)
+            if not scheduled:
+                scheduled = True
+                loop.call_soon(send)
+        return on_quote
+
+    fetchers = []
+    for name, cls in venues.items():
+        fetcher = cls(pairs)
+        fetcher.supervisor = supervisor
+        fetcher.subscribe(forwarder(name))
+        if board is not None:
+            fetcher.subscribe(board.on_quote)
+        fetchers.append(fetcher)
+    await asyncio.gather(*(fetcher.connect() for fetcher in fetchers))
+    logger.info(f"[Shard {shard_id}] connected {len(fetchers)} venues for {len(pairs)} pairs")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await supervisor.stop()
+        for fetcher in fetchers:
+            if hasattr(fetcher, 'exchange'):
+                await fetcher.exchange.close()
+        if board is not None:
+            board.close()
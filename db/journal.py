@@ -0,0 +1,194 @@
+# db/journal.py
+
+from typing import Iterator, List, Optional, Tuple
+import threading
+import asyncio
+import logging
+import struct
+import zlib
+import os
+
+logger = logging.getLogger("cex_dex_arbitrage.db.journal")
+
+JOURNAL_DIR = os.getenv("DB_JOURNAL_DIR", ".db_journal")
+SEGMENT_BYTES = 64 * 1024 * 1024   # rotate to a new segment file past this size
+SYNC_INTERVAL = 0.05               # seconds between batched fsyncs of the active segment
+
+# Record = header + payload. The CRC covers the sequence number and the payload.
+_HEADER = struct.Struct(">IIQ")    # payload length, crc32, sequence number
+_CHECKPOINT = "checkpoint"
+
+
+def _segment_name(first_seq: int) -> str:
+    return f"segment-{first_seq:020d}.log"
+
+
+class Journal:
+    """
+    Append-only, length-prefixed, CRC-checked record log, split into numbered segment files.
+
+    `append` writes straight to the active segment (a single `os.write`, so a process crash loses
+    nothing already appended); fsyncs are batched every `sync_interval` seconds by a background task,
+    so an OS crash loses at most that window. Consumers `commit` the sequence number up to which
+    records are safely stored elsewhere; `replay` yields what comes after it, and segments that are
+    entirely committed are deleted.
+
+        journal = Journal(".db_journal"); journal.open(); await journal.start()
+        seq = journal.append(b"...")
+        await journal.commit(seq)
+    """
+
+    def __init__(self, directory: str = JOURNAL_DIR, segment_bytes: int = SEGMENT_BYTES, sync_interval: float = SYNC_INTERVAL):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.sync_interval = sync_interval
+        self.committed = 0        # highest sequence number stored elsewhere
+        self.last_seq = 0         # highest sequence number appended
+        self._segments: List[int] = []   # first sequence number of each segment, ascending
+        self._fd: Optional[int] = None
+        self._size = 0
+        self._dirty = False
+        self._sync_task: Optional[asyncio.Task] = None
+        # Held while the fd is fsynced (in a worker thread) and while it is closed or swapped (on the loop)
+        self._fd_lock = threading.Lock()
+
+    # --- Lifecycle ---
+    def open(self):
+        """Find the segments and checkpoint, cut off a torn tail left by a crash, and open the last segment for appending."""
+        os.makedirs(self.directory, exist_ok=True)
+        self._segments = sorted(
+            int(name[len("segment-"):-len(".log")])
+            for name in os.listdir(self.directory)
+            if name.startswith("segment-") and name.endswith(".log")
+        )
+        try:
+            with open(os.path.join(self.directory, _CHECKPOINT)) as f:
+                self.committed = int(f.read().strip() or 0)
+        except FileNotFoundError:
+            self.committed = 0
+
+        if not self._segments:
+            self.last_seq = self.committed
+            self._open_segment(self.committed + 1)
+            return
+        first = self._segments[-1]
+        path = self._path(first)
+        last_seq, end = 0, 0
+        for last_seq, _, end in self._scan(path):
+            pass
+        if end < os.path.getsize(path):
+            logger.warning(f"[Journal] Truncating torn tail of {path} at byte {end}")
+            os.truncate(path, end)
+        self.last_seq = last_seq or max(first - 1, self.committed)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        self._size = end
+
+    async def start(self):
+        self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def close(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        with self._fd_lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+
+    # --- Writing ---
+    def append(self, payload: bytes) -> int:
+        """Append one record; returns its sequence number."""
+        seq = self.last_seq + 1
+        seq_bytes = seq.to_bytes(8, "big")
+        record = _HEADER.pack(len(payload), zlib.crc32(payload, zlib.crc32(seq_bytes)), seq) + payload
+        if self._size and self._size + len(record) > self.segment_bytes:
+            self._rotate(seq)
+        os.write(self._fd, record)
+        self._size += len(record)
+        self.last_seq = seq
+        self._dirty = True
+        return seq
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            if self._dirty and self._fd is not None:
+                self._dirty = False
+                try:
+                    await asyncio.to_thread(self._sync)
+                except OSError as e:
+                    self._dirty = True   # retried on the next tick
+                    logger.error(f"[Journal] fsync failed: {e}")
+
+    def _sync(self):
+        with self._fd_lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+
+    def _rotate(self, first_seq: int):
+        with self._fd_lock:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._open_segment(first_seq)
+
+    def _open_segment(self, first_seq: int):
+        self._fd = os.open(self._path(first_seq), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._size = 0
+        self._segments.append(first_seq)
+
+    # --- Consuming ---
+    def replay(self, upto: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+        """(seq, payload) for every record after the checkpoint (and up to `upto`), in order."""
+        upto = self.last_seq if upto is None else upto
+        for i, first in enumerate(self._segments):
+            following = self._segments[i + 1] if i + 1 < len(self._segments) else None
+            if following is not None and following - 1 <= self.committed:
+                continue   # entirely committed
+            if first > upto:
+                return
+            for seq, payload, _ in self._scan(self._path(first)):
+                if seq > upto:
+                    return
+                if seq > self.committed:
+                    yield seq, payload
+
+    async def commit(self, seq: int):
+        """Record that everything up to `seq` is stored elsewhere, then drop fully committed segments."""
+        if seq <= self.committed:
+            return
+        self.committed = seq
+        await asyncio.to_thread(self._write_checkpoint, seq)
+        while len(self._segments) > 1 and self._segments[1] - 1 <= seq:
+            first = self._segments.pop(0)
+            await asyncio.to_thread(os.remove, self._path(first))
+
+    def _write_checkpoint(self, seq: int):
+        path = os.path.join(self.directory, _CHECKPOINT)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _scan(self, path: str) -> Iterator[Tuple[int, bytes, int]]:
+        """(seq, payload, end offset) of each intact record; stops at the first short or corrupt one."""
+        with open(path, "rb") as f:
+            data = f.read()
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            length, crc, seq = _HEADER.unpack_from(data, offset)
+            start = offset + _HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload, zlib.crc32(seq.to_bytes(8, "big"))) != crc:
+                return
+            offset = start + length
+            yield seq, payload, offset
+
+    def _path(self, first_seq: int) -> str:
+        return os.path.join(self.directory, _segment_name(first_seq))
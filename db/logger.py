@@ -1,15 +1,25 @@
-from datetime import datetime, date, timezone
-from typing import List, Tuple, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Deque, List, Optional, Tuple, Dict
+from collections import deque
+from abc import ABC, abstractmethod
+from utils.timestamps import to_datetime
+from db.journal import Journal
+from db.partitions import AHEAD_DAYS, DailyPartitions
 import sys
 version = sys.version_info
 if sys.version_info >= (3, 10):
-    PricesType = List[Tuple[str, float, datetime | str]]
+    PricesType = List[Tuple[str, float, datetime | int]]
 else:
     from typing import Union
-    PricesType = List[Tuple[str, float, Union[datetime, str]]]
+    PricesType = List[Tuple[str, float, Union[datetime, int]]]
 import traceback
 import logging
 import asyncio
+import pickle
+import json
+import time
+import os
+import asyncpg
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
@@ -17,10 +27,12 @@ from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 # logger = logging.getLogger(__name__)
 logger = logging.getLogger("cex_dex_arbitrage.db.logger")
 
-# SQL for creating tables
+# SQL for creating tables. All three are range-partitioned by day on `timestamp` (see db/partitions.py):
+# the primary key has to include the partition key, and exchange_prices.arbitrage_id is a plain column
+# rather than a foreign key, so old days can be dropped per table without cascading.
 CREATE_TRADE_LOG = """
 CREATE TABLE IF NOT EXISTS trade_log (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     timestamp TIMESTAMPTZ NOT NULL,
     pair TEXT NOT NULL,
     buy_exchange TEXT NOT NULL,
@@ -37,13 +49,14 @@ CREATE TABLE IF NOT EXISTS trade_log (
     exit_sell_price NUMERIC(18,4),
     duration_seconds INTEGER,
     decision_reason TEXT,
-    metadata JSONB
-);
+    metadata JSONB,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
 """
 
 CREATE_ARBITRAGE_OPPORTUNITIES = """
 CREATE TABLE IF NOT EXISTS arbitrage_opportunities (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     timestamp TIMESTAMPTZ NOT NULL,
     pair TEXT NOT NULL,
     buy_exchange TEXT NOT NULL,
@@ -51,21 +64,121 @@ CREATE TABLE IF NOT EXISTS arbitrage_opportunities (
     sell_exchange TEXT NOT NULL,
     sell_price NUMERIC(18,4) NOT NULL,
     spread NUMERIC(18,4),
-    spread_pct NUMERIC(6,4)
-);
+    spread_pct NUMERIC(6,4),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
 """
 
 CREATE_EXCHANGE_PRICES = """
 CREATE TABLE IF NOT EXISTS exchange_prices (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     pair TEXT NOT NULL,
     exchange_name TEXT NOT NULL,
     price NUMERIC(18,4) NOT NULL,
     timestamp TIMESTAMPTZ NOT NULL,
-    arbitrage_id INTEGER REFERENCES arbitrage_opportunities(id) ON DELETE SET NULL
-);
+    arbitrage_id BIGINT,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+"""
+
+# One row per closed episode (core/episodes.py): a pair whose best route stayed above the threshold
+# from `timestamp` (open) to `closed_at`, summarized. buy/sell_exchange are the route at the peak (with
+# peak_*_price); the best route can switch venues mid-episode, so the opening route is kept alongside
+CREATE_ARBITRAGE_EPISODES = """
+CREATE TABLE IF NOT EXISTS arbitrage_episodes (
+    id BIGSERIAL,
+    timestamp TIMESTAMPTZ NOT NULL,
+    closed_at TIMESTAMPTZ NOT NULL,
+    duration_ms BIGINT NOT NULL,
+    pair TEXT NOT NULL,
+    buy_exchange TEXT NOT NULL,
+    sell_exchange TEXT NOT NULL,
+    ticks INTEGER NOT NULL,
+    open_spread_pct NUMERIC(10,4),
+    peak_spread_pct NUMERIC(10,4),
+    peak_at TIMESTAMPTZ,
+    last_spread_pct NUMERIC(10,4),
+    mean_spread_pct NUMERIC(10,4),
+    peak_net_pct NUMERIC(10,4),
+    open_buy_exchange TEXT NOT NULL,
+    open_sell_exchange TEXT NOT NULL,
+    open_buy_price NUMERIC(18,4),
+    open_sell_price NUMERIC(18,4),
+    peak_buy_price NUMERIC(18,4),
+    peak_sell_price NUMERIC(18,4),
+    close_reason TEXT,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+"""
+
+# (pair, timestamp) serves "this pair over this window"; BRIN on timestamp (rows arrive in time order)
+# serves cross-pair time ranges at a few pages per partition. Also applied to pre-partitioning tables.
+CREATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS arbitrage_opportunities_pair_ts ON arbitrage_opportunities (pair, timestamp);
+CREATE INDEX IF NOT EXISTS arbitrage_opportunities_ts_brin ON arbitrage_opportunities USING BRIN (timestamp);
+CREATE INDEX IF NOT EXISTS exchange_prices_pair_ts ON exchange_prices (pair, timestamp);
+CREATE INDEX IF NOT EXISTS exchange_prices_ts_brin ON exchange_prices USING BRIN (timestamp);
+CREATE INDEX IF NOT EXISTS exchange_prices_arbitrage_id ON exchange_prices (arbitrage_id) WHERE arbitrage_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS trade_log_pair_ts ON trade_log (pair, timestamp);
+CREATE INDEX IF NOT EXISTS trade_log_ts_brin ON trade_log USING BRIN (timestamp);
+CREATE INDEX IF NOT EXISTS arbitrage_episodes_pair_ts ON arbitrage_episodes (pair, timestamp);
+CREATE INDEX IF NOT EXISTS arbitrage_episodes_ts_brin ON arbitrage_episodes USING BRIN (timestamp);
+"""
+
+# The partitioned tables DatabaseLogger writes to
+TABLES = ("arbitrage_opportunities", "exchange_prices", "trade_log", "arbitrage_episodes")
+
+# Column order of the records handed to COPY
+ARB_COLUMNS = (
+    "id", "timestamp", "pair", "buy_exchange", "buy_price",
+    "sell_exchange", "sell_price", "spread", "spread_pct"
+)
+PRICE_COLUMNS = ("pair", "exchange_name", "price", "timestamp", "arbitrage_id")
+TRADE_COLUMNS = (
+    "timestamp", "pair", "buy_exchange", "buy_price",
+    "sell_exchange", "sell_price", "spread", "spread_pct",
+    "net_profit", "gross_profit", "event_type",
+    "close_timestamp", "exit_buy_price", "exit_sell_price",
+    "duration_seconds", "decision_reason", "metadata"
+)
+EPISODE_COLUMNS = (
+    "timestamp", "closed_at", "duration_ms", "pair", "buy_exchange", "sell_exchange", "ticks",
+    "open_spread_pct", "peak_spread_pct", "peak_at", "last_spread_pct", "mean_spread_pct", "peak_net_pct",
+    "open_buy_exchange", "open_sell_exchange", "open_buy_price", "open_sell_price", "peak_buy_price", "peak_sell_price", "close_reason"
+)
+
+# Buffer limits (rows): flush early at FLUSH_ROWS, never hold more than MAX_BUFFERED_ROWS
+FLUSH_ROWS = 5_000
+MAX_BUFFERED_ROWS = 100_000
+# Batches the database rejected wait here (as pickles) until they can be replayed
+SPILL_DIR = os.getenv("DB_SPILL_DIR", ".db_spill")
+ACQUIRE_TIMEOUT = 5.0  # seconds to get a pool connection before the batch is spilled instead
+
+# Journal event kind -> the DatabaseLogger buffer it belongs to
+_BUFFERS = {"arb": "arb_buffer", "price": "price_buffer", "trade": "trade_buffer", "episode": "episode_buffer"}
+
+# Opportunity ids are reserved from the serial in blocks of ID_BLOCK, one round trip per block
+ID_BLOCK = 1000
+RESERVE_ARB_IDS = """
+SELECT nextval(pg_get_serial_sequence('arbitrage_opportunities', 'id'))
+FROM generate_series(1, $1)
 """
 
+
+def _as_datetime(ts) -> datetime:
+    return to_datetime(ts) if isinstance(ts, int) else ts
+
+
+def _trade_record(row: tuple) -> tuple:
+    """trade_buffer row → COPY record: the JSONB metadata dict goes over the wire as JSON text."""
+    metadata = row[-1]
+    return row[:-1] + (json.dumps(metadata) if metadata is not None else None,)
+
+
+def _episode_record(row: tuple) -> tuple:
+    """episode_buffer row → COPY record: epoch-ns open / close / peak times become datetimes."""
+    return (_as_datetime(row[0]), _as_datetime(row[1])) + row[2:9] + (_as_datetime(row[9]),) + row[10:]
+
 def ensure_database(dbname, user, password, host, port):
     conn = psycopg2.connect(dbname='postgres', user=user, password=password, host=host, port=port)
     conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
@@ -78,22 +191,224 @@ def ensure_database(dbname, user, password, host, port):
     cur.close()
     conn.close()
 
-async def ensure_tables(pool):
+async def ensure_tables(pool, partitions: Optional[DailyPartitions] = None):
+    """Create the tables and indexes if missing, plus the partitions for today and the next AHEAD_DAYS."""
+    partitions = partitions or DailyPartitions()
+    today = datetime.now(timezone.utc).date()
     async with pool.acquire() as conn:
         await conn.execute(CREATE_ARBITRAGE_OPPORTUNITIES)
         await conn.execute(CREATE_EXCHANGE_PRICES)
         await conn.execute(CREATE_TRADE_LOG)
+        await conn.execute(CREATE_ARBITRAGE_EPISODES)
+        await conn.execute(CREATE_INDEXES)
+        for table in TABLES:
+            await partitions.ensure(conn, table, today, today + timedelta(days=AHEAD_DAYS))
+
+class StorageBackend(ABC):
+    """
+    Where DatabaseLogger's batches end up. A batch is {"arbs": [...], "prices": [...], "trades": [...],
+    "episodes": [...]} in the buffer formats (timestamps still epoch-ns ints or datetimes); `write_batch` returns None
+    when all of it is stored, else the part that isn't, which the logger spills and retries.
+    Backends are started and closed by whoever creates them.
+    """
+
+    @abstractmethod
+    async def reserve_ids(self, n: int) -> List[int]:
+        """`n` fresh arbitrage_opportunities ids, unique across restarts."""
+
+    @abstractmethod
+    async def write_batch(self, batch: Dict[str, list]) -> Optional[Dict[str, list]]:
+        """Store `batch`; None when all of it is stored, else the part that isn't."""
+
+
+class PostgresBackend(StorageBackend):
+    """The default backend: binary COPY into the daily-partitioned tables created by `ensure_tables`."""
+
+    def __init__(self, db_pool, partitions: Optional[DailyPartitions] = None):
+        self.db_pool = db_pool
+        self.partitions = partitions or DailyPartitions()
+
+    async def reserve_ids(self, n: int) -> List[int]:
+        async with self.db_pool.acquire(timeout=ACQUIRE_TIMEOUT) as conn:
+            return [row[0] for row in await conn.fetch(RESERVE_ARB_IDS, n)]
+
+    async def _copy(self, table: str, records: list, columns: tuple):
+        if records:
+            async with self.db_pool.acquire(timeout=ACQUIRE_TIMEOUT) as conn:
+                await self._ensure_partitions(conn, table, records, columns)
+                await conn.copy_records_to_table(table, records=records, columns=columns)
+
+    async def _ensure_partitions(self, conn, table: str, records: list, columns: tuple):
+        i = columns.index("timestamp")
+        await self.partitions.ensure_rows(conn, table, [record[i] for record in records])
+
+    async def _copy_new_arbs(self, arb_rows: list) -> set:
+        """COPY through a temp table, inserting only ids not already present; returns the ids inserted."""
+        async with self.db_pool.acquire(timeout=ACQUIRE_TIMEOUT) as conn:
+            await self._ensure_partitions(conn, "arbitrage_opportunities", arb_rows, ARB_COLUMNS)
+            async with conn.transaction():
+                await conn.execute(
+                    "CREATE TEMP TABLE arb_replay (LIKE arbitrage_opportunities INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                await conn.copy_records_to_table("arb_replay", records=arb_rows, columns=ARB_COLUMNS)
+                columns = ", ".join(ARB_COLUMNS)
+                rows = await conn.fetch(
+                    f"INSERT INTO arbitrage_opportunities ({columns}) SELECT {columns} FROM arb_replay "
+                    "ON CONFLICT DO NOTHING RETURNING id"
+                )
+        return {row[0] for row in rows}
+
+    async def write_batch(self, batch: Dict[str, list]) -> Optional[Dict[str, list]]:
+        arbs, trades = batch["arbs"], batch["trades"]
+        episodes = batch.get("episodes", [])   # absent from batches spilled by older versions
+        # Epoch-ns ints become datetimes here, at the DB edge
+        prices = [(pair, name, price, _as_datetime(ts), arb_id) for pair, name, price, ts, arb_id in batch["prices"]]
+        arb_rows = []
+        for arb in arbs:
+            arb_rows.append((
+                arb["id"], _as_datetime(arb["timestamp"]), arb["pair"], arb["buy_exchange"], arb["buy_price"],
+                arb["sell_exchange"], arb["sell_price"], arb["spread"], arb["spread_pct"]
+            ))
+            # Each (exchange_name, price, ts) snapshot of this opportunity
+            for name, price, ts in arb["prices"]:
+                prices.append((arb["pair"], name, price, _as_datetime(ts), arb["id"]))
+
+        # 1) Opportunities, trades and episodes are independent: COPY them concurrently on their own connections
+        arb_result, trade_result, episode_result = await asyncio.gather(
+            self._copy("arbitrage_opportunities", arb_rows, ARB_COLUMNS),
+            self._copy("trade_log", [_trade_record(row) for row in trades], TRADE_COLUMNS),
+            self._copy("arbitrage_episodes", [_episode_record(row) for row in episodes], EPISODE_COLUMNS),
+            return_exceptions=True
+        )
+        if isinstance(arb_result, asyncpg.UniqueViolationError):
+            # Replayed after a crash between COPY and journal commit: write only the ids not yet there
+            try:
+                inserted = await self._copy_new_arbs(arb_rows)
+                # Snapshots of the opportunities that were already there were written with them
+                prices = [row for row in prices if row[4] is None or row[4] in inserted]
+                arb_result = None
+            except Exception as e:
+                arb_result = e
+        failed = {"arbs": [], "prices": [], "trades": [], "episodes": []}
+        if isinstance(arb_result, BaseException):
+            # Parents missing: their snapshots can't be written either, retry the lot
+            failed["arbs"], failed["prices"] = arbs, batch["prices"]
+        else:
+            # 2) Price snapshots only once their parents are committed, so readers never see orphans
+            try:
+                await self._copy("exchange_prices", prices, PRICE_COLUMNS)
+            except Exception as e:
+                failed["prices"] = prices
+                arb_result = e
+        if isinstance(trade_result, BaseException):
+            failed["trades"] = trades
+        if isinstance(episode_result, BaseException):
+            failed["episodes"] = episodes
+
+        for error in (arb_result, trade_result, episode_result):
+            if isinstance(error, BaseException):
+                logger.error(f"Error flushing data to database: {error}")
+                logger.debug("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+        return failed if any(failed.values()) else None
+
 
 class DatabaseLogger:
-    def __init__(self, db_pool, flush_interval: float = 10):
+    """
+    Buffers opportunities, price snapshots and trades and writes them through `backend` every
+    `flush_interval` seconds, or as soon as `flush_rows` rows are waiting. The default backend COPYs
+    into Postgres through `db_pool`; db.parquet_sink.ParquetSink writes Parquet files instead.
+
+    Memory is bounded: at most `max_rows` rows are held (buffered plus the batch being written). When
+    full, `overflow="block"` makes the log_* calls wait for the writer (backpressure on the detector);
+    `overflow="drop"` discards the new row and counts it in `dropped`.
+
+    A batch the database rejects (unreachable, timeout, ...) is pickled to `spill_dir` instead of being
+    lost, and replayed oldest first after the next successful flush (also across restarts). If it can't
+    be spilled either, its rows go back into the buffers for the next flush.
+
+    With a `journal` (db.journal.Journal), every event is appended there before it is buffered, and
+    the journal is committed up to the last event of each batch once that batch is in Postgres (or
+    spilled). `recover()` at startup re-buffers whatever a crash left uncommitted. Delivery is
+    at-least-once: events written just before a crash but not yet committed are written again.
+
+    The Postgres tables are partitioned by day; each COPY first creates the partitions its rows fall
+    into if `partitions` (shared with the PartitionRoller) hasn't seen them yet.
+    """
+
+    def __init__(
+        self,
+        db_pool,
+        flush_interval: float = 10,
+        flush_rows: int = FLUSH_ROWS,
+        max_rows: int = MAX_BUFFERED_ROWS,
+        overflow: str = "block",
+        spill_dir: str = SPILL_DIR,
+        journal: Optional[Journal] = None,
+        partitions: Optional[DailyPartitions] = None,
+        backend: Optional[StorageBackend] = None
+    ):
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"overflow must be 'block' or 'drop', not {overflow!r}")
         self.db_pool = db_pool
         self.flush_interval = flush_interval
-        self.arb_buffer = []    # List[Dict], where each dict has keys: timestamp, pair, buy_…, prices=list[(name,price,raw_ts)]
-        self.price_buffer = []  # List[Tuple[pair, exchange_name, price, raw_ts, arbitrage_id]]
+        self.flush_rows = flush_rows
+        self.max_rows = max_rows
+        self.overflow = overflow
+        self.spill_dir = spill_dir
+        self.journal = journal
+        self.backend = backend or PostgresBackend(db_pool, partitions)
+        self._last_seq = 0                # journal sequence number of the newest buffered event
+        # Timestamps stay as given (epoch-ns ints or datetimes) until the rows are written
+        self.arb_buffer = []    # List[Dict], where each dict has keys: id, timestamp, pair, buy_…, prices=list[(name,price,ts)]
+        self.price_buffer = []  # List[Tuple[pair, exchange_name, price, ts, arbitrage_id]]
         self.trade_buffer = []
-        self.lock = asyncio.Lock()
+        self.episode_buffer = []  # List[Tuple] in EPISODE_COLUMNS order, times as epoch ns
+        # arbitrage_opportunities ids reserved ahead from the sequence, handed out at log time (topped up by flush)
+        self._arb_ids: Deque[int] = deque()
+        self.lock = asyncio.Lock()        # guards the buffers
+        self._writing = asyncio.Lock()    # one batch in flight at a time
+        self._inflight = 0                # rows taken off the buffers but not yet written or spilled
+        self._flush_now = asyncio.Event()
+        self._space = asyncio.Event()
+        self._closing = False
+        self._spilled: List[str] = _spill_files(spill_dir)
+        self.dropped = 0
+        if self._spilled:
+            logger.warning(f"{len(self._spilled)} spilled batch(es) in {spill_dir} will be replayed once the database is reachable.")
         self._flush_task = asyncio.create_task(self._flush_loop())
-    
+
+    def _pending(self) -> int:
+        return (
+            len(self.arb_buffer) + len(self.price_buffer) + len(self.trade_buffer) + len(self.episode_buffer)
+            + self._inflight
+        )
+
+    async def _admit(self, rows: int) -> bool:
+        """
+        Make room for `rows` more rows under the cap: wait (block) or refuse (drop). A call larger than
+        the cap itself can never fit, so it is admitted alone, once the buffers are empty.
+        """
+        while self._pending() + rows > self.max_rows and self._pending():
+            if self.overflow == "drop":
+                self.dropped += rows
+                if self.dropped == rows or self.dropped % 1000 < rows:
+                    logger.warning(f"DB buffers full ({self.max_rows} rows): dropped {self.dropped} rows so far.")
+                return False
+            self._space.clear()
+            self._flush_now.set()
+            await self._space.wait()
+        return True
+
+    def _buffer(self, kind: str, row):
+        """Journal the event first (when journaling), then buffer it for the next flush."""
+        if self.journal is not None:
+            self._last_seq = self.journal.append(pickle.dumps((kind, row), protocol=pickle.HIGHEST_PROTOCOL))
+        getattr(self, _BUFFERS[kind]).append(row)
+
+    def _added(self):
+        if self._pending() >= self.flush_rows:
+            self._flush_now.set()
+
     async def log_opportunity(
         self,
         pair: str,
@@ -106,29 +421,21 @@ class DatabaseLogger:
         prices: PricesType
     ):
         """
-        `prices` is a list of (exchange_name, price, ts), where ts might be a datetime or a "HH:MM:SS" string.
-        We convert each `ts` to a datetime here, then store a list of (name, price, raw_ts).
+        `prices` is a list of (exchange_name, price, ts), where ts is an aware datetime (as from
+        `MarketMatrix.quotes`) or epoch nanoseconds; ints are converted only when the row is written.
         """
         if not prices:
             logger.warning(f"No prices provided for {pair} arbitrage opportunity.")
             return
-
-        # Convert each ts → raw_ts as a datetime.datetime in UTC
-        converted_prices: List[Tuple[str, float, datetime]] = []
-        for name, price, ts in prices:
-            if isinstance(ts, str):
-                # parse "HH:MM:SS" as today’s date in UTC
-                t = datetime.strptime(ts, "%H:%M:%S.%f").time()
-                raw_ts = datetime.combine(date.today(), t, tzinfo=timezone.utc)
-            else:
-                # assume ts is already a datetime
-                raw_ts = ts
-            converted_prices.append((name, price, raw_ts))
+        if not await self._admit(1):
+            return
 
         async with self.lock:
-            self.arb_buffer.append({
+            self._buffer("arb", {
+                # Known up front so price snapshots can be COPYed with it; None until the first block is reserved
+                "id": self._arb_ids.popleft() if self._arb_ids else None,
                 # The timestamp of *when* we detected this opportunity
-                "timestamp": datetime.now(tz=timezone.utc),
+                "timestamp": time.time_ns(),
                 "pair": pair,
                 "buy_exchange": buy_exchange,
                 "buy_price": buy_price,
@@ -136,9 +443,10 @@ class DatabaseLogger:
                 "sell_price": sell_price,
                 "spread": spread,
                 "spread_pct": spread_pct,
-                # A list of (exchange_name, price, raw_ts) for logger into exchange_prices
-                "prices": converted_prices
+                # A list of (exchange_name, price, ts) for logger into exchange_prices
+                "prices": prices
             })
+        self._added()
 
     async def log_prices(
         self,
@@ -146,17 +454,17 @@ class DatabaseLogger:
         prices: PricesType
     ):
         """
-        For simple price logger (no arbitrage), same idea: convert ts → datetime if needed.
+        For simple price logger (no arbitrage), same idea: ts is a datetime or epoch ns.
+        Rows land in exchange_prices with no arbitrage_id on the next flush. To persist every
+        quote from every venue, subscribe a `db.tick_archive.TickArchive` to the fetchers instead.
         """
+        if not await self._admit(len(prices)):
+            return
         async with self.lock:
             for name, price, ts in prices:
-                if isinstance(ts, str):
-                    t = datetime.strptime(ts, "%H:%M:%S.%f").time()
-                    raw_ts = datetime.combine(date.today(), t, tzinfo=timezone.utc)
-                else:
-                    raw_ts = ts
                 # Append a tuple matching the INSERT: (pair, exchange_name, price, timestamp, arbitrage_id=None)
-                self.price_buffer.append((pair, name, price, raw_ts, None))
+                self._buffer("price", (pair, name, price, ts, None))
+        self._added()
     
     async def log_trade(
         self,
@@ -178,105 +486,197 @@ class DatabaseLogger:
         decision_reason: str = None,
         metadata: Dict = None
     ):
+        if not await self._admit(1):
+            return
         async with self.lock:
-            self.trade_buffer.append((
+            self._buffer("trade", (
                 timestamp, pair, buy_exchange, buy_price,
                 sell_exchange, sell_price, spread, spread_pct,
                 net_profit, gross_profit, event_type,
                 close_timestamp, exit_buy_price, exit_sell_price,
                 duration_seconds, decision_reason, metadata
             ))
+        self._added()
+
+    async def log_episode(
+        self,
+        opened_ns: int,
+        closed_ns: int,
+        pair: str,
+        buy_exchange: str,
+        sell_exchange: str,
+        ticks: int,
+        open_spread_pct: float,
+        peak_spread_pct: float,
+        peak_ns: int,
+        last_spread_pct: float,
+        mean_spread_pct: float,
+        peak_net_pct: float,
+        open_buy_exchange: str,
+        open_sell_exchange: str,
+        open_buy_price: float,
+        open_sell_price: float,
+        peak_buy_price: float,
+        peak_sell_price: float,
+        close_reason: str
+    ):
+        """One closed episode (see core.episodes.EpisodeTracker) → arbitrage_episodes on the next flush."""
+        if not await self._admit(1):
+            return
+        async with self.lock:
+            self._buffer("episode", (
+                opened_ns, closed_ns, (closed_ns - opened_ns) // 1_000_000, pair, buy_exchange, sell_exchange, ticks,
+                open_spread_pct, peak_spread_pct, peak_ns, last_spread_pct, mean_spread_pct, peak_net_pct,
+                open_buy_exchange, open_sell_exchange, open_buy_price, open_sell_price,
+                peak_buy_price, peak_sell_price, close_reason
+            ))
+        self._added()
+
 
+    async def recover(self) -> int:
+        """Re-buffer (and flush) the journaled events a crash left uncommitted. Call once at startup, before logging."""
+        if self.journal is None:
+            return 0
+        journal = self.journal
+        records = await asyncio.to_thread(lambda: list(journal.replay(journal.last_seq)))
+        for seq, payload in records:
+            kind, row = pickle.loads(payload)
+            async with self.lock:
+                getattr(self, _BUFFERS[kind]).append(row)
+                self._last_seq = seq
+            if self._pending() >= self.flush_rows:
+                await self.flush()
+        await self.flush()
+        if records:
+            logger.info(f"Recovered {len(records)} journaled events.")
+        return len(records)
 
     async def _flush_loop(self):
-        while True:
-            await asyncio.sleep(self.flush_interval)
-            if len(self.arb_buffer) + len(self.price_buffer) > 500:
-                logger.debug("Large buffer detected, flushing early.")
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
             await self.flush()
 
     async def flush(self):
+        """Write everything buffered; on success, also replay batches spilled during earlier outages."""
+        async with self._writing:
+            async with self.lock:
+                batch = {
+                    "arbs": self.arb_buffer, "prices": self.price_buffer,
+                    "trades": self.trade_buffer, "episodes": self.episode_buffer
+                }
+                self.arb_buffer, self.price_buffer, self.trade_buffer, self.episode_buffer = [], [], [], []
+                self._inflight = sum(len(rows) for rows in batch.values())
+                upto = self._last_seq
+            try:
+                if self._inflight:
+                    failed = await self._write_batch(batch)
+                    if failed is not None and not await self._spill(failed):
+                        # Neither written nor spilled: keep the rows for the next flush, and the journal uncommitted
+                        await self._requeue(failed)
+                        return
+                    if self.journal is not None:
+                        await self.journal.commit(upto)
+                    if failed is not None:
+                        return
+                await self._replay()
+            finally:
+                self._inflight = 0
+                self._space.set()
+
+    async def _write_batch(self, batch: Dict[str, list]) -> Optional[Dict[str, list]]:
+        """
+        Hand one batch to the backend. Returns None when everything was written, else the part that
+        wasn't (each table commits on its own, so only the failed part may be written again).
+        """
+        try:
+            # Ids for opportunities logged before a block was available, plus the next block when
+            # the reserve runs low: at most one reservation round trip per flush
+            missing = [arb for arb in batch["arbs"] if arb["id"] is None]
+            top_up = ID_BLOCK if len(self._arb_ids) < ID_BLOCK // 2 else 0
+            if missing or top_up:
+                ids = await self.backend.reserve_ids(len(missing) + top_up)
+                for arb, arb_id in zip(missing, ids):
+                    arb["id"] = arb_id
+                self._arb_ids.extend(ids[len(missing):])
+        except Exception as e:
+            logger.error(f"Error flushing data to database: {e}")
+            logger.debug(traceback.format_exc())
+            return batch
+        return await self.backend.write_batch(batch)
+
+    # --- Spill / replay ---
+    async def _spill(self, batch: Dict[str, list]) -> bool:
+        path = os.path.join(self.spill_dir, f"batch-{time.time_ns()}.pkl")
+        try:
+            await asyncio.to_thread(_write_spill, path, batch)
+        except OSError as e:
+            logger.error(f"Could not spill {sum(len(rows) for rows in batch.values())} rows to {path}; keeping them buffered: {e}")
+            return False
+        self._spilled.append(path)
+        logger.warning(f"Database write failed; batch spilled to {path} ({len(self._spilled)} pending).")
+        return True
+
+    async def _requeue(self, batch: Dict[str, list]):
+        """Put a batch's rows back in front of the buffers, to go out (oldest first) with the next flush."""
         async with self.lock:
-            # Nothing to write?
-            if not self.arb_buffer and not self.price_buffer:
-                return
+            self.arb_buffer = batch.get("arbs", []) + self.arb_buffer
+            self.price_buffer = batch.get("prices", []) + self.price_buffer
+            self.trade_buffer = batch.get("trades", []) + self.trade_buffer
+            self.episode_buffer = batch.get("episodes", []) + self.episode_buffer
 
+    async def _replay(self):
+        """Write spilled batches back, oldest first, stopping at the first one the database still rejects."""
+        while self._spilled:
+            path = self._spilled[0]
             try:
-                self.price_buffer.clear()
-                async with self.db_pool.acquire() as conn:
-                    async with conn.transaction():
-                        # 1) Insert every arbitrage opportunity and collect its new arb_id
-                        for arb in self.arb_buffer:
-                            arb_id = await conn.fetchval(
-                                """
-                                INSERT INTO arbitrage_opportunities (
-                                    timestamp, pair, buy_exchange, buy_price,
-                                    sell_exchange, sell_price, spread, spread_pct
-                                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                                RETURNING id
-                                """,
-                                arb["timestamp"],
-                                arb["pair"],
-                                arb["buy_exchange"],
-                                arb["buy_price"],
-                                arb["sell_exchange"],
-                                arb["sell_price"],
-                                arb["spread"],
-                                arb["spread_pct"]
-                            )
-
-
-                            # 2) For each (exchange_name, price, raw_ts) in this arbitrage,
-                            #    buffer rows into price_buffer with this arb_id
-                            for name, price, raw_ts in arb["prices"]:
-                                self.price_buffer.append(
-                                    (arb["pair"], name, price, raw_ts, arb_id)
-                                )
-                        # Uncomment this if you want to insert prices immediately
-                        # 3) Now insert *all* buffered prices (including those just added above)
-                        # await conn.executemany(
-                        #     """
-                        #       INSERT INTO exchange_prices
-                        #         (pair, exchange_name, price, timestamp, arbitrage_id)
-                        #       VALUES ($1, $2, $3, $4, $5)
-                        #     """,
-                        #     self.price_buffer
-                        # )
-                        # 4) Insert all buffered trades
-                        if self.trade_buffer:
-                            await conn.executemany(
-                                """
-                                INSERT INTO trade_log (
-                                    timestamp, pair, buy_exchange, buy_price,
-                                    sell_exchange, sell_price, spread, spread_pct,
-                                    net_profit, gross_profit, event_type,
-                                    close_timestamp, exit_buy_price, exit_sell_price,
-                                    duration_seconds, decision_reason, metadata
-                                ) VALUES (
-                                    $1, $2, $3, $4,
-                                    $5, $6, $7, $8,
-                                    $9, $10, $11,
-                                    $12, $13, $14,
-                                    $15, $16, $17
-                                )
-                                """,
-                                self.trade_buffer
-                            )
-            except Exception as e:
-                logger.error(f"Error flushing data to database: {e}")
-                logger.debug(traceback.format_exc())
-
-            finally:
-                # Whether success or failure, clear both buffers
-                self.arb_buffer.clear()
-                self.price_buffer.clear()
-                self.trade_buffer.clear()
+                batch = await asyncio.to_thread(_read_spill, path)
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                logger.error(f"Skipping unreadable spill file {path}: {e}")
+                self._spilled.pop(0)
+                continue
+            failed = await self._write_batch(batch)
+            if failed is not None:
+                # Keep only what is still missing, so rows that made it aren't written twice
+                try:
+                    await asyncio.to_thread(_write_spill, path, failed)
+                except OSError as e:
+                    # The file still holds the whole batch: nothing is lost, the written part comes again
+                    logger.error(f"Could not rewrite spill file {path}; it is kept as is: {e}")
+                return
+            await asyncio.to_thread(os.remove, path)
+            self._spilled.pop(0)
+            logger.info(f"Replayed spilled batch {path} ({len(self._spilled)} left).")
 
     async def close(self):
-        # Flush any remaining data, then cancel the background task
+        # Let the background task finish its current flush (never cancel a batch mid-write), then flush the rest
+        self._closing = True
+        self._flush_now.set()
+        await self._flush_task
         await self.flush()
-        self._flush_task.cancel()
-        try:
-            await self._flush_task
-        except asyncio.CancelledError:
-            pass
+
+
+def _spill_files(spill_dir: str) -> List[str]:
+    try:
+        names = sorted(name for name in os.listdir(spill_dir) if name.startswith("batch-") and name.endswith(".pkl"))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(spill_dir, name) for name in names]
+
+
+def _write_spill(path: str, batch: Dict[str, list]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())   # durable before the journal is committed past it
+    os.replace(tmp, path)  # a crash mid-write never leaves a truncated batch behind
+
+
+def _read_spill(path: str) -> Dict[str, list]:
+    with open(path, "rb") as f:
+        return pickle.load(f)
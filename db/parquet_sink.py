@@ -0,0 +1,255 @@
+# db/parquet_sink.py
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+from db.logger import ARB_COLUMNS, EPISODE_COLUMNS, PRICE_COLUMNS, TRADE_COLUMNS, StorageBackend, _trade_record
+from db.partitions import utc_day
+from db.tick_archive import COLUMNS as TICK_COLUMNS
+from utils.timestamps import to_ns
+import traceback
+import logging
+import asyncio
+import time
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:   # optional: only needed for STORAGE_BACKEND=parquet (pip install pyarrow)
+    pa = ds = pq = None
+
+logger = logging.getLogger("cex_dex_arbitrage.db.parquet_sink")
+
+PARQUET_DIR = os.getenv("PARQUET_DIR", "data/parquet")
+ROW_GROUP_ROWS = 100_000   # ticks per row group; also what is held in memory per (day, pair) before writing
+ROLL_SECONDS = 300         # a tick file is finished (and becomes visible) after this long
+COMPRESSION = "zstd"
+
+# Low-cardinality text columns, stored as Arrow dictionaries (and RLE_DICTIONARY-encoded in the file)
+DICTIONARY_COLUMNS = {
+    "exchange_name", "buy_exchange", "sell_exchange", "open_buy_exchange", "open_sell_exchange", "event_type", "close_reason"
+}
+TIMESTAMP_COLUMNS = {"timestamp", "close_timestamp", "closed_at", "peak_at"}
+INTEGER_COLUMNS = {"id", "arbitrage_id", "duration_seconds", "duration_ms", "ticks"}
+STRING_COLUMNS = {"decision_reason", "metadata"}
+
+
+def _arrow_type(column: str):
+    if column in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    if column in TIMESTAMP_COLUMNS:
+        return pa.timestamp("ns", tz="UTC")
+    if column in INTEGER_COLUMNS:
+        return pa.int64()
+    if column in STRING_COLUMNS:
+        return pa.string()
+    return pa.float64()
+
+
+def _arrow_table(rows: List[tuple], columns: Tuple[str, ...]):
+    """Rows (in `columns` order) → Arrow table without the `pair` column, which is in the directory name."""
+    arrays, fields = [], []
+    for column, values in zip(columns, zip(*rows)):
+        if column == "pair":
+            continue
+        kind = _arrow_type(column)
+        if column in DICTIONARY_COLUMNS:
+            array = pa.array(values, pa.string()).dictionary_encode()
+        elif column in TIMESTAMP_COLUMNS:
+            array = pa.array([None if v is None else to_ns(v) for v in values], pa.int64()).cast(kind)
+        else:
+            array = pa.array(values, kind)
+        arrays.append(array)
+        fields.append(pa.field(column, kind))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def _by_partition(rows: List[tuple], columns: Tuple[str, ...]) -> Dict[Tuple[date, str], List[tuple]]:
+    """Group rows by (UTC day, pair)."""
+    ts_i, pair_i = columns.index("timestamp"), columns.index("pair")
+    stamps = [to_ns(row[ts_i]) for row in rows]   # ints and datetimes may be mixed
+    first = utc_day(min(stamps))
+    same_day = first == utc_day(max(stamps))
+    groups: Dict[Tuple[date, str], List[tuple]] = {}
+    for row, ts in zip(rows, stamps):
+        key = (first if same_day else utc_day(ts), row[pair_i])
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [row]
+        else:
+            group.append(row)
+    return groups
+
+
+def read_dataset(table: str, root: str = PARQUET_DIR):
+    """
+    A pyarrow dataset over one table; `date` and `pair` come back as (dictionary) partition columns.
+    Dictionaries differ between files: `.unify_dictionaries()` a table before a pyarrow `group_by`.
+
+        read_dataset("price_ticks").to_table(filter=ds.field("pair") == "SOL/USDC", columns=["timestamp", "price"])
+    """
+    return ds.dataset(
+        os.path.join(root, table), format="parquet",
+        partitioning=ds.HivePartitioning.discover(infer_dictionary=True)
+    )
+
+
+class ParquetSink(StorageBackend):
+    """
+    Writes opportunities, price snapshots, trades, episodes and (for TickArchive) ticks as Parquet instead of
+    Postgres, laid out for partition pruning by any Parquet reader (pyarrow, DuckDB, Spark, ...):
+
+        <root>/<table>/date=2026-10-17/pair=SOL%2FUSDC/part-<ns>.parquet
+
+    Exchange, event type and pair are dictionary-encoded (pair via the directory). Files are written
+    under a hidden in-progress name and renamed when complete, so readers never see a partial file.
+
+    DatabaseLogger batches are written one file per (day, pair) per flush and are on disk when
+    `write_batch` returns, so the journal and spill logic work unchanged. Ticks are accumulated per
+    (day, pair) into row groups of `row_group_rows` and appended to a file that is finished after
+    `roll_seconds` (or at `close()`); a crash loses the unfinished files, like the tick ring itself.
+    """
+
+    def __init__(
+        self,
+        root: str = PARQUET_DIR,
+        row_group_rows: int = ROW_GROUP_ROWS,
+        roll_seconds: float = ROLL_SECONDS,
+        compression: str = COMPRESSION
+    ):
+        if pa is None:
+            raise ImportError("ParquetSink needs pyarrow: pip install pyarrow")
+        self.root = root
+        self.row_group_rows = row_group_rows
+        self.roll_seconds = roll_seconds
+        self.compression = compression
+        self._next_id = 0
+        self._lock = asyncio.Lock()
+        # Per (day, pair): ticks not yet in a row group, the open file (writer, in-progress path, final
+        # path) and when the first tick of the current file arrived
+        self._ticks: Dict[Tuple[date, str], List[tuple]] = {}
+        self._writers: Dict[Tuple[date, str], tuple] = {}
+        self._since: Dict[Tuple[date, str], float] = {}
+
+    # --- DatabaseLogger backend ---
+    async def reserve_ids(self, n: int) -> List[int]:
+        # Microseconds since the epoch, never reused: unique across restarts below a million ids/s
+        start = max(self._next_id, time.time_ns() // 1000)
+        self._next_id = start + n
+        return list(range(start, start + n))
+
+    async def write_batch(self, batch: Dict[str, list]) -> Optional[Dict[str, list]]:
+        arbs, trades = batch["arbs"], batch["trades"]
+        prices = list(batch["prices"])
+        arb_rows = []
+        for arb in arbs:
+            arb_rows.append((
+                arb["id"], arb["timestamp"], arb["pair"], arb["buy_exchange"], arb["buy_price"],
+                arb["sell_exchange"], arb["sell_price"], arb["spread"], arb["spread_pct"]
+            ))
+            for name, price, ts in arb["prices"]:
+                prices.append((arb["pair"], name, price, ts, arb["id"]))
+
+        failed = {"arbs": [], "prices": [], "trades": [], "episodes": []}
+        try:
+            await asyncio.to_thread(self._write_files, "arbitrage_opportunities", arb_rows, ARB_COLUMNS)
+        except Exception as e:
+            failed["arbs"], failed["prices"] = arbs, batch["prices"]
+            logger.error(f"[ParquetSink] Error writing opportunities: {e}")
+            logger.debug(traceback.format_exc())
+        else:
+            # The opportunities are on disk: only their snapshots are retried (as plain price rows,
+            # keeping their arbitrage_id), so a replay never writes an opportunity twice
+            try:
+                await asyncio.to_thread(self._write_files, "exchange_prices", prices, PRICE_COLUMNS)
+            except Exception as e:
+                failed["prices"] = prices
+                logger.error(f"[ParquetSink] Error writing price snapshots: {e}")
+                logger.debug(traceback.format_exc())
+        try:
+            records = [_trade_record(row) for row in trades]
+            await asyncio.to_thread(self._write_files, "trade_log", records, TRADE_COLUMNS)
+        except Exception as e:
+            failed["trades"] = trades
+            logger.error(f"[ParquetSink] Error writing trades: {e}")
+            logger.debug(traceback.format_exc())
+        episodes = batch.get("episodes", [])
+        try:
+            await asyncio.to_thread(self._write_files, "arbitrage_episodes", episodes, EPISODE_COLUMNS)
+        except Exception as e:
+            failed["episodes"] = episodes
+            logger.error(f"[ParquetSink] Error writing episodes: {e}")
+            logger.debug(traceback.format_exc())
+        return failed if any(failed.values()) else None
+
+    def _write_files(self, table: str, rows: List[tuple], columns: Tuple[str, ...]):
+        if not rows:
+            return
+        for (day, pair), group in _by_partition(rows, columns).items():
+            path = os.path.join(self._directory(table, day, pair), f"part-{time.time_ns()}.parquet")
+            tmp = self._in_progress(path)
+            pq.write_table(_arrow_table(group, columns), tmp, compression=self.compression)
+            os.replace(tmp, path)
+
+    # --- TickArchive sink ---
+    async def write_ticks(self, batch: List[tuple]):
+        """Take a TickArchive batch ((exchange_name, pair, ts_ns, price, bid, ask) tuples)."""
+        async with self._lock:
+            now = time.monotonic()
+            groups = _by_partition(batch, TICK_COLUMNS)
+            for key, rows in groups.items():
+                self._since.setdefault(key, now)
+                pending = self._ticks.setdefault(key, [])
+                pending.extend(rows)
+                if len(pending) >= self.row_group_rows:
+                    self._ticks[key] = []
+                    await asyncio.to_thread(self._append_row_group, key, pending)
+            # Files of days before the newest one in the batch are complete too
+            await asyncio.to_thread(self._roll, now, max(day for day, _ in groups))
+
+    def _append_row_group(self, key: Tuple[date, str], rows: List[tuple]):
+        entry = self._writers.get(key)
+        table = _arrow_table(rows, TICK_COLUMNS)
+        if entry is None:
+            day, pair = key
+            path = os.path.join(self._directory("price_ticks", day, pair), f"part-{time.time_ns()}.parquet")
+            tmp = self._in_progress(path)
+            entry = self._writers[key] = (pq.ParquetWriter(tmp, table.schema, compression=self.compression), tmp, path)
+        entry[0].write_table(table, row_group_size=len(rows))
+
+    def _roll(self, now: Optional[float] = None, today: Optional[date] = None):
+        """
+        Finish the (day, pair) tick files started over `roll_seconds` ago or for a day before `today`
+        (all of them when `now` is None).
+        """
+        for key, since in list(self._since.items()):
+            if now is not None and now - since < self.roll_seconds and (today is None or key[0] >= today):
+                continue
+            pending = self._ticks.pop(key, None)
+            if pending:
+                self._append_row_group(key, pending)
+            entry = self._writers.pop(key, None)
+            if entry is not None:
+                writer, tmp, path = entry
+                writer.close()
+                os.replace(tmp, path)
+            del self._since[key]
+
+    async def close(self):
+        """Write the ticks still held and finish every open file."""
+        async with self._lock:
+            await asyncio.to_thread(self._roll)
+
+    # --- Layout ---
+    def _directory(self, table: str, day: date, pair: str) -> str:
+        directory = os.path.join(self.root, table, f"date={day.isoformat()}", f"pair={quote(pair, safe='')}")
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @staticmethod
+    def _in_progress(path: str) -> str:
+        # Leading "." keeps the file out of dataset discovery until it is renamed
+        directory, name = os.path.split(path)
+        return os.path.join(directory, f".{name}.inprogress")
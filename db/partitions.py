@@ -0,0 +1,176 @@
+# db/partitions.py
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+import traceback
+import logging
+import asyncio
+
+logger = logging.getLogger("cex_dex_arbitrage.db.partitions")
+
+AHEAD_DAYS = 2              # daily partitions created in advance
+MAINTENANCE_INTERVAL = 3600 # seconds between rollover runs
+
+IS_PARTITIONED = "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass($1))"
+LIST_PARTITIONS = """
+SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = to_regclass($1)
+"""
+
+
+def utc_day(ts) -> date:
+    """UTC calendar day of an epoch-ns int or an aware datetime (the partition a row lands in)."""
+    if isinstance(ts, int):
+        return datetime.fromtimestamp(ts / 1e9, timezone.utc).date()
+    return ts.astimezone(timezone.utc).date()
+
+
+def partition_name(table: str, day: date) -> str:
+    return f"{table}_{day:%Y%m%d}"
+
+
+class DailyPartitions:
+    """
+    Creates the daily (UTC) partitions of range-partitioned tables on first use and remembers which
+    exist, so a write only pays a round trip for a day it hasn't seen. Tables created before they were
+    partitioned (plain heaps from older versions) are detected once and left alone.
+
+    Share one instance between the writers and the `PartitionRoller`, so a partition the roller dropped
+    is created again if a late row (e.g. a replayed spill) still falls into it.
+    """
+
+    def __init__(self):
+        self._known: Set[str] = set()
+        self._partitioned: Dict[str, bool] = {}
+
+    async def is_partitioned(self, conn, table: str) -> bool:
+        if table not in self._partitioned:
+            self._partitioned[table] = await conn.fetchval(IS_PARTITIONED, table)
+            if not self._partitioned[table]:
+                logger.warning(
+                    f"[Partitions] {table} is not partitioned (created by an older version): no daily partitions "
+                    f"and no retention for it. To migrate, rename it, restart so it is recreated partitioned, then "
+                    f"copy the rows across."
+                )
+        return self._partitioned[table]
+
+    async def ensure(self, conn, table: str, first: date, last: date) -> List[str]:
+        """Create the partitions of `table` covering [first, last] not seen before; returns their names."""
+        created = []
+        if not await self.is_partitioned(conn, table):
+            return created
+        day = first
+        while day <= last:
+            name = partition_name(table, day)
+            if name not in self._known:
+                await conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{day} 00:00+00') TO ('{day + timedelta(days=1)} 00:00+00')"
+                )
+                self._known.add(name)
+                created.append(name)
+            day += timedelta(days=1)
+        return created
+
+    async def ensure_rows(self, conn, table: str, stamps: list) -> List[str]:
+        """`ensure` for the days spanned by a batch's timestamps (epoch-ns ints or datetimes)."""
+        stamps = [ts for ts in stamps if ts is not None]   # NULLs are left for Postgres to reject
+        if not stamps:
+            return []
+        first, last = utc_day(min(stamps)), utc_day(max(stamps))
+        if (last - first).days <= 1:
+            return await self.ensure(conn, table, first, last)
+        # A batch spanning a gap (e.g. a late replay next to fresh rows): only the days actually present
+        created = []
+        for day in sorted({utc_day(ts) for ts in stamps}):
+            created += await self.ensure(conn, table, day, day)
+        return created
+
+    async def drop_before(self, conn, table: str, cutoff: date) -> List[str]:
+        """Drop every daily partition of `table` for a day before `cutoff`; returns the ones dropped."""
+        dropped = []
+        if not await self.is_partitioned(conn, table):
+            return dropped
+        prefix = f"{table}_"
+        for row in await conn.fetch(LIST_PARTITIONS, table):
+            name = row[0]
+            try:
+                day = datetime.strptime(name[len(prefix):], "%Y%m%d").date() if name.startswith(prefix) else None
+            except ValueError:
+                day = None
+            if day is not None and day < cutoff:
+                await conn.execute(f"DROP TABLE IF EXISTS {name}")
+                self._known.discard(name)
+                dropped.append(name)
+        return dropped
+
+
+class PartitionRoller:
+    """
+    Rollover/retention job for the daily-partitioned tables. Every `interval` seconds it creates the
+    partitions for today and the next `ahead_days` (so writes never wait on DDL at midnight), and drops
+    whole partitions older than each table's retention in days (`None` keeps everything). Dropping a
+    partition is a catalog operation: no DELETE, no bloat, no vacuum.
+
+        roller = PartitionRoller(pool, {"price_ticks": 7, "exchange_prices": 30, "trade_log": None})
+        await roller.start()
+    """
+
+    def __init__(
+        self,
+        db_pool,
+        retention: Dict[str, Optional[int]],
+        ahead_days: int = AHEAD_DAYS,
+        interval: float = MAINTENANCE_INTERVAL,
+        partitions: Optional[DailyPartitions] = None
+    ):
+        self.db_pool = db_pool
+        self.retention = retention
+        self.ahead_days = ahead_days
+        self.interval = interval
+        self.partitions = partitions or DailyPartitions()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        # A failed first pass (DB briefly unreachable) is retried by the loop; writers create the
+        # partitions they need on their own meanwhile
+        await self._run_logged()
+        self._task = asyncio.create_task(self._loop())
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._run_logged()
+
+    async def _run_logged(self):
+        try:
+            await self.run_once()
+        except Exception as e:
+            logger.error(f"[Partitions] Maintenance failed: {e}")
+            logger.debug(traceback.format_exc())
+
+    async def run_once(self, today: Optional[date] = None) -> Dict[str, Dict[str, List[str]]]:
+        """One rollover pass; returns {table: {"created": [...], "dropped": [...]}}."""
+        today = today or datetime.now(timezone.utc).date()
+        result = {}
+        async with self.db_pool.acquire() as conn:
+            for table, days in self.retention.items():
+                created = await self.partitions.ensure(conn, table, today, today + timedelta(days=self.ahead_days))
+                dropped = []
+                if days is not None and not await self.partitions.is_partitioned(conn, table):
+                    logger.warning(f"[Partitions] Retention of {days} days for {table} is not applied: the table is not partitioned.")
+                elif days is not None:
+                    dropped = await self.partitions.drop_before(conn, table, today - timedelta(days=days))
+                if dropped:
+                    logger.info(f"[Partitions] Dropped {len(dropped)} partitions of {table} older than {days} days.")
+                result[table] = {"created": created, "dropped": dropped}
+        return result
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,250 @@
+# db/tick_archive.py
+
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import deque
+from db.logger import ACQUIRE_TIMEOUT, SPILL_DIR, _read_spill, _spill_files, _write_spill
+from db.partitions import DailyPartitions
+import traceback
+import logging
+import asyncio
+import pickle
+import struct
+import time
+import os
+
+logger = logging.getLogger("cex_dex_arbitrage.db.tick_archive")
+
+RING_CAPACITY = 500_000   # ticks held in memory at most; the oldest are dropped beyond that
+BATCH_SIZE = 20_000       # ticks per COPY
+FLUSH_INTERVAL = 1.0      # seconds; a full batch is written without waiting
+
+# Every quote from every venue, partitioned by day so old days can be dropped or detached whole
+CREATE_PRICE_TICKS = """
+CREATE TABLE IF NOT EXISTS price_ticks (
+    timestamp TIMESTAMPTZ NOT NULL,
+    exchange_name TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    price DOUBLE PRECISION NOT NULL,
+    bid DOUBLE PRECISION,
+    ask DOUBLE PRECISION
+) PARTITION BY RANGE (timestamp);
+"""
+
+CREATE_PRICE_TICKS_INDEX = """
+CREATE INDEX IF NOT EXISTS price_ticks_timestamp_brin ON price_ticks USING BRIN (timestamp);
+"""
+
+# Order of the fields in each encoded COPY row
+COLUMNS = ("exchange_name", "pair", "timestamp", "price", "bid", "ask")
+
+# --- PostgreSQL binary COPY encoding ---
+_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_TRAILER = struct.pack(">h", -1)
+_NULL = struct.pack(">i", -1)
+_TS_PRICE = struct.Struct(">iqid")   # timestamp (µs since 2000-01-01 UTC), price
+_FLOAT = struct.Struct(">id")
+_BID_ASK = struct.Struct(">idid")
+_PG_EPOCH_US = 946_684_800_000_000   # 2000-01-01 in Unix µs
+
+
+def _text(value: str) -> bytes:
+    data = value.encode()
+    return struct.pack(">i", len(data)) + data
+
+
+class TickArchive:
+    """
+    Persists every quote from every venue into `price_ticks`. Subscribe `on_quote` to the fetchers:
+    it only appends to a bounded in-memory ring. A background writer drains the ring in batches and
+    streams them with one binary COPY each (rows are encoded here straight from the epoch-ns ints,
+    no datetime per tick), creating the daily partition a batch falls into on first use.
+
+    If the writer can't keep up, the ring overwrites its oldest ticks and counts them in `dropped`.
+    A batch that can't be written (database unreachable, no connection within ACQUIRE_TIMEOUT, ...)
+    is spilled to `spill_dir` the same way DatabaseLogger spills its batches, along with the rest of
+    that flush, and replayed oldest first after the next successful write (also across restarts).
+    Only a batch that can't be spilled either is lost, and counted in `failed`.
+
+    With a `sink` (db.parquet_sink.ParquetSink) the batches go to its `write_ticks` instead, and no
+    database is needed (`db_pool` may be None).
+    """
+
+    def __init__(
+        self,
+        db_pool,
+        capacity: int = RING_CAPACITY,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        partitions: Optional[DailyPartitions] = None,
+        sink=None,
+        spill_dir: str = os.path.join(SPILL_DIR, "ticks")
+    ):
+        self.db_pool = db_pool
+        self.sink = sink
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_dir = spill_dir
+        self._spilled: List[str] = _spill_files(spill_dir)
+        if self._spilled:
+            logger.warning(f"[TickArchive] {len(self._spilled)} spilled batch(es) in {spill_dir} will be replayed once writes succeed.")
+        # (exchange_name, pair, ts_ns, price, bid, ask)
+        self._ring: Deque[tuple] = deque(maxlen=capacity)
+        self._ready = asyncio.Event()
+        self._prefixes: Dict[Tuple[str, str], bytes] = {}
+        self.partitions = partitions or DailyPartitions()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.received = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    async def start(self):
+        if self.sink is None:
+            async with self.db_pool.acquire() as conn:
+                await conn.execute(CREATE_PRICE_TICKS)
+                await conn.execute(CREATE_PRICE_TICKS_INDEX)
+        self._task = asyncio.create_task(self._writer_loop())
+
+    def on_quote(self, fetcher, symbol: str, price: float, ts_ns: int):
+        """Fetcher subscriber (same signature as `MarketMatrix.on_quote`)."""
+        ring = self._ring
+        if len(ring) == self.capacity:
+            self.dropped += 1
+        quote = fetcher.latest_prices.get(symbol)
+        if quote is not None:
+            ring.append((fetcher.name, symbol, ts_ns, price, quote.bid, quote.ask))
+        else:
+            ring.append((fetcher.name, symbol, ts_ns, price, None, None))
+        self.received += 1
+        if len(ring) >= self.batch_size:
+            self._ready.set()
+
+    # --- Writer ---
+    async def _writer_loop(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._ready.clear()
+            await self.flush()
+
+    async def flush(self):
+        """
+        Write what is in the ring when called, one batch at a time. After a failed write the rest is
+        spilled without trying again; after a successful one, earlier spilled batches are replayed.
+        """
+        ring = self._ring
+        left = len(ring)   # ticks arriving meanwhile wait for the next flush
+        down = False
+        while left and ring:
+            batch = [ring.popleft() for _ in range(min(self.batch_size, left, len(ring)))]
+            left -= len(batch)
+            if not down:
+                try:
+                    await self._write(batch)
+                    self.written += len(batch)
+                    continue
+                except Exception as e:
+                    down = True
+                    logger.error(f"[TickArchive] Error writing {len(batch)} ticks: {e}")
+                    logger.debug(traceback.format_exc())
+            await self._spill(batch)
+        if not down:
+            await self._replay()
+
+    # --- Spill / replay ---
+    async def _spill(self, batch: List[tuple]):
+        path = os.path.join(self.spill_dir, f"batch-{time.time_ns()}.pkl")
+        try:
+            await asyncio.to_thread(_write_spill, path, {"ticks": batch})
+        except OSError as e:
+            self.failed += len(batch)
+            logger.error(f"[TickArchive] Could not spill {len(batch)} ticks to {path}; they are lost: {e}")
+            return
+        self._spilled.append(path)
+        logger.warning(f"[TickArchive] Batch of {len(batch)} ticks spilled to {path} ({len(self._spilled)} pending).")
+
+    async def _replay(self):
+        """Write spilled batches back, oldest first, stopping at the first one that still fails."""
+        while self._spilled:
+            path = self._spilled[0]
+            try:
+                batch = (await asyncio.to_thread(_read_spill, path))["ticks"]
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError) as e:
+                logger.error(f"[TickArchive] Skipping unreadable spill file {path}: {e}")
+                self._spilled.pop(0)
+                continue
+            try:
+                await self._write(batch)
+            except Exception as e:
+                logger.debug(f"[TickArchive] Replaying {path} failed: {e}")
+                return
+            self.written += len(batch)
+            await asyncio.to_thread(os.remove, path)
+            self._spilled.pop(0)
+            logger.info(f"[TickArchive] Replayed spilled batch {path} ({len(self._spilled)} left).")
+
+    def _encode(self, batch: List[tuple]) -> bytes:
+        prefixes = self._prefixes
+        parts = [_HEADER]
+        append = parts.append
+        for venue, pair, ts_ns, price, bid, ask in batch:
+            prefix = prefixes.get((venue, pair))
+            if prefix is None:
+                # Field count plus the two text fields, constant per (venue, pair)
+                prefix = prefixes[(venue, pair)] = struct.pack(">h", len(COLUMNS)) + _text(venue) + _text(pair)
+            append(prefix)
+            append(_TS_PRICE.pack(8, ts_ns // 1000 - _PG_EPOCH_US, 8, price))
+            if bid is not None and ask is not None:
+                append(_BID_ASK.pack(8, bid, 8, ask))
+            else:
+                append(_NULL if bid is None else _FLOAT.pack(8, bid))
+                append(_NULL if ask is None else _FLOAT.pack(8, ask))
+        append(_TRAILER)
+        return b"".join(parts)
+
+    async def _write(self, batch: List[tuple]):
+        if self.sink is not None:
+            await self.sink.write_ticks(batch)
+            return
+        stamps = [tick[2] for tick in batch]
+        data = self._encode(batch)
+        async with self.db_pool.acquire(timeout=ACQUIRE_TIMEOUT) as conn:
+            await self.partitions.ensure_rows(conn, "price_ticks", stamps)
+            await conn.copy_to_table("price_ticks", source=_BytesSource(data), columns=COLUMNS, format="binary")
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "queued": len(self._ring),
+            "spilled_batches": len(self._spilled),
+        }
+
+    async def close(self):
+        """Stop the writer and flush what is left in the ring."""
+        # Let an in-flight COPY finish rather than cancelling it: its batch is already off the ring
+        self._closing = True
+        self._ready.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+class _BytesSource:
+    """Async iterable over one encoded COPY payload, as `copy_to_table(source=...)` expects."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        yield self._data
@@ -1,15 +1,39 @@
 
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from exchanges.supervisor import FeedSupervisor, default_supervisor
+from utils.market_cache import load_markets
+from utils.timestamps import ms_to_ns, to_datetime
+import numpy as np
+import logging
+
+# --- Per-symbol quote record ---
+class Quote:
+    """Latest top of book for one symbol on one venue. Updated in place on every tick."""
+    __slots__ = ("price", "bid", "ask", "ts_ns")
+
+    def __init__(self, price: float, bid: Optional[float], ask: Optional[float], ts_ns: int):
+        self.price = price      # last trade (or mid / quoted price where the venue has no trades)
+        self.bid = bid          # best bid, None if the venue doesn't send one
+        self.ask = ask          # best ask, None if the venue doesn't send one
+        self.ts_ns = ts_ns      # epoch nanoseconds; `utils.timestamps.to_datetime` at the display / DB edges
+
 
 # --- Base Fetcher ---
 class ExchangeFetcher:
+    # Per-venue trading cost (%) charged on each leg; used to net route spreads. Subclasses override.
+    taker_fee_percent: float = 0.1
+
     def __init__(self, name: str, pair: str):
         self.name = name
         self.pair = pair
         self.latest_price: Optional[float] = None
         self.connected = False
         self._reconnect_interval = 5  # default retry time in seconds
+        # Owns the listener tasks (restart with backoff, stall detection); the process default if unset
+        self.supervisor: Optional[FeedSupervisor] = None
+        self.latest_prices: Dict[str, Quote] = {}
+        self._subscribers: List[Callable[["ExchangeFetcher", str, float, int], None]] = []
 
     async def connect(self):
         """Start WebSocket or background task, if applicable."""
@@ -19,3 +43,147 @@ class ExchangeFetcher:
         if self.latest_price is not None:
             return self.latest_price, datetime.now(timezone.utc)
         return None, None
+
+    def _spawn(self, key: str, session: Callable[[], Awaitable[None]], symbols: List[str]):
+        """Run `session()` (one subscription, until it raises) under the supervisor."""
+        if self.supervisor is None:
+            self.supervisor = default_supervisor()
+        self.supervisor.spawn(self, key, session, symbols)
+
+    async def reset(self, symbols: Optional[List[str]] = None):
+        """
+        Drop the WebSocket state behind `symbols` (every symbol if None) so their next subscription
+        starts fresh after a stall. By default the venue's clients are closed.
+        """
+        exchange = getattr(self, "exchange", None)
+        if exchange is not None:
+            await exchange.close()
+
+    def subscribe(self, callback: Callable[["ExchangeFetcher", str, float, int], None]):
+        """Register `callback(fetcher, symbol, price, ts_ns)`, called on every quote update (e.g. MarketMatrix.on_quote)."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def _publish(self, symbol: str, price: float, ts_ns: int, bid: Optional[float] = None, ask: Optional[float] = None):
+        """
+        Store the latest quote for `symbol` and push it to subscribers. Called by listeners on each update.
+        Subscribers that need the executable sides read `fetcher.latest_prices[symbol].bid / .ask`.
+        """
+        if price is None:
+            return
+        quote = self.latest_prices.get(symbol)
+        if quote is None:
+            self.latest_prices[symbol] = Quote(price, bid, ask, ts_ns)
+        else:
+            quote.price, quote.bid, quote.ask, quote.ts_ns = price, bid, ask, ts_ns
+        for callback in self._subscribers:
+            callback(self, symbol, price, ts_ns)
+
+
+# --- Multi-pair ccxt.pro fetcher ---
+class CcxtFetcher(ExchangeFetcher):
+    """
+    Shared listener for the ccxt.pro CEX fetchers.
+
+    Default mode streams `watch_tickers` and publishes `last`. With `depth=N` it instead keeps the
+    top N levels of each book as compact (N, 2) float arrays [price, amount], publishes the mid,
+    and `get_vwap` prices a fill of a given notional against them.
+    """
+
+    def __init__(self, name: str, exchange, pairs: List[str], depth: Optional[int] = None):
+        super().__init__(name, "MULTI")
+        self.exchange = exchange
+        self.pairs = pairs
+        self.depth = depth
+        # symbol -> (bids, asks), each an (N, 2) array of [price, amount], best level first
+        self.books: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.logger = logging.getLogger(f"cex_dex_arbitrage.exchanges.{name.lower()}")
+
+    async def connect(self):
+        """Continuously listen to the WebSocket and update latest prices (and books in depth mode)."""
+        try:
+            # Warm-start from the market cache so the first watch_* call doesn't block on a REST load
+            await load_markets(self.exchange)
+        except Exception as e:
+            self.logger.warning(f"[{self.name}] Market preload failed, the stream will load them itself: {e}")
+        if not self.depth:
+            self._spawn("tickers", self._ticker_listener, self.pairs)
+        elif self.exchange.has.get("watchOrderBookForSymbols"):
+            self._spawn("books", lambda: self._book_listener(self.pairs), self.pairs)
+        else:
+            # One subscription per symbol on venues without a multi-symbol book stream
+            for pair in self.pairs:
+                self._spawn(f"book:{pair}", lambda pair=pair: self._book_listener([pair]), [pair])
+
+    async def reset(self, symbols: Optional[List[str]] = None):
+        """
+        The ccxt client is shared by every subscription of this fetcher, so it is only closed when the
+        stalled session covers all of them. A per-symbol book session only unwatches its own symbols
+        (where ccxt supports it) and is resubscribed on the live client, leaving its siblings alone.
+        """
+        if symbols is None or set(symbols) >= set(self.pairs):
+            await self.exchange.close()
+            return
+        if self.exchange.has.get("unWatchOrderBook"):
+            for symbol in symbols:
+                try:
+                    await self.exchange.un_watch_order_book(symbol)
+                except Exception as e:
+                    self.logger.debug(f"[{self.name}] Unwatching {symbol} failed: {e}")
+
+    # Listeners run one subscription until it fails; the supervisor handles reconnects and stalls
+    async def _ticker_listener(self):
+        while True:
+            self._on_tickers(await self.exchange.watch_tickers(self.pairs))
+
+    def _on_tickers(self, tickers: dict):
+        for symbol, ticker in tickers.items():
+            price = ticker.get("last")
+            if price is None:
+                self.logger.debug(f"[{self.name}] Missing price for {symbol}, skipping update.")
+                continue  # Skip this symbol if price is invalid
+            self._publish(symbol, price, ms_to_ns(ticker.get("timestamp")), ticker.get("bid"), ticker.get("ask"))
+
+    async def _book_listener(self, symbols: List[str]):
+        while True:
+            if len(symbols) > 1:
+                book = await self.exchange.watch_order_book_for_symbols(symbols, self.depth)
+            else:
+                book = await self.exchange.watch_order_book(symbols[0], self.depth)
+            self._store_book(book)
+
+    def _store_book(self, book: dict):
+        symbol = book["symbol"]
+        bids = np.array([level[:2] for level in book["bids"][:self.depth]], dtype=float).reshape(-1, 2)
+        asks = np.array([level[:2] for level in book["asks"][:self.depth]], dtype=float).reshape(-1, 2)
+        self.books[symbol] = (bids, asks)
+        if not len(bids) or not len(asks):
+            return
+        bid, ask = float(bids[0, 0]), float(asks[0, 0])
+        self._publish(symbol, (bid + ask) / 2, ms_to_ns(book.get("timestamp")), bid, ask)
+
+    def get_vwap(self, pair: str, side: str, notional: float) -> Optional[float]:
+        """
+        Average fill price for spending (`side="buy"`, walks asks) or receiving (`side="sell"`,
+        walks bids) `notional` in quote currency. None without a book or if it is too thin.
+        """
+        book = self.books.get(pair)
+        if book is None:
+            return None
+        levels = book[1] if side == "buy" else book[0]
+        if not len(levels):
+            return None
+        cum_quote = np.cumsum(levels[:, 0] * levels[:, 1])
+        i = int(np.searchsorted(cum_quote, notional))
+        if i >= len(levels):
+            return None
+        filled = cum_quote[i - 1] if i else 0.0
+        base = levels[:i, 1].sum() + (notional - filled) / levels[i, 0]
+        return float(notional / base)
+
+    async def get_price(self, symbol: str) -> Optional[Tuple[float, datetime]]:
+        """Return latest price for a given symbol + timestamp."""
+        quote = self.latest_prices.get(symbol)
+        if quote is not None:
+            return quote.price, to_datetime(quote.ts_ns)
+        return None, None
@@ -0,0 +1,69 @@
+# exchanges/binance_native.py
+
+from exchanges.base import ExchangeFetcher
+from utils.timestamps import to_datetime
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import websockets
+import logging
+import json
+import time
+
+logger = logging.getLogger("cex_dex_arbitrage.exchanges.binance_native")
+
+STREAM_URL = "wss://stream.binance.com:9443/stream?streams="
+
+
+# --- Native Binance bookTicker fetcher ---
+class BinanceBookTickerFetcher(ExchangeFetcher):
+    """
+    Binance top of book straight from the combined `<symbol>@bookTicker` stream, without ccxt.
+
+    Each message is `{"stream": ..., "data": {"u", "s", "b", "B", "a", "A"}}`; only the symbol and
+    the best bid/ask are read, and published as (mid, bid, ask). bookTicker is pushed on every
+    top-of-book change, whereas ccxt's watch_tickers rides the 1s-aggregated 24hr ticker stream.
+    A drop-in for `BinanceFetcher` when order-book depth isn't needed.
+    """
+
+    taker_fee_percent = 0.10  # spot taker fee, base tier
+
+    def __init__(self, pairs: List[str]):
+        super().__init__("Binance", "MULTI")
+        self.pairs = pairs
+        # Exchange id ("BTCUSDC") -> our symbol ("BTC/USDC")
+        self.symbols: Dict[str, str] = {pair.replace("/", ""): pair for pair in pairs}
+        self.url = STREAM_URL + "/".join(f"{pair.replace('/', '').lower()}@bookTicker" for pair in pairs)
+        self._ws = None
+
+    async def connect(self):
+        """Supervised listener on the combined stream (one socket for all pairs)."""
+        self._spawn("bookTicker", self._listener, self.pairs)
+
+    async def _listener(self):
+        async with websockets.connect(self.url, ping_interval=20, max_queue=None) as ws:
+            self._ws = ws
+            logger.debug(f"[Binance] bookTicker stream open for {len(self.pairs)} pairs")
+            async for raw in ws:
+                self._on_message(raw)
+
+    def _on_message(self, raw):
+        data = json.loads(raw)["data"]
+        symbol = self.symbols.get(data["s"])
+        if symbol is None:
+            return
+        bid = float(data["b"])
+        ask = float(data["a"])
+        self._publish(symbol, (bid + ask) / 2, time.time_ns(), bid, ask)
+
+    async def reset(self, symbols: Optional[List[str]] = None):
+        # A single bookTicker session covers every symbol
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    async def get_price(self, symbol: str) -> Optional[Tuple[float, datetime]]:
+        """Return latest mid price for a given symbol + timestamp."""
+        quote = self.latest_prices.get(symbol)
+        if quote is not None:
+            return quote.price, to_datetime(quote.ts_ns)
+        return None, None
@@ -1,15 +1,8 @@
 # exchanges/bybit.py
 
-from exchanges.base import ExchangeFetcher
-from datetime import datetime, timezone
-from typing import Optional, Tuple
+from exchanges.base import CcxtFetcher
+from typing import Optional
 import ccxt.pro
-import asyncio
-import logging
-import traceback
-
-# logger = logging.getLogger(__name__)
-logger = logging.getLogger("cex_dex_arbitrage.exchanges.bybit")
 
 
 # class BybitFetcher(ExchangeFetcher):
@@ -53,49 +46,9 @@ logger = logging.getLogger("cex_dex_arbitrage.exchanges.bybit")
 #             logger.debug(traceback.format_exc())
 #             return None
         
-class BybitFetcher(ExchangeFetcher):
-    def __init__(self, pairs: list[str]):
-        # We’ll ignore ExchangeFetcher.pair entirely and just use self.pairs.
-        super().__init__("Bybit", pair=None)
-        self.exchange = ccxt.pro.bybit()
-        self.connected = False
-        self._reconnect_interval = 5  # seconds
-        self.latest_prices: dict[str, float] = {}
-        self.pairs = pairs
-
-    async def connect(self):
-        """Continuously listen to Bybit WebSocket and update latest prices."""
-        async def listener():
-            while True:
-                try:
-                    # Bulk‐subscribe once
-                    tickers = await self.exchange.watch_tickers(self.pairs)
-                    # Update our local cache
-                    for symbol, ticker in tickers.items():
-                        price = ticker.get("last")
-                        ts = ticker.get("timestamp")
-                        if ts:
-                            ts = datetime.fromtimestamp(ts / 1000, timezone.utc)
-                        else:
-                            ts = datetime.now(timezone.utc)
-
-                        self.latest_prices[symbol] = (price, ts)
-                    self.connected = True
-                except Exception as e:
-                    self.connected = False
-                    logger.error(f"[WebSocket] Bybit error: {e}")
-                    await asyncio.sleep(self._reconnect_interval)
-
-        # Fire off the single listener task
-        asyncio.create_task(listener())
-
-    async def get_price(self, symbol: str) -> Optional[Tuple[float, datetime]]:
-        """Return latest price for a given symbol + timestamp."""
-        result = self.latest_prices.get(symbol)
-        if result:
-            price, ts = result
-            if price is not None:
-                return price, ts
-        return None, None
-
+class BybitFetcher(CcxtFetcher):
+    taker_fee_percent = 0.10  # spot taker fee, base tier
 
+    def __init__(self, pairs: list[str], depth: Optional[int] = None):
+        # Listener, book handling and get_vwap live in CcxtFetcher; depth=N switches to top-N order books
+        super().__init__("Bybit", ccxt.pro.bybit(), pairs, depth)
@@ -1,15 +1,9 @@
 # exchanges/gateio.py
 
-from exchanges.base import ExchangeFetcher
-from datetime import datetime, timezone
-from typing import Optional, Tuple
+from exchanges.base import CcxtFetcher
+from typing import Optional
 import ccxt.pro
-import asyncio
-import logging
-import traceback
 
-# logger = logging.getLogger(__name__)    
-logger = logging.getLogger("cex_dex_arbitrage.exchanges.gateio")
 
 # class GateIo(ExchangeFetcher):
 #     def __init__(self, pair: str):
@@ -57,51 +51,9 @@ logger = logging.getLogger("cex_dex_arbitrage.exchanges.gateio")
 #             return None
 
         
-class GateIo(ExchangeFetcher):
-    def __init__(self, pairs: list[str]):
-        # We’ll ignore ExchangeFetcher.pair entirely and just use self.pairs.
-        super().__init__("GateIo", "MULTI")
-        self.exchange = ccxt.pro.gateio()
-        self.connected = False
-        self._reconnect_interval = 5  # seconds
-        self.latest_prices: dict[str, float] = {}
-        self.pairs = pairs
-
-    async def connect(self):
-        """Continuously listen to GateIo WebSocket and update latest prices."""
-        async def listener():
-            while True:
-                try:
-                    # Bulk‐subscribe once
-                    tickers = await self.exchange.watch_tickers(self.pairs)
-                    # Update our local cache
-                    for symbol, ticker in tickers.items():
-                        price = ticker["last"]
-                        ts_ms = ticker["timestamp"]
-                        if price is None:
-                            logger.debug(f"[GateIo] Missing price for {symbol}, skipping update.")
-                            continue  # Skip this symbol if price is invalid
-                        if ts_ms:
-                            ts = datetime.fromtimestamp(ts_ms / 1000, timezone.utc)
-                        else:
-                            ts = datetime.now(timezone.utc)
-                        self.latest_prices[symbol] = (price, ts)
-                    self.connected = True
-                except Exception as e:
-                    self.connected = False
-                    logger.error(f"[WebSocket] GateIo error: {e}")
-                    logger.debug(traceback.format_exc())
-                    await asyncio.sleep(self._reconnect_interval)
-
-        # Fire off the single listener task
-        asyncio.create_task(listener())
-
-    async def get_price(self, symbol: str) -> Optional[Tuple[float, datetime]]:
-        """Return latest price for a given symbol + timestamp."""
-        result = self.latest_prices.get(symbol)
-        if result:
-            price, ts = result
-            if price is not None:
-                return price, ts
-        return None, None
+class GateIo(CcxtFetcher):
+    taker_fee_percent = 0.20  # spot taker fee, base tier
 
+    def __init__(self, pairs: list[str], depth: Optional[int] = None):
+        # Listener, book handling and get_vwap live in CcxtFetcher; depth=N switches to top-N order books
+        super().__init__("GateIo", ccxt.pro.gateio(), pairs, depth)
@@ -1,6 +1,8 @@
 # exchanges/hyperliquid.py
 from exchanges.base import ExchangeFetcher
-from datetime import datetime, timezone
+from utils.market_cache import load_markets
+from utils.timestamps import ms_to_ns, to_datetime
+from datetime import datetime
 from typing import Optional, Tuple, List, Dict
 import websockets
 import traceback
@@ -8,10 +10,13 @@ import ccxt.pro
 import logging
 import asyncio
 import json
+import time
 
 # logger = logging.getLogger(__name__)
 logger = logging.getLogger("cex_dex_arbitrage.exchanges.hyperliquid")
 
+WS_URL = "wss://api.hyperliquid.xyz/ws"
+
 # class HyperliquidFetcher(ExchangeFetcher):
 #     def __init__(self, pair: str):
 #         super().__init__("Hyperliquid", pair)
@@ -89,22 +94,34 @@ logger = logging.getLogger("cex_dex_arbitrage.exchanges.hyperliquid")
 
 
 class HyperliquidFetcher(ExchangeFetcher):
-    def __init__(self, pairs: List[str]):
+    taker_fee_percent = 0.045  # perp taker fee, base tier
+
+    def __init__(self, pairs: List[str], all_mids: bool = False):
         # super should now take name + list of pairs
         super().__init__("Hyperliquid", "MULTI")
         self.pairs = pairs
+        # Stream the native allMids channel (every mid in one message) instead of ccxt tickers
+        self.all_mids = all_mids
         # ccxt.pro client for Hyperliquid
         self.exchange = ccxt.pro.hyperliquid({'enableRateLimit': True})
         # map from your “BASE/USDC” → actual exchange.market symbol
         self.pair_to_market: Dict[str, str] = {}
+        # Inverted indexes, built once: market symbol → pair, and allMids coin name → pair
+        self.market_to_pair: Dict[str, str] = {}
+        self.coin_to_pair: Dict[str, str] = {}
+        self._last_mids: Dict[str, str] = {}
+        self._ws = None
         self._initialized = False
-        self.latest_prices: dict[str, float] = {}
 
     async def initialize(self):
         """Load markets once and build pair→market_id mapping."""
-        await self.exchange.load_markets()
+        await load_markets(self.exchange)
         logger.debug(f"[Hyperliquid] Loaded markets: {self.exchange.markets.keys()}")
-        available = self.exchange.markets.keys()
+        available = self.exchange.markets
+        # "BASE/USDC" prefix → first market with it (e.g. the "BTC/USDC:USDC" perp), indexed in one pass
+        by_prefix: Dict[str, str] = {}
+        for symbol in available:
+            by_prefix.setdefault(symbol.split(':')[0], symbol)
 
         for pair in self.pairs:
             base, quote = pair.split('/')
@@ -115,74 +132,97 @@ class HyperliquidFetcher(ExchangeFetcher):
                 market_id = self.exchange.market(pair)['symbol']
             else:
                 # fallback: any market that starts with “BASE/USDC”
-                candidates = [m for m in available if m.startswith(f"{base}/USDC")]
-                if not candidates:
+                candidate = by_prefix.get(f"{base}/USDC")
+                if candidate is None:
                     raise ValueError(f"[Hyperliquid] No market found for {pair}")
-                market_id = self.exchange.market(candidates[0])['symbol']
-                logger.debug(f"[Hyperliquid] Using '{candidates[0]}' for requested {pair}")
+                market_id = self.exchange.market(candidate)['symbol']
+                logger.debug(f"[Hyperliquid] Using '{candidate}' for requested {pair}")
 
             self.pair_to_market[pair] = market_id
+            self.market_to_pair[market_id] = pair
+            # allMids keys perps by coin name ("BTC") and spot by its pair name ("PURR/USDC", "@107")
+            self.coin_to_pair[available[market_id]['info']['name']] = pair
 
         self._initialized = True
         logger.debug(f"[Hyperliquid] Initialized markets: {self.pair_to_market}")
 
     async def connect(self):
-        """Single background task to keep self.latest_prices updated."""
-        async def _listener():
-            while True:
-                try:
-                    if not self._initialized:
-                        await self.initialize()
-
-                    # Try bulk‐subscribe if supported
-                    try:
-                        tickers = await self.exchange.watch_tickers(list(self.pair_to_market.values()))
-                        for pair, mkt in self.pair_to_market.items():
-                            info = tickers.get(mkt)
-                            if info:
-                                # logger.debug(f"[Hyperliquid] Raw ticker info for {pair}: {info}")
-                                price = info["last"]
-                                ts_ms = info["timestamp"]
-                                if price is None:
-                                    logger.debug(f"[Hyperliquid] Missing price for {pair}, skipping update.")
-                                    continue  # Skip this symbol if price is invalid
-                                if ts_ms:
-                                    ts = datetime.fromtimestamp(ts_ms / 1000, timezone.utc)
-                                else:
-                                    ts = datetime.now(timezone.utc)
-                        
-                                # self.latest_data[symbol] = (price, ts_ms)
-                                # logger.debug(f"[Hyperliquid] Latest price for {pair}: {price} at raw : {ts_ms} \n converted:{datetime.fromtimestamp(ts_ms / 1000, timezone.utc)}")
-                                self.latest_prices[pair] = (price, ts)
-
-                    # Fallback to individual watch_ticker calls
-                    except AttributeError:
-                        tasks = [self.exchange.watch_ticker(mkt) for mkt in self.pair_to_market.values()]
-                        results = await asyncio.gather(*tasks)
-                        for ticker in results:
-                            mkt = ticker['symbol']
-                            # reverse‐lookup your original pair
-                            pair = next(p for p, mid in self.pair_to_market.items() if mid == mkt)
-                            self.latest_prices[pair] = ticker['last']
-
-                    self.connected = True
-
-                except Exception as e:
-                    self.connected = False
-                    logger.error(f"[Hyperliquid] WebSocket error: {e}")
-                    logger.debug(traceback.format_exc())
-                    await asyncio.sleep(self._reconnect_interval)
-
-        asyncio.create_task(_listener())
+        """Single supervised listener keeping self.latest_prices updated (see FeedSupervisor)."""
+        if self.all_mids:
+            self._spawn("allMids", self._all_mids_listener, self.pairs)
+        else:
+            self._spawn("tickers", self._listener, self.pairs)
+
+    async def _all_mids_listener(self):
+        """One socket, one subscription: every message carries the mid of every coin."""
+        if not self._initialized:
+            await self.initialize()
+        self._last_mids.clear()
+        async with websockets.connect(WS_URL, ping_interval=None, max_queue=None) as ws:
+            self._ws = ws
+            await ws.send(json.dumps({"method": "subscribe", "subscription": {"type": "allMids"}}))
+            async for raw in ws:
+                self._on_all_mids(raw)
+
+    def _on_all_mids(self, raw):
+        message = json.loads(raw)
+        if message.get("channel") != "allMids":
+            return  # subscription ack etc.
+        mids = message["data"]["mids"]
+        ts_ns = time.time_ns()
+        last = self._last_mids
+        # Walk only our coins, publish only mids that moved since the previous message
+        for coin, pair in self.coin_to_pair.items():
+            mid = mids.get(coin)
+            if mid is None or mid == last.get(coin):
+                continue
+            last[coin] = mid
+            self._publish(pair, float(mid), ts_ns)
+
+    async def reset(self, symbols: Optional[List[str]] = None):
+        # One session per fetcher (allMids or tickers): the whole socket goes
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+        await super().reset()
+
+    async def _listener(self):
+        # One subscription lifetime: errors propagate to the supervisor, which backs off and resubscribes
+        if not self._initialized:
+            await self.initialize()
+        while True:
+            # Try bulk‐subscribe if supported
+            try:
+                tickers = await self.exchange.watch_tickers(list(self.pair_to_market.values()))
+                for pair, mkt in self.pair_to_market.items():
+                    info = tickers.get(mkt)
+                    if info:
+                        # logger.debug(f"[Hyperliquid] Raw ticker info for {pair}: {info}")
+                        price = info["last"]
+                        if price is None:
+                            logger.debug(f"[Hyperliquid] Missing price for {pair}, skipping update.")
+                            continue  # Skip this symbol if price is invalid
+
+                        # self.latest_data[symbol] = (price, ts_ms)
+                        # logger.debug(f"[Hyperliquid] Latest price for {pair}: {price} at raw : {ts_ms} \n converted:{datetime.fromtimestamp(ts_ms / 1000, timezone.utc)}")
+                        self._publish(pair, price, ms_to_ns(info["timestamp"]), info.get("bid"), info.get("ask"))
+
+            # Fallback to individual watch_ticker calls
+            except AttributeError:
+                tasks = [self.exchange.watch_ticker(mkt) for mkt in self.pair_to_market.values()]
+                results = await asyncio.gather(*tasks)
+                for ticker in results:
+                    pair = self.market_to_pair.get(ticker['symbol'])
+                    if pair is None or ticker['last'] is None:
+                        continue
+                    self._publish(pair, ticker['last'], ms_to_ns(ticker['timestamp']), ticker.get('bid'), ticker.get('ask'))
 
     async def get_price(self, symbol: str) -> Optional[Tuple[float, datetime]]:
         """
         Just like BinanceFetcher: return (price, timestamp) for a given pair.
         """
-        result = self.latest_prices.get(symbol)
-        if result:
-            price, ts = result
-            if price is not None:
-                return price, ts
+        quote = self.latest_prices.get(symbol)
+        if quote is not None:
+            return quote.price, to_datetime(quote.ts_ns)
         return None, None
 
@@ -1,8 +1,11 @@
-# exchanges/hyperliquid.py
+# exchanges/jupiter.py
 from exchanges.base import ExchangeFetcher
-from datetime import datetime, timezone
-from typing import Optional, Tuple
+from utils.rate_limiter import TokenBucket
+from utils.timestamps import to_datetime
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 import traceback
+import asyncio
 import aiohttp
 import logging
 import json
@@ -13,59 +16,128 @@ import os
 logger = logging.getLogger("cex_dex_arbitrage.exchanges.jupiter")
 
 TOKEN_CACHE_FILE = r"token_info_cache.json"
+TOKEN_LIST_URL = "https://lite-api.jup.ag/tokens/v1/tagged/verified"
+TOKEN_LIST_TTL = float(os.getenv("JUPITER_TOKEN_TTL", 24 * 3600))  # seconds
+MISS_REFRESH_INTERVAL = 300.0  # at most one re-download per 5 min for unknown symbols
 # Need to understand this better.
 TRADE_AMOUNT = 10.0  # Default trade amount in USDC
-
-
-
-async def get_jupiter_pair_info(session: aiohttp.ClientSession, pair: str, trade_amount: float = 10.0):
-    input_symbol, output_symbol = pair.upper().split('/')
-    # logger.debug(f"Fetching Jupiter pair info for {pair}...")
-    logger.debug(f"[Jupiter] Input symbol: {input_symbol}, Output symbol: {output_symbol}")
-    # Load cache
-    if os.path.exists(TOKEN_CACHE_FILE):
-        with open(TOKEN_CACHE_FILE, 'r') as f:
-            token_cache = json.load(f)
-    else:
-        token_cache = {}
-
-    if input_symbol in token_cache and output_symbol in token_cache:
-        input_token = token_cache[input_symbol]
-        output_token = token_cache[output_symbol]
-    else:
+QUOTE_URL = "https://quote-api.jup.ag/v6/quote"
+POLL_INTERVAL = 1.0  # seconds
+POOL_SIZE = 8        # concurrent connections when the fetcher owns its session
+# One bucket for every Jupiter request in the process, matching the API quota (requests/s)
+RATE_LIMITER = TokenBucket(float(os.getenv("JUPITER_RATE_LIMIT", 1.0)))
+
+
+
+# --- Token registry ---
+class TokenRegistry:
+    """
+    Process-wide symbol → {mint, decimals} index for the verified Jupiter token list.
+
+    Loaded once (from `TOKEN_CACHE_FILE` when it is younger than `ttl`, else downloaded), then
+    served from memory in O(1). A background task re-downloads the list every `ttl` seconds, and a
+    symbol that is missing triggers at most one refresh per `MISS_REFRESH_INTERVAL`. The file is
+    rewritten atomically off the event loop.
+    """
+
+    def __init__(self, path: str = TOKEN_CACHE_FILE, ttl: float = TOKEN_LIST_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.tokens: Dict[str, dict] = {}
+        self.updated = 0.0          # wall time of the list we hold
+        self._last_attempt = 0.0    # monotonic time of the last download attempt
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def get(self, symbol: str) -> Optional[dict]:
+        return self.tokens.get(symbol.upper())
+
+    async def load(self, session: aiohttp.ClientSession):
+        """First call loads the file (or downloads if it is missing/expired); later calls are free."""
+        if self.tokens:
+            return
+        async with self._lock:
+            if self.tokens:
+                return
+            try:
+                self.tokens, self.updated = await asyncio.to_thread(self._read)
+            except (OSError, ValueError):
+                pass  # no usable file yet
+            if not self.tokens or time.time() - self.updated > self.ttl:
+                await self._download(session)
+            if self._refresh_task is None:
+                self._refresh_task = asyncio.create_task(self._refresh_loop(session))
+
+    async def lookup(self, session: aiohttp.ClientSession, *symbols: str) -> List[Optional[dict]]:
+        await self.load(session)
+        found = [self.get(symbol) for symbol in symbols]
+        if None in found and time.monotonic() - self._last_attempt > MISS_REFRESH_INTERVAL:
+            async with self._lock:
+                await self._download(session)
+            found = [self.get(symbol) for symbol in symbols]
+        return found
+
+    async def _download(self, session: aiohttp.ClientSession):
+        self._last_attempt = time.monotonic()
         try:
-            async with session.get("https://lite-api.jup.ag/tokens/v1/tagged/verified") as resp:
+            async with session.get(TOKEN_LIST_URL) as resp:
                 if resp.status != 200:
                     text = await resp.text()
                     raise Exception(f"Non-200 response: {resp.status}, body: {text[:200]}")
-
                 token_data = await resp.json()
-                print(token_data)
-                if not isinstance(token_data, list):
-                    raise TypeError(f"Unexpected response format (not a list): {token_data}")
+            if not isinstance(token_data, list):
+                raise TypeError(f"Unexpected response format (not a list): {type(token_data).__name__}")
+        except Exception as e:
+            logger.error(f"[Jupiter] Error fetching token list: {e}")
+            return
+
+        tokens = {}
+        for token in token_data:
+            symbol = token.get('symbol', '').upper()
+            mint = token.get('address') or token.get('mint')
+            decimals = token.get('decimals')
+            if symbol and mint and decimals is not None:
+                tokens[symbol] = {
+                    'mint': mint,
+                    'decimals': decimals
+                }
+        self.tokens, self.updated = tokens, time.time()  # swap in one step: readers never see a partial index
+        logger.info(f"[Jupiter] Token list refreshed: {len(tokens)} tokens")
+        try:
+            await asyncio.to_thread(self._write, tokens)
+        except OSError as e:
+            logger.warning(f"[Jupiter] Could not persist {self.path}: {e}")
 
-                for token in token_data:
-                    symbol = token.get('symbol', '').upper()
-                    mint = token.get('address') or token.get('mint')
-                    decimals = token.get('decimals')
-                    if symbol and mint and decimals is not None:
-                        token_cache[symbol] = {
-                            'mint': mint,
-                            'decimals': decimals
-                        }
+    async def _refresh_loop(self, session: aiohttp.ClientSession):
+        while True:
+            await asyncio.sleep(max(60.0, self.ttl - (time.time() - self.updated)))
+            if session.closed:
+                return
+            async with self._lock:
+                await self._download(session)
 
-                with open(TOKEN_CACHE_FILE, 'w') as f:
-                    json.dump(token_cache, f, indent=2)
+    def _read(self) -> Tuple[Dict[str, dict], float]:
+        with open(self.path) as f:
+            return json.load(f), os.path.getmtime(self.path)
 
-                input_token = token_cache.get(input_symbol)
-                output_token = token_cache.get(output_symbol)
+    def _write(self, tokens: Dict[str, dict]):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(tokens, f)
+        os.replace(tmp, self.path)
 
-                if not input_token or not output_token:
-                    raise ValueError(f"Invalid token symbol(s): {input_symbol} or {output_symbol}")
 
-        except Exception as e:
-            logging.error(f"Error fetching token list: {e}")
-            return None
+TOKENS = TokenRegistry()
+
+
+async def get_jupiter_pair_info(session: aiohttp.ClientSession, pair: str, trade_amount: float = 10.0):
+    input_symbol, output_symbol = pair.upper().split('/')
+    logger.debug(f"[Jupiter] Input symbol: {input_symbol}, Output symbol: {output_symbol}")
+
+    input_token, output_token = await TOKENS.lookup(session, input_symbol, output_symbol)
+    if not input_token or not output_token:
+        logger.error(f"[Jupiter] Invalid token symbol(s): {input_symbol} or {output_symbol}")
+        return None
 
     input_mint = input_token['mint']
     output_mint = output_token['mint']
@@ -81,47 +153,92 @@ async def get_jupiter_pair_info(session: aiohttp.ClientSession, pair: str, trade
     }
 
 
-
 class JupiterFetcher(ExchangeFetcher):
-    def __init__(self, session: aiohttp.ClientSession, pair: str, inputMint: str, outputMint: str, amount: str):
-        super().__init__("Jupiter", pair)
+    """
+    Multi-pair Jupiter quote poller. A supervised background loop refreshes every pair concurrently
+    over one pooled aiohttp session, with each request taking a token from a bucket shared by all
+    Jupiter fetchers in the process (sized to the API quota). Quotes reach the matrix through
+    `_publish` like any WebSocket venue, so the detector only ever reads cached prices and their
+    age; nothing on the detection path waits on HTTP.
+    """
+
+    taker_fee_percent = 0.0  # quotes are already net of swap fees
+
+    def __init__(
+        self,
+        pairs: List[str],
+        session: Optional[aiohttp.ClientSession] = None,
+        limiter: Optional[TokenBucket] = None,
+        interval: float = POLL_INTERVAL
+    ):
+        super().__init__("Jupiter", "MULTI")
+        self.pairs = pairs
         self.session = session
-        self.inputMint = inputMint
-        self.outputMint = outputMint
-        self.amount = amount
+        self._own_session = session is None
+        self.limiter = limiter or RATE_LIMITER
+        self.interval = interval  # minimum seconds between two rounds over all pairs
         self.slippageBps = 50  # 0.5% slippage
-        self._cooldown = 0.2
-        self._last_call = 0
+        # pair -> quote request info (mints, amount, decimals) from get_jupiter_pair_info
+        self.routes: Dict[str, dict] = {}
 
     @classmethod
     async def create(cls, session: aiohttp.ClientSession, pair: str):
-        # Replace BTC with WBTC before token lookup
-        normalized_pair = pair.upper().replace("BTC", "WBTC")
-
-        info = await get_jupiter_pair_info(session, normalized_pair)
-        if info is None:
+        fetcher = cls([pair], session)
+        await fetcher.initialize()
+        if pair not in fetcher.routes:
             raise RuntimeError(f"Failed to initialize JupiterFetcher for pair: {pair}")
-        return cls(session, normalized_pair, info['inputMint'], info['outputMint'], info['amount'])
-
-    async def get_price(self) -> Optional[Tuple[float, datetime]]:
-        now = time.time()
-        if now - self._last_call < self._cooldown:
-            # logging.debug(f"[Jupiter] Cooldown active, skipping price fetch for {self.pair}")
-            return None, None
-        try:
-            async with self.session.get("https://quote-api.jup.ag/v6/quote", params={
-                "inputMint": self.inputMint,
-                "outputMint": self.outputMint,
-                "amount": self.amount,
-                "slippageBps": self.slippageBps
-            }) as response:
-                data = await response.json()
+        return fetcher
+
+    async def initialize(self):
+        """Resolve token mints for every pair (pairs Jupiter can't route are dropped)."""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=POOL_SIZE))
+        for pair in self.pairs:
+            if pair in self.routes:
+                continue
+            # Replace BTC with WBTC before token lookup; quotes are still published under `pair`
+            normalized_pair = pair.upper().replace("BTC", "WBTC")
+            info = await get_jupiter_pair_info(self.session, normalized_pair, TRADE_AMOUNT)
+            if info is None:
+                logger.warning(f"[Jupiter] No route for {pair}, skipping it.")
+                continue
+            self.routes[pair] = info
+
+    async def connect(self):
+        """Start the supervised poller; pair info is resolved inside it so startup never blocks on HTTP."""
+        self._spawn("quotes", self._poller, self.pairs)
+
+    async def _poller(self):
+        await self.initialize()
+        while True:
+            started = time.monotonic()
+            await asyncio.gather(*(self._refresh(pair, info) for pair, info in self.routes.items()))
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def _refresh(self, pair: str, info: dict):
+        async with self.limiter:
+            try:
+                async with self.session.get(QUOTE_URL, params={
+                    "inputMint": info["inputMint"],
+                    "outputMint": info["outputMint"],
+                    "amount": info["amount"],
+                    "slippageBps": self.slippageBps
+                }) as response:
+                    data = await response.json()
                 out_amount = float(data['outAmount'])
-                price = out_amount / (10 ** 6) / TRADE_AMOUNT
-                self.latest_price = price
-                self._last_call = now
-                # logging.info(f"Jupiter price for {self.pair}: {price:.4f} USDC")
-                return price, datetime.now(timezone.utc)
-        except Exception:
-            # logging.error(f"Error fetching price from Jupiter for {self.pair}: {traceback.format_exc()}")
-            return None, None
+            except Exception as e:
+                logger.debug(f"[Jupiter] Quote failed for {pair}: {e}")
+                return
+        price = out_amount / (10 ** info["outputDecimals"]) / TRADE_AMOUNT
+        self._publish(pair, price, time.time_ns())
+
+    async def get_price(self, symbol: str) -> Optional[Tuple[float, datetime]]:
+        """Latest cached quote for `symbol` + its timestamp (never hits the network)."""
+        quote = self.latest_prices.get(symbol)
+        if quote is not None:
+            return quote.price, to_datetime(quote.ts_ns)
+        return None, None
+
+    async def close(self):
+        if self._own_session and self.session is not None:
+            await self.session.close()
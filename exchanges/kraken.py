@@ -1,15 +1,8 @@
 # exchanges/kraken.py
 
-from exchanges.base import ExchangeFetcher
-from datetime import datetime, timezone
-from typing import Optional, Tuple
+from exchanges.base import CcxtFetcher
+from typing import Optional
 import ccxt.pro
-import asyncio
-import logging
-import traceback
-
-# logger = logging.getLogger(__name__)
-logger = logging.getLogger("cex_dex_arbitrage.exchanges.kraken")
 
 
 # class KrakenFetcher(ExchangeFetcher):
@@ -58,56 +51,9 @@ logger = logging.getLogger("cex_dex_arbitrage.exchanges.kraken")
 #             return None
 
         
-class KrakenFetcher(ExchangeFetcher):
-    def __init__(self, pairs: list[str]):
-        # We’ll ignore ExchangeFetcher.pair entirely and just use self.pairs.
-        super().__init__("Kraken", "MULTI")
-        self.exchange = ccxt.pro.kraken()
-        self.connected = False
-        self._reconnect_interval = 5  # seconds
-        self.latest_prices: dict[str, float] = {}
-        self.pairs = pairs
-
-    async def connect(self):
-        """Continuously listen to Kraken WebSocket and update latest prices."""
-        async def listener():
-            while True:
-                try:
-                    # Bulk‐subscribe once
-                    tickers = await self.exchange.watch_tickers(self.pairs)
-                    # Update our local cache
-                    for symbol, ticker in tickers.items():
-                        price = ticker["last"]
-                        ts_ms = ticker["timestamp"]
-                        if price is None:
-                            logger.debug(f"[kraken] Missing price for {symbol}, skipping update.")
-                            continue  # Skip this symbol if price is invalid
-                        if ts_ms:
-                            ts = datetime.fromtimestamp(ts_ms / 1000, timezone.utc)
-                        else:
-                            ts = datetime.now(timezone.utc)
-                        self.latest_prices[symbol] = (price, ts)
-                        # logger.debug(f"[Kraken] Raw ticker info for {symbol}: {ticker}")
-                        # self.latest_data[symbol] = (price, ts_ms)
-                        # logger.debug(f"[Kraken] Latest price for {symbol}: {price} at raw : {ts_ms} \n converted:{datetime.fromtimestamp(ts_ms / 1000, timezone.utc)}")
-                    self.connected = True
-                except Exception as e:
-                    self.connected = False
-                    logger.error(f"[WebSocket] Kraken error: {e}")
-                    if e == 'Connection closed by the user':
-                        logger.info("Connection closed by the user, stopping listener.")
-                    else:
-                        logger.debug(traceback.format_exc())
-                    await asyncio.sleep(self._reconnect_interval)
-
-        # Fire off the single listener task
-        asyncio.create_task(listener())
+class KrakenFetcher(CcxtFetcher):
+    taker_fee_percent = 0.40  # spot taker fee, base tier
 
-    async def get_price(self, symbol: str) -> Optional[Tuple[float, datetime]]:
-        """Return latest price for a given symbol + timestamp."""
-        result = self.latest_prices.get(symbol)
-        if result:
-            price, ts = result
-            if price is not None:
-                return price, ts
-        return None, None
+    def __init__(self, pairs: list[str], depth: Optional[int] = None):
+        # Listener, book handling and get_vwap live in CcxtFetcher; depth=N switches to top-N order books
+        super().__init__("Kraken", ccxt.pro.kraken(), pairs, depth)
@@ -0,0 +1,218 @@
+# exchanges/supervisor.py
+
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import traceback
+import asyncio
+import logging
+import random
+import time
+logger = logging.getLogger("cex_dex_arbitrage.exchanges.supervisor")
+
+STALL_TIMEOUT = 30.0    # seconds without a message before a subscription is forcibly restarted
+BACKOFF_BASE = 1.0      # first retry delay (s), doubled per consecutive failure
+BACKOFF_MAX = 60.0
+REPORT_INTERVAL = 60.0  # seconds between feed-health log lines (only logged if something reconnected)
+
+
+class _Session:
+    """One supervised subscription: a coroutine factory plus its health bookkeeping."""
+
+    def __init__(self, fetcher, key: str, factory: Callable[[], Awaitable[None]], symbols: List[str]):
+        self.fetcher = fetcher
+        self.key = key
+        self.factory = factory
+        self.symbols = symbols
+        self.task: Optional[asyncio.Task] = None
+        self.started = 0.0
+        self.last_message = 0.0
+        self.attempt = 0                        # consecutive failures, drives the backoff
+        self.down_since: Optional[float] = None
+        self.stalled = False
+
+
+# --- Feed supervisor ---
+class FeedSupervisor:
+    """
+    Owns every fetcher listener task. A listener is registered as a session factory that runs one
+    subscription until it raises; the supervisor restarts it with jittered exponential backoff.
+
+    It also watches the quotes each fetcher publishes: a session that went `stall_timeout` seconds
+    without a message on any of its symbols is treated as a dead subscription. A per-symbol (book)
+    session is therefore judged by its own symbol, while a multi-symbol ticker session stays up as
+    long as any of its pairs ticks, so one thinly traded pair doesn't cycle the whole venue. The
+    fetcher drops the state behind the stalled session's symbols (`ExchangeFetcher.reset(symbols)`)
+    and only that session is resubscribed; healthy sessions of the same venue keep running.
+    Per-venue reconnect counts and downtime are available from `stats()`.
+    """
+
+    def __init__(
+        self,
+        stall_timeout: float = STALL_TIMEOUT,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        report_interval: float = REPORT_INTERVAL
+    ):
+        self.stall_timeout = stall_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.report_interval = report_interval
+
+        self.sessions: List[_Session] = []
+        self._runners: List[asyncio.Task] = []
+        self._by_symbol: Dict[Tuple[str, str], _Session] = {}
+        # (venue, symbol) -> monotonic time of its last message
+        self.last_message: Dict[Tuple[str, str], float] = {}
+        self.reconnects: Dict[str, int] = {}
+        self.stalls: Dict[str, int] = {}
+        self._downtime: Dict[str, float] = {}
+        self._down_sessions: Dict[str, int] = {}
+        self._venue_down_since: Dict[str, float] = {}
+        self._watched = set()
+        self._monitor: Optional[asyncio.Task] = None
+
+    def spawn(self, fetcher, key: str, factory: Callable[[], Awaitable[None]], symbols: List[str]):
+        """Start supervising `factory()` for `fetcher`'s `symbols` (must be called from the event loop)."""
+        if id(fetcher) not in self._watched:
+            self._watched.add(id(fetcher))
+            fetcher.subscribe(self.on_quote)
+            self.reconnects.setdefault(fetcher.name, 0)
+            self.stalls.setdefault(fetcher.name, 0)
+            self._downtime.setdefault(fetcher.name, 0.0)
+            self._down_sessions.setdefault(fetcher.name, 0)
+        session = _Session(fetcher, key, factory, symbols)
+        self.sessions.append(session)
+        for symbol in symbols:
+            self._by_symbol[(fetcher.name, symbol)] = session
+        self._runners.append(asyncio.create_task(self._run(session), name=f"{fetcher.name}:{key}"))
+        if self._monitor is None:
+            self._monitor = asyncio.create_task(self._monitor_loop())
+
+    def on_quote(self, fetcher, symbol: str, price, ts_ns):
+        """Fetcher subscriber: stamp the message time and close any open outage for its session."""
+        now = time.monotonic()
+        self.last_message[(fetcher.name, symbol)] = now
+        session = self._by_symbol.get((fetcher.name, symbol))
+        if session is None:
+            return
+        session.last_message = now
+        if session.down_since is not None:
+            self._mark_up(session, now)
+
+    # --- Session lifecycle ---
+    async def _run(self, session: _Session):
+        fetcher = session.fetcher
+        try:
+            while True:
+                session.stalled = False
+                session.started = time.monotonic()
+                session.task = asyncio.create_task(session.factory())
+                await asyncio.wait({session.task})
+                if session.stalled:
+                    reason = f"no message for {self.stall_timeout:.0f}s"
+                elif session.task.cancelled():
+                    return
+                elif session.task.exception() is not None:
+                    error = session.task.exception()
+                    reason = f"{type(error).__name__}: {error}"
+                    logger.debug("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+                else:
+                    reason = "listener returned"
+
+                # A stalled feed has been useless since its last message, not since we noticed
+                since = max(session.started, session.last_message) if session.stalled else time.monotonic()
+                self._mark_down(session, since)
+                if session.stalled:
+                    try:
+                        await fetcher.reset(session.symbols)
+                    except Exception as e:
+                        logger.debug(f"[Supervisor] {fetcher.name} reset failed: {e}")
+                delay = min(self.backoff_max, self.backoff_base * 2 ** session.attempt)
+                delay *= random.uniform(0.5, 1.0)   # jitter so venues don't reconnect in lockstep
+                session.attempt += 1
+                self.reconnects[fetcher.name] += 1
+                logger.error(f"[Supervisor] {fetcher.name}/{session.key} down ({reason}); resubscribing in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        finally:
+            if session.task is not None and not session.task.done():
+                session.task.cancel()
+
+    def _mark_down(self, session: _Session, now: float):
+        name = session.fetcher.name
+        session.fetcher.connected = False
+        if session.down_since is None:
+            session.down_since = now
+            self._down_sessions[name] += 1
+            if self._down_sessions[name] == 1:
+                self._venue_down_since[name] = now
+
+    def _mark_up(self, session: _Session, now: float):
+        name = session.fetcher.name
+        session.down_since = None
+        session.attempt = 0
+        session.fetcher.connected = True
+        self._down_sessions[name] -= 1
+        if self._down_sessions[name] == 0:
+            self._downtime[name] += now - self._venue_down_since.pop(name)
+            logger.info(f"[Supervisor] {name} recovered")
+
+    async def _monitor_loop(self):
+        check_interval = max(0.5, min(5.0, self.stall_timeout / 4))
+        last_report = time.monotonic()
+        while True:
+            await asyncio.sleep(check_interval)
+            now = time.monotonic()
+            for session in self.sessions:
+                task = session.task
+                if task is None or task.done() or session.stalled:
+                    continue
+                if now - max(session.started, session.last_message) > self.stall_timeout:
+                    session.stalled = True
+                    self.stalls[session.fetcher.name] += 1
+                    task.cancel()
+            if now - last_report >= self.report_interval:
+                last_report = now
+                if any(self.reconnects.values()):
+                    summary = ", ".join(
+                        f"{venue}: {s['reconnects']} reconnects, {s['downtime_sec']:.0f}s down"
+                        for venue, s in self.stats().items()
+                    )
+                    logger.info(f"[Supervisor] Feed health | {summary}")
+
+    # --- Reporting ---
+    def stats(self) -> Dict[str, dict]:
+        """Per venue: connected flag, reconnect/stall counts, total downtime and age of the freshest message."""
+        now = time.monotonic()
+        out = {}
+        for venue in self.reconnects:
+            downtime = self._downtime[venue]
+            if venue in self._venue_down_since:
+                downtime += now - self._venue_down_since[venue]
+            last = max((t for (v, _), t in self.last_message.items() if v == venue), default=None)
+            out[venue] = {
+                "connected": self._down_sessions[venue] == 0 and last is not None,
+                "reconnects": self.reconnects[venue],
+                "stalls": self.stalls[venue],
+                "downtime_sec": downtime,
+                "last_message_age": None if last is None else now - last,
+            }
+        return out
+
+    async def stop(self):
+        """Cancel every listener (call before closing the exchanges)."""
+        tasks = self._runners + ([self._monitor] if self._monitor is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runners.clear()
+        self._monitor = None
+
+
+_default: Optional[FeedSupervisor] = None
+
+
+def default_supervisor() -> FeedSupervisor:
+    """Process-wide supervisor for fetchers that were not given one explicitly."""
+    global _default
+    if _default is None:
+        _default = FeedSupervisor()
+    return _default
@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+from core.market_matrix import MarketMatrix
+from exchanges.base import ExchangeFetcher
+
+
+class Venue(ExchangeFetcher):
+    """A fee-free venue whose quotes are set by hand."""
+    taker_fee_percent = 0.0
+
+    def __init__(self, name: str):
+        super().__init__(name, "MULTI")
+
+    def quote(self, pair: str, bid: float, ask: float):
+        self._publish(pair, (bid + ask) / 2, time.time_ns(), bid, ask)
+
+
+@pytest.fixture
+def market():
+    """`market(pairs, venues)` → a MarketMatrix with a `Venue` per name on every pair, and the venues by name."""
+    def build(pairs, venues):
+        matrix = MarketMatrix()
+        fetchers = {name: Venue(name) for name in venues}
+        for fetcher in fetchers.values():
+            for pair in pairs:
+                matrix.add_fetcher(pair, fetcher)
+        return matrix, fetchers
+    return build
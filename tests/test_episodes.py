@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+from core.detector import ArbitrageDetector
+from core.episodes import EpisodeTracker
+
+PAIR = "SOL/USDC"
+
+
+class RecordingLogger:
+    """Stands in for DatabaseLogger, keeping every call's arguments."""
+
+    def __init__(self):
+        self.opportunities = []
+        self.episodes = []
+        self.trades = []
+
+    async def log_opportunity(self, *args):
+        self.opportunities.append(args)
+
+    async def log_episode(self, *args):
+        self.episodes.append(args)
+
+    async def log_trade(self, *args, **kwargs):
+        self.trades.append(args)
+
+
+def observe(matrix, tracker, pairs, max_age=60.0):
+    """One detector evaluation's worth of input to the tracker."""
+    routes = matrix.routes(pairs, max_age=max_age)
+    buy_cols, sell_cols, _ = matrix.best_routes(routes)
+    asyncio.run(tracker.observe(pairs, routes, buy_cols, sell_cols))
+
+
+def test_hysteresis_keeps_one_episode_until_converged(market):
+    matrix, venues = market([PAIR], ["A", "B"])
+    db_logger = RecordingLogger()
+    tracker = EpisodeTracker(matrix, db_logger, open_threshold=0.5)
+    venues["A"].quote(PAIR, 99.9, 100.0)
+
+    venues["B"].quote(PAIR, 101.0, 101.1)    # 1%: opens
+    observe(matrix, tracker, [PAIR])
+    venues["B"].quote(PAIR, 100.45, 100.55)  # 0.45%: inside the band, stays open
+    observe(matrix, tracker, [PAIR])
+    venues["B"].quote(PAIR, 100.8, 100.9)
+    observe(matrix, tracker, [PAIR])
+    assert tracker.opened == 1 and not db_logger.episodes
+    assert tracker.open[PAIR].ticks == 3
+
+    venues["B"].quote(PAIR, 100.1, 100.2)    # 0.1%: below 0.8 × the threshold
+    observe(matrix, tracker, [PAIR])
+    assert not tracker.open
+    assert len(db_logger.episodes) == 1
+    episode = db_logger.episodes[0]
+    assert episode[3:6] == ("A", "B", 3)
+    assert abs(episode[7] - 1.0) < 1e-9      # peak spread
+    assert episode[-1] == "converged"
+
+
+def test_only_the_best_route_is_tracked(market):
+    matrix, venues = market([PAIR], ["A", "B", "C"])
+    db_logger = RecordingLogger()
+    tracker = EpisodeTracker(matrix, db_logger, open_threshold=0.5)
+    venues["A"].quote(PAIR, 99.9, 100.0)
+    venues["B"].quote(PAIR, 101.0, 101.1)
+    venues["C"].quote(PAIR, 100.8, 100.9)    # above the threshold too, but not the best route
+    observe(matrix, tracker, [PAIR])
+    assert list(tracker.open) == [PAIR]
+
+    venues["C"].quote(PAIR, 101.5, 101.6)    # the best route moves to A → C: same episode
+    observe(matrix, tracker, [PAIR])
+    asyncio.run(tracker.close_all())
+    assert tracker.opened == 1
+    assert db_logger.episodes[0][3:6] == ("A", "C", 2)     # the route at the peak
+    assert db_logger.episodes[0][12:16] == ("A", "B", 100.0, 101.0)   # the route it opened on
+    assert db_logger.episodes[0][-1] == "shutdown"
+
+
+def test_stale_quotes_close_the_episode(market):
+    matrix, venues = market([PAIR], ["A", "B"])
+    db_logger = RecordingLogger()
+    tracker = EpisodeTracker(matrix, db_logger, open_threshold=0.5)
+    venues["A"].quote(PAIR, 99.9, 100.0)
+    venues["B"].quote(PAIR, 101.0, 101.1)
+    observe(matrix, tracker, [PAIR])
+    time.sleep(0.02)
+    observe(matrix, tracker, [PAIR], max_age=0.01)
+    assert not tracker.open
+    assert db_logger.episodes[0][-1] == "stale"
+
+
+def test_idle_pair_is_closed_by_the_sweep(market):
+    other = "BTC/USDC"
+    matrix, venues = market([PAIR, other], ["A", "B"])
+    db_logger = RecordingLogger()
+    tracker = EpisodeTracker(matrix, db_logger, open_threshold=0.5, max_idle=0.01)
+    venues["A"].quote(PAIR, 99.9, 100.0)
+    venues["B"].quote(PAIR, 101.0, 101.1)
+    for venue in venues.values():
+        venue.quote(other, 50_000, 50_001)
+    observe(matrix, tracker, [PAIR])
+    opened = tracker.open[PAIR].last_ns
+
+    time.sleep(0.02)
+    tracker._next_sweep_ns = 0
+    observe(matrix, tracker, [other])        # SOL/USDC no longer updates
+    assert not tracker.open
+    episode = db_logger.episodes[0]
+    assert episode[-1] == "idle"
+    assert episode[1] == opened              # closed as of its last update
+
+
+def test_detector_logs_episodes_instead_of_entries(market):
+    matrix, venues = market([PAIR], ["A", "B"])
+    db_logger = RecordingLogger()
+    tracker = EpisodeTracker(matrix, db_logger)
+    detector = ArbitrageDetector(matrix, db_logger, episodes=tracker)
+    venues["A"].quote(PAIR, 99.9, 100.0)
+    venues["B"].quote(PAIR, 102.0, 102.1)
+    asyncio.run(detector.evaluate_pairs([PAIR]))
+    assert PAIR in detector.open_positions
+    assert not db_logger.opportunities
+    assert PAIR in tracker.open
+
+    plain = RecordingLogger()
+    detector = ArbitrageDetector(matrix, plain)
+    asyncio.run(detector.evaluate_pairs([PAIR]))
+    assert len(plain.opportunities) == 1
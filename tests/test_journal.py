@@ -0,0 +1,88 @@
+import asyncio
+import os
+
+from db import journal as journal_module
+from db.journal import Journal
+
+
+def test_replay_after_reopen(tmp_path):
+    journal = Journal(str(tmp_path))
+    journal.open()
+    seqs = [journal.append(f"event-{i}".encode()) for i in range(5)]
+    asyncio.run(journal.close())
+
+    reopened = Journal(str(tmp_path))
+    reopened.open()
+    assert seqs == [1, 2, 3, 4, 5]
+    assert reopened.last_seq == 5
+    assert list(reopened.replay()) == [(i + 1, f"event-{i}".encode()) for i in range(5)]
+    assert reopened.append(b"next") == 6
+    asyncio.run(reopened.close())
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    journal = Journal(str(tmp_path))
+    journal.open()
+    journal.append(b"complete")
+    asyncio.run(journal.close())
+    segment = os.path.join(tmp_path, sorted(name for name in os.listdir(tmp_path) if name.startswith("segment-"))[-1])
+    with open(segment, "ab") as f:
+        f.write(b"\x00\x00\x01")   # a header cut short by a crash
+
+    reopened = Journal(str(tmp_path))
+    reopened.open()
+    assert list(reopened.replay()) == [(1, b"complete")]
+    assert reopened.append(b"after") == 2
+    asyncio.run(reopened.close())
+    again = Journal(str(tmp_path))
+    again.open()
+    assert [seq for seq, _ in again.replay()] == [1, 2]
+    asyncio.run(again.close())
+
+
+def test_rotation_and_commit(tmp_path):
+    journal = Journal(str(tmp_path), segment_bytes=256)
+    journal.open()
+    for i in range(100):
+        journal.append(b"x" * 40)
+    assert len(journal._segments) > 2
+
+    asyncio.run(journal.commit(90))
+    remaining = sorted(name for name in os.listdir(tmp_path) if name.startswith("segment-"))
+    assert len(remaining) == len(journal._segments)
+    # Only the segment holding record 91 and the ones after it are kept
+    assert journal._segments[0] <= 91
+    assert [seq for seq, _ in journal.replay()] == list(range(91, 101))
+    asyncio.run(journal.close())
+
+    reopened = Journal(str(tmp_path), segment_bytes=256)
+    reopened.open()
+    assert reopened.committed == 90
+    assert [seq for seq, _ in reopened.replay(upto=95)] == list(range(91, 96))
+    asyncio.run(reopened.close())
+
+
+def test_sync_loop_survives_fsync_errors(tmp_path, monkeypatch):
+    calls = []
+    real_fsync = os.fsync
+
+    def flaky_fsync(fd):
+        calls.append(fd)
+        if len(calls) == 1:
+            raise OSError(9, "Bad file descriptor")
+        real_fsync(fd)
+
+    async def scenario():
+        journal = Journal(str(tmp_path), segment_bytes=256, sync_interval=0.01)
+        journal.open()
+        await journal.start()
+        monkeypatch.setattr(journal_module.os, "fsync", flaky_fsync)
+        for i in range(20):
+            journal.append(b"y" * 40)   # rotates while the sync task runs
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.05)
+        assert not journal._sync_task.done()
+        assert len(calls) > 1
+        await journal.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+
+from db import logger as logger_module
+from db.journal import Journal
+from db.logger import DatabaseLogger, StorageBackend
+
+
+class Backend(StorageBackend):
+    """Stores batches in memory, rejecting them all while `down`."""
+
+    def __init__(self):
+        self.down = False
+        self.trades = []
+
+    async def reserve_ids(self, n):
+        return list(range(n))
+
+    async def write_batch(self, batch):
+        if self.down:
+            return batch
+        self.trades.extend(batch["trades"])
+        return None
+
+
+async def log_trade(db_logger, pair):
+    await db_logger.log_trade(datetime.now(timezone.utc), pair, "A", 100.0, "B", 101.0, 1.0, 1.0, 0.5, 1.0)
+
+
+def test_rows_neither_written_nor_spilled_stay_buffered(tmp_path, monkeypatch):
+    def full_disk(path, batch):
+        raise OSError(28, "No space left on device")
+
+    async def scenario():
+        backend = Backend()
+        journal = Journal(str(tmp_path / "journal"))
+        journal.open()
+        db_logger = DatabaseLogger(None, flush_interval=1e9, spill_dir=str(tmp_path / "spill"), journal=journal, backend=backend)
+        backend.down = True
+        monkeypatch.setattr(logger_module, "_write_spill", full_disk)
+        await log_trade(db_logger, "SOL/USDC")
+        await db_logger.flush()
+        assert [row[1] for row in db_logger.trade_buffer] == ["SOL/USDC"]
+        assert journal.committed == 0
+
+        # The next flush carries them, ahead of the newer rows
+        await log_trade(db_logger, "BTC/USDC")
+        backend.down = False
+        await db_logger.flush()
+        assert [row[1] for row in backend.trades] == ["SOL/USDC", "BTC/USDC"]
+        assert journal.committed == 2
+        await db_logger.close()
+        await journal.close()
+
+    asyncio.run(scenario())
+
+
+def test_replay_survives_a_failed_spill_rewrite(tmp_path, monkeypatch):
+    spill_dir = str(tmp_path / "spill")
+
+    async def scenario():
+        backend = Backend()
+        db_logger = DatabaseLogger(None, flush_interval=1e9, spill_dir=spill_dir, backend=backend)
+        backend.down = True
+        await log_trade(db_logger, "SOL/USDC")
+        await db_logger.flush()
+        assert len(os.listdir(spill_dir)) == 1
+
+        def full_disk(path, batch):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(logger_module, "_write_spill", full_disk)
+        await db_logger._replay()   # rejected again, and the rewrite fails: the file stays
+        assert len(os.listdir(spill_dir)) == 1 and db_logger._spilled
+
+        monkeypatch.undo()
+        backend.down = False
+        await db_logger.flush()
+        assert [row[1] for row in backend.trades] == ["SOL/USDC"]
+        assert not os.listdir(spill_dir)
+        await db_logger.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from core.quote_board import QuoteBoard
+from exchanges.base import ExchangeFetcher
+
+
+@pytest.fixture
+def board():
+    board = QuoteBoard.create(f"qb_test_{os.getpid()}", ["SOL/USDC", "BTC/USDC"], ["A", "B"])
+    yield board
+    board.close()
+
+
+def test_publish_and_read(board):
+    assert board.read("SOL/USDC", "A") is None
+    board.publish(0, 1, 100.0, 123, 99.9, 100.1)
+    assert board.read("SOL/USDC", "B") == (100.0, 99.9, 100.1, 123)
+    # Without sides, the price stands in for both
+    board.publish(1, 0, 50.0, 456)
+    assert board.read("BTC/USDC", "A") == (50.0, 50.0, 50.0, 456)
+
+
+def test_on_quote_takes_the_fetcher_sides(board):
+    fetcher = ExchangeFetcher("A", "MULTI")
+    fetcher.subscribe(board.on_quote)
+    fetcher._publish("SOL/USDC", 100.0, 789, 99.5, 100.5)
+    fetcher._publish("DOGE/USDC", 1.0, 789, 0.9, 1.1)   # not on the board: ignored
+    assert board.read("SOL/USDC", "A") == (100.0, 99.5, 100.5, 789)
+
+
+def test_attach_sees_the_writes(board):
+    board.publish(0, 0, 100.0, 1, 99.0, 101.0)
+    reader = QuoteBoard.attach(board.name)
+    try:
+        assert reader.pairs == board.pairs and reader.venues == board.venues
+        assert reader.read("SOL/USDC", "A") == (100.0, 99.0, 101.0, 1)
+    finally:
+        reader.close()
+
+
+def _finish_write_later(board, row, col, price, bid, ask, ts_ns, delay=0.02):
+    """Leave the slot mid-write (odd seq) with half-written values, then complete it from another thread."""
+    slot = board.slots[row, col]
+    seq = int(slot["seq"])
+    slot["seq"] = seq + 1
+    slot["price"] = price
+    slot["bid"] = bid
+
+    def finish():
+        time.sleep(delay)
+        slot["ask"] = ask
+        slot["ts_ns"] = ts_ns
+        slot["seq"] = seq + 2
+
+    thread = threading.Thread(target=finish)
+    thread.start()
+    return thread
+
+
+def test_read_retries_a_torn_slot(board):
+    board.publish(0, 0, 100.0, 1, 99.0, 101.0)
+    thread = _finish_write_later(board, 0, 0, 200.0, 199.0, 201.0, 2)
+    # Never the half-written mix of old and new values
+    assert board.read("SOL/USDC", "A") == (200.0, 199.0, 201.0, 2)
+    thread.join()
+
+
+def test_snapshot_retries_a_torn_slot(board):
+    board.publish(0, 0, 100.0, 1, 99.0, 101.0)
+    board.publish(1, 1, 50.0, 1, 49.0, 51.0)
+    thread = _finish_write_later(board, 1, 1, 60.0, 59.0, 61.0, 2)
+    prices, bids, asks, timestamps = board.snapshot()
+    thread.join()
+    assert (prices[1, 1], bids[1, 1], asks[1, 1], timestamps[1, 1]) == (60.0, 59.0, 61.0, 2)
+    assert (prices[0, 0], bids[0, 0], asks[0, 0]) == (100.0, 99.0, 101.0)
+    assert np.isnan(prices[0, 1]) and timestamps[0, 1] == 0
+
+
+def test_a_slot_left_mid_write_reads_as_missing(board):
+    board.publish(0, 0, 100.0, 1, 99.0, 101.0)
+    board.publish(1, 1, 50.0, 1, 49.0, 51.0)
+    board.slots[0, 0]["seq"] += 1   # its writer died mid-publish
+    began = time.monotonic()
+    assert board.read("SOL/USDC", "A") is None
+    assert time.monotonic() - began < 1
+    prices, bids, asks, timestamps = board.snapshot()
+    assert np.isnan(prices[0, 0]) and timestamps[0, 0] == 0
+    assert (prices[1, 1], timestamps[1, 1]) == (50.0, 1)
+    # Known stuck: no more waiting on it
+    began = time.monotonic()
+    assert board.read("SOL/USDC", "A") is None
+    board.snapshot()
+    assert time.monotonic() - began < 0.05
+
+    # A new writer takes the slot over
+    board.publish(0, 0, 101.0, 2, 100.0, 102.0)
+    assert board.read("SOL/USDC", "A") == (101.0, 100.0, 102.0, 2)
+    assert int(board.slots[0, 0]["seq"]) % 2 == 0
+
+
+def test_create_refuses_an_existing_board(board):
+    with pytest.raises(FileExistsError):
+        QuoteBoard.create(board.name, ["SOL/USDC"], ["A"])
+    reader = QuoteBoard.attach(board.name)
+    assert reader.pairs == board.pairs
+    reader.close()
+
+
+def test_create_can_replace_a_leftover_board():
+    name = f"qb_replace_{os.getpid()}"
+    first = QuoteBoard.create(name, ["SOL/USDC"], ["A"])
+    first.shm.close()   # left behind by a crashed run: never unlinked
+    second = QuoteBoard.create(name, ["BTC/USDC"], ["A", "B"], replace=True)
+    reader = QuoteBoard.attach(name)
+    try:
+        assert reader.pairs == ["BTC/USDC"]
+    finally:
+        reader.close()
+        second.close()
@@ -0,0 +1,62 @@
+from core.rate_graph import RateGraph
+
+
+def test_cross_venue_loop_is_found(market):
+    matrix, venues = market(["SOL/USDC"], ["A", "B"])
+    venues["A"].quote("SOL/USDC", 99.9, 100.0)
+    venues["B"].quote("SOL/USDC", 101.0, 101.1)   # buy at 100 on A, sell at 101 on B
+    graph = RateGraph(matrix)
+    graph.refresh()
+    cycles = graph.find_cycles()
+    assert cycles
+    best = cycles[0]
+    assert best["venues"] == ["A", "B"]
+    assert abs(best["profit_pct"] - 1.0) < 1e-6
+
+
+def test_triangular_loop_on_one_venue(market):
+    matrix, venues = market(["SOL/USDC", "SOL/BTC", "BTC/USDC"], ["A"])
+    venues["A"].quote("BTC/USDC", 50_000, 50_000)
+    venues["A"].quote("SOL/USDC", 100, 100)
+    venues["A"].quote("SOL/BTC", 0.00202, 0.00202)   # SOL is worth 101 USDC through BTC
+    graph = RateGraph(matrix)
+    graph.refresh()
+    cycles = graph.find_cycles()
+    assert cycles and cycles[0]["venues"] == ["A"]
+    assert len(cycles[0]["path"]) == 4                # three hops, back to the start
+    assert abs(cycles[0]["profit_pct"] - 1.0) < 1e-6
+
+
+def test_no_loop_without_edge_changes(market):
+    matrix, venues = market(["SOL/USDC"], ["A", "B"])
+    venues["A"].quote("SOL/USDC", 99.9, 100.0)
+    venues["B"].quote("SOL/USDC", 101.0, 101.1)
+    graph = RateGraph(matrix)
+    graph.refresh()
+    assert graph.find_cycles()
+    graph.refresh()                                   # same quotes: nothing touched
+    assert graph.find_cycles() == []
+
+
+def test_fair_prices_have_no_loop(market):
+    matrix, venues = market(["SOL/USDC"], ["A", "B"])
+    venues["A"].quote("SOL/USDC", 99.9, 100.0)
+    venues["B"].quote("SOL/USDC", 99.95, 100.05)
+    graph = RateGraph(matrix)
+    graph.refresh()
+    assert graph.find_cycles() == []
+
+
+def test_unusable_prices_drop_the_edges(market):
+    matrix, venues = market(["SOL/USDC"], ["A", "B"])
+    venues["A"].quote("SOL/USDC", 99.9, 100.0)
+    venues["B"].quote("SOL/USDC", 101.0, 101.1)
+    graph = RateGraph(matrix)
+    graph.refresh()
+    assert graph.find_cycles()
+    for bid, ask in ((0.0, 101.1), (-1.0, 101.1), (101.0, float("inf"))):
+        venues["B"].quote("SOL/USDC", bid, ask)
+        graph.refresh(["SOL/USDC"])                   # no ValueError from log()
+        assert graph.find_cycles() == []
+        sol_b, usdc_b = graph.node_index[("SOL", "B")], graph.node_index[("USDC", "B")]
+        assert usdc_b not in graph.out_edges[sol_b]
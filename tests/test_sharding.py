@@ -0,0 +1,45 @@
+import asyncio
+import os
+import time
+
+from core.sharding import ShardedFeed
+from exchanges.base import ExchangeFetcher
+from exchanges.supervisor import FeedSupervisor
+
+
+class Flaky(ExchangeFetcher):
+    """A venue whose worker process dies after a few quotes (runs inside the shard worker)."""
+    taker_fee_percent = 0.0
+
+    def __init__(self, pairs):
+        super().__init__("Flaky", "MULTI")
+        self.pairs = pairs
+
+    async def connect(self):
+        self._spawn("ticks", self._ticks, self.pairs)
+
+    async def _ticks(self):
+        for _ in range(5):
+            for pair in self.pairs:
+                self._publish(pair, 100.0, time.time_ns(), 99.9, 100.1)
+            await asyncio.sleep(0.02)
+        os._exit(1)
+
+
+def test_dead_worker_is_respawned():
+    async def scenario():
+        supervisor = FeedSupervisor(stall_timeout=30, backoff_base=0.05, backoff_max=0.1)
+        feed = ShardedFeed({"Flaky": Flaky}, ["SOL/USDC"], 1, supervisor=supervisor)
+        feed.start()
+        try:
+            deadline = time.monotonic() + 60
+            while supervisor.reconnects["shard-0"] < 2 and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            assert supervisor.reconnects["shard-0"] >= 2
+            assert "SOL/USDC" in feed.proxies["Flaky"].latest_prices
+        finally:
+            await supervisor.stop()
+            feed.stop()
+        assert not feed._live
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from exchanges.base import ExchangeFetcher
+from exchanges.supervisor import FeedSupervisor
+
+
+class Feed(ExchangeFetcher):
+    """One multi-symbol subscription that never fails on its own; `tick` publishes a quote."""
+
+    def __init__(self, name: str, supervisor: FeedSupervisor):
+        super().__init__(name, "MULTI")
+        self.supervisor = supervisor
+        self.resets = []
+
+    async def reset(self, symbols=None):
+        self.resets.append(symbols)
+
+    async def listen(self):
+        await asyncio.Event().wait()
+
+    def tick(self, symbol: str):
+        self._publish(symbol, 100.0, time.time_ns(), 99.9, 100.1)
+
+
+def run_for(supervisor, feed, seconds, ticking):
+    async def scenario():
+        feed._spawn("tickers", feed.listen, ["A/USDC", "B/USDC"])
+        for symbol in ("A/USDC", "B/USDC"):
+            feed.tick(symbol)
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for symbol in ticking:
+                feed.tick(symbol)
+            await asyncio.sleep(0.05)
+        await supervisor.stop()
+
+    asyncio.run(scenario())
+
+
+def test_one_quiet_symbol_does_not_restart_a_ticker_session():
+    supervisor = FeedSupervisor(stall_timeout=0.2, backoff_base=0.01)
+    feed = Feed("Venue", supervisor)
+    run_for(supervisor, feed, 1.5, ticking=["A/USDC"])   # B/USDC quoted once, then went quiet
+    assert supervisor.stalls["Venue"] == 0
+    assert supervisor.reconnects["Venue"] == 0
+    assert not feed.resets
+
+
+def test_silent_session_is_reset_and_resubscribed():
+    supervisor = FeedSupervisor(stall_timeout=0.2, backoff_base=0.01)
+    feed = Feed("Venue", supervisor)
+    run_for(supervisor, feed, 1.0, ticking=[])
+    assert supervisor.stalls["Venue"] >= 1
+    assert supervisor.reconnects["Venue"] >= 1
+    assert feed.resets[0] == ["A/USDC", "B/USDC"]
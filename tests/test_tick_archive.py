@@ -0,0 +1,63 @@
+import asyncio
+import os
+
+from db.tick_archive import TickArchive
+
+
+class Sink:
+    """Stands in for ParquetSink.write_ticks, failing while `down`."""
+
+    def __init__(self):
+        self.down = False
+        self.ticks = []
+
+    async def write_ticks(self, batch):
+        if self.down:
+            raise ConnectionError("unreachable")
+        self.ticks.extend(batch)
+
+
+def ticks(n, start=0):
+    return [("A", "SOL/USDC", 1_700_000_000_000_000_000 + i, 100.0, 99.9, 100.1) for i in range(start, start + n)]
+
+
+def test_failed_batches_are_spilled_and_replayed(tmp_path):
+    spill_dir = str(tmp_path / "ticks")
+
+    async def scenario():
+        sink = Sink()
+        archive = TickArchive(None, batch_size=4, sink=sink, spill_dir=spill_dir)
+        sink.down = True
+        archive._ring.extend(ticks(10))
+        await archive.flush()
+        assert not archive._ring and not sink.ticks
+        assert archive.stats()["spilled_batches"] == 3 and archive.failed == 0
+        assert len(os.listdir(spill_dir)) == 3
+
+        sink.down = False
+        archive._ring.extend(ticks(2, start=10))
+        await archive.flush()
+        assert [tick[2] for tick in sink.ticks] == [tick[2] for tick in ticks(2, start=10) + ticks(10)]
+        assert archive.written == 12
+        assert not archive._spilled and not os.listdir(spill_dir)
+
+    asyncio.run(scenario())
+
+
+def test_spilled_batches_survive_a_restart(tmp_path):
+    spill_dir = str(tmp_path / "ticks")
+
+    async def scenario():
+        sink = Sink()
+        sink.down = True
+        archive = TickArchive(None, sink=sink, spill_dir=spill_dir)
+        archive._ring.extend(ticks(5))
+        await archive.flush()
+
+        sink.down = False
+        restarted = TickArchive(None, sink=sink, spill_dir=spill_dir)
+        assert len(restarted._spilled) == 1
+        await restarted.flush()
+        assert len(sink.ticks) == 5 and not os.listdir(spill_dir)
+
+    asyncio.run(scenario())
@@ -1,4 +1,5 @@
 from trades.base import ExchangeTrader
+from utils.market_cache import load_markets
 from typing import Optional, Literal, Dict, Any
 import ccxt.pro
 import os
@@ -46,7 +47,7 @@ class BinanceTrader(ExchangeTrader):
         """Connect to Binance WebSocket and start price streaming"""
         try:
             # Test connection with a simple API call
-            await self.exchange.load_markets()
+            await load_markets(self.exchange)
             
             # Start watching ticker for price updates
             ticker_task = asyncio.create_task(self._watch_ticker())
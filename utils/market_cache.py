@@ -0,0 +1,61 @@
+# utils/market_cache.py
+
+import asyncio
+import json
+import os
+import time
+import logging
+logger = logging.getLogger("cex_dex_arbitrage.utils.market_cache")
+
+# Point MARKET_CACHE_DIR at a persistent volume to keep the cache across redeploys
+MARKET_CACHE_DIR = os.getenv("MARKET_CACHE_DIR", ".market_cache")
+MARKET_CACHE_TTL = float(os.getenv("MARKET_CACHE_TTL", 6 * 3600))  # seconds
+
+
+def cache_path(exchange, cache_dir: str = MARKET_CACHE_DIR) -> str:
+    """One file per exchange id / market type / sandbox flag, since each sees a different market list."""
+    market_type = exchange.options.get("defaultType", "spot")
+    sandbox = "-sandbox" if getattr(exchange, "isSandboxModeEnabled", False) else ""
+    return os.path.join(cache_dir, f"{exchange.id}-{market_type}{sandbox}.json")
+
+
+def _read(path: str, ttl: float):
+    if time.time() - os.path.getmtime(path) > ttl:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write(path: str, data: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, default=str)
+    os.replace(tmp, path)  # readers never see a half-written file
+
+
+async def load_markets(exchange, ttl: float = MARKET_CACHE_TTL, cache_dir: str = MARKET_CACHE_DIR) -> dict:
+    """
+    Drop-in for `await exchange.load_markets()`: warm-starts the client from the on-disk cache
+    (symbols, precision, limits) when it is younger than `ttl`, otherwise loads over REST and
+    refreshes the cache. ccxt then skips its own REST load on the first watch_* call.
+    """
+    path = cache_path(exchange, cache_dir)
+    try:
+        cached = await asyncio.to_thread(_read, path, ttl)
+    except (OSError, ValueError):
+        cached = None  # missing or corrupt: fall through to the network
+    if cached is not None:
+        try:
+            markets = exchange.set_markets(cached["markets"], cached.get("currencies"))
+            logger.debug(f"[MarketCache] {exchange.id}: {len(markets)} markets from {path}")
+            return markets
+        except Exception as e:
+            logger.warning(f"[MarketCache] {exchange.id}: ignoring unusable cache {path}: {e}")
+
+    markets = await exchange.load_markets()
+    try:
+        await asyncio.to_thread(_write, path, {"markets": exchange.markets, "currencies": exchange.currencies})
+    except OSError as e:
+        logger.warning(f"[MarketCache] {exchange.id}: could not write {path}: {e}")
+    return markets
@@ -0,0 +1,42 @@
+# utils/rate_limiter.py
+
+from typing import Optional
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Async token bucket shared by every caller of one API quota: `rate` tokens per second, bursts
+    up to `capacity`. Waiters are served in arrival order, so no pair starves the others.
+
+        async with bucket:
+            await session.get(...)
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
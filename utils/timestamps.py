@@ -0,0 +1,26 @@
+# utils/timestamps.py
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import time
+
+# Quotes carry epoch nanoseconds (plain ints) from the fetchers through the matrix, the shard pipes
+# and the quote board; datetimes are only built at the display and DB edges.
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def ms_to_ns(ts_ms: Optional[float]) -> int:
+    """Exchange millisecond timestamp → epoch ns, falling back to now when the venue sent none."""
+    return int(ts_ms) * 1_000_000 if ts_ms else time.time_ns()
+
+
+def to_datetime(ts_ns: int) -> datetime:
+    """Epoch ns → aware UTC datetime (exact to the microsecond)."""
+    return _EPOCH + timedelta(microseconds=ts_ns // 1000)
+
+
+def to_ns(ts) -> int:
+    """Epoch ns of an aware datetime (exact to the microsecond); ints pass through unchanged."""
+    if isinstance(ts, int):
+        return ts
+    return (ts - _EPOCH) // timedelta(microseconds=1) * 1000